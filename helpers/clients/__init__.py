@@ -5,8 +5,13 @@ from helpers.clients.workspace_client import WorkspaceClient
 from helpers.clients.semanticModel_client import SemanticModelClient
 from helpers.clients.report_client import ReportClient
 from helpers.clients.fabric_client import FabricApiClient
-from helpers.clients.sql_client import SQLClient, get_sql_endpoint
+from helpers.clients.sql_client import (
+    SQLClient,
+    get_sql_endpoint,
+    refresh_sql_endpoint_metadata,
+)
 from helpers.clients.notebook_client import NotebookClient
+from helpers.clients.onelake_client import OneLakeClient
 
 
 __all__ = [
@@ -18,6 +23,8 @@ __all__ = [
     "SemanticModelClient",
     "ReportClient",
     "NotebookClient",
+    "OneLakeClient",
     "SQLClient",
     "get_sql_endpoint",
+    "refresh_sql_endpoint_metadata",
 ]
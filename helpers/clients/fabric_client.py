@@ -3,6 +3,8 @@ from typing import Dict, Any, List, Optional, Tuple, Union
 import base64
 from urllib.parse import quote
 from functools import lru_cache
+import asyncio
+import time
 import requests
 from azure.identity import DefaultAzureCredential
 from helpers.logging_config import get_logger
@@ -19,6 +21,7 @@ class FabricApiConfig(BaseModel):
     """Configuration for Fabric API"""
 
     base_url: str = "https://api.fabric.microsoft.com/v1"
+    powerbi_url: str = "https://api.powerbi.com/v1.0/myorg"
     max_results: int = 100
 
 
@@ -38,6 +41,12 @@ class FabricApiClient:
             "Authorization": f"Bearer {self.credential.get_token('https://api.fabric.microsoft.com/.default').token}"
         }
 
+    def _get_powerbi_headers(self) -> Dict[str, str]:
+        """Get headers for Power BI REST API calls"""
+        return {
+            "Authorization": f"Bearer {self.credential.get_token('https://analysis.windows.net/powerbi/api/.default').token}"
+        }
+
     def _build_url(
         self, endpoint: str, continuation_token: Optional[str] = None
     ) -> str:
@@ -192,6 +201,261 @@ class FabricApiClient:
                     break
             return results
 
+    async def _make_lro_request(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        method: str = "POST",
+        poll_interval: float = 2,
+        timeout: float = 600,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Start a long-running operation and wait for its result without blocking the event loop.
+
+        Requests run in worker threads and polling sleeps asynchronously, at the
+        interval advised by the Retry-After header when present. When the
+        operation succeeds, its result is fetched from the operation's result
+        location.
+
+        Returns:
+            The operation result (or the immediate response body), or None on failure.
+        """
+        url = self._build_url(endpoint=endpoint)
+        response = await asyncio.to_thread(
+            requests.request,
+            method.upper(),
+            url,
+            headers=self._get_headers(),
+            json=params,
+            timeout=120,
+        )
+        if response.status_code != 202:
+            if not response.ok:
+                logger.error(
+                    f"API call failed: {response.status_code} {response.text}"
+                )
+                return None
+            return response.json() if response.content else {}
+
+        op_url = response.headers.get("Location") or response.headers.get(
+            "Operation-Location"
+        )
+        if not op_url:
+            logger.error("LRO: No Location header found.")
+            return None
+        logger.info(f"LRO: Polling {op_url} for operation status...")
+        deadline = time.monotonic() + timeout
+        while True:
+            delay = float(response.headers.get("Retry-After", poll_interval))
+            if time.monotonic() + delay > deadline:
+                logger.error("LRO: Polling timed out.")
+                return None
+            await asyncio.sleep(delay)
+            response = await asyncio.to_thread(
+                requests.get, op_url, headers=self._get_headers(), timeout=60
+            )
+            if response.status_code not in (200, 201, 202):
+                logger.error(f"LRO: Poll failed with status {response.status_code}")
+                return None
+            status = (response.json() or {}).get("status", "")
+            if status.lower() in ("succeeded", "completed"):
+                break
+            if status.lower() in ("failed", "canceled", "cancelled"):
+                logger.error(f"LRO: Operation {status}: {response.text}")
+                return None
+            logger.debug(f"LRO: Status {status}")
+
+        result_url = response.headers.get("Location") or f"{op_url.rstrip('/')}/result"
+        result = await asyncio.to_thread(
+            requests.get, result_url, headers=self._get_headers(), timeout=120
+        )
+        if not result.ok:
+            logger.error(f"LRO: Fetching result failed with status {result.status_code}")
+            return None
+        logger.info("LRO: Operation succeeded.")
+        return result.json()
+
+    async def _make_powerbi_request(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        method: str = "GET",
+        timeout: float = 120,
+    ) -> requests.Response:
+        """
+        Call the Power BI REST API in a worker thread.
+
+        The raw response is returned so callers can read status codes and
+        headers such as Location and Retry-After.
+        """
+        url = (
+            endpoint
+            if endpoint.startswith("http")
+            else f"{self.config.powerbi_url}/{endpoint.lstrip('/')}"
+        )
+        return await asyncio.to_thread(
+            requests.request,
+            method.upper(),
+            url,
+            headers=self._get_powerbi_headers(),
+            json=params,
+            timeout=timeout,
+        )
+
+    async def execute_dax_query(
+        self, workspace_id: str, dataset_id: str, query: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a DAX query against a semantic model with the executeQueries API.
+
+        Returns:
+            The rows of the first result table, as dictionaries keyed by column.
+        """
+        response = await self._make_powerbi_request(
+            f"groups/{workspace_id}/datasets/{dataset_id}/executeQueries",
+            {
+                "queries": [{"query": query}],
+                "serializerSettings": {"includeNulls": True},
+            },
+            method="POST",
+        )
+        data = response.json() if response.content else {}
+        error = data.get("error")
+        if not response.ok or error:
+            details = (error or {}).get("pbi.error", {}).get("details", [])
+            message = "; ".join(
+                d.get("detail", {}).get("value", "") for d in details
+            ) or (error or {}).get("message") or response.text
+            raise ValueError(f"DAX query failed ({response.status_code}): {message}")
+        result = data["results"][0]
+        if result.get("error"):
+            raise ValueError(f"DAX query failed: {result['error']}")
+        tables = result.get("tables") or [{}]
+        return tables[0].get("rows", [])
+
+    async def get_dataset_refreshes(
+        self, workspace_id: str, dataset_id: str, top: int = 1
+    ) -> Optional[List[Dict]]:
+        """Get the most recent refreshes of a semantic model (newest first)."""
+        response = await self._make_powerbi_request(
+            f"groups/{workspace_id}/datasets/{dataset_id}/refreshes?$top={top}"
+        )
+        if not response.ok:
+            logger.warning(
+                f"Could not get refresh history of {dataset_id}: {response.status_code}"
+            )
+            return None
+        return response.json().get("value", [])
+
+    async def start_dataset_refresh(
+        self, workspace_id: str, dataset_id: str, body: Dict[str, Any]
+    ) -> Tuple[str, Optional[float]]:
+        """
+        Start an enhanced refresh of a semantic model.
+
+        Returns:
+            The refresh request ID and the polling interval advised by the
+            server (Retry-After), if any.
+        """
+        response = await self._make_powerbi_request(
+            f"groups/{workspace_id}/datasets/{dataset_id}/refreshes",
+            body,
+            method="POST",
+        )
+        if response.status_code != 202:
+            raise ValueError(
+                f"Starting the refresh failed ({response.status_code}): {response.text}"
+            )
+        location = response.headers.get("Location", "")
+        request_id = location.rstrip("/").rsplit("/", 1)[-1] or response.headers.get(
+            "RequestId"
+        )
+        if not request_id:
+            raise ValueError("The refresh was accepted but no request ID was returned.")
+        retry_after = response.headers.get("Retry-After")
+        return request_id, float(retry_after) if retry_after else None
+
+    async def get_dataset_refresh(
+        self, workspace_id: str, dataset_id: str, request_id: str
+    ) -> Tuple[Dict, Optional[float]]:
+        """
+        Get the execution details of a semantic model refresh.
+
+        Returns:
+            The refresh details (status, per-object progress, messages) and the
+            polling interval advised by the server (Retry-After), if any.
+        """
+        response = await self._make_powerbi_request(
+            f"groups/{workspace_id}/datasets/{dataset_id}/refreshes/{request_id}",
+            timeout=60,
+        )
+        response.raise_for_status()
+        retry_after = response.headers.get("Retry-After")
+        return response.json(), float(retry_after) if retry_after else None
+
+    async def refresh_sql_endpoint_metadata(
+        self, workspace_id: str, sql_endpoint_id: str, timeout_minutes: int = 15
+    ) -> Optional[List[Dict]]:
+        """
+        Sync the metadata of a lakehouse SQL analytics endpoint with its Delta tables.
+
+        Returns:
+            The sync status of each table, or None if the operation failed.
+        """
+        result = await self._make_lro_request(
+            f"workspaces/{workspace_id}/sqlEndpoints/{sql_endpoint_id}/refreshMetadata",
+            {"timeout": {"timeUnit": "Minutes", "value": timeout_minutes}},
+            timeout=timeout_minutes * 60 + 60,
+        )
+        if result is None:
+            return None
+        return result.get("value", [])
+
+    async def get_item_version(
+        self, workspace_id: str, item_id: str, item_type: str
+    ) -> Optional[str]:
+        """
+        Get a value that changes whenever an item is modified.
+
+        Uses the ETag of the item, falling back to a last-modified field of the
+        item envelope. Returns None if neither is available.
+        """
+        url = self._build_url(f"workspaces/{workspace_id}/{item_type}s/{item_id}")
+        response = await asyncio.to_thread(
+            requests.get, url, headers=self._get_headers(), timeout=60
+        )
+        if not response.ok:
+            logger.warning(
+                f"Could not get the version of {item_type} {item_id} "
+                f"({response.status_code}); its definition is cached briefly"
+            )
+            return None
+        if response.headers.get("ETag"):
+            return response.headers["ETag"]
+        item = response.json()
+        for key in ("lastModifiedDateTime", "modifiedDateTime", "lastUpdatedDate"):
+            if item.get(key):
+                return str(item[key])
+        logger.info(
+            f"No ETag or modification time for {item_type} {item_id}; "
+            "its definition is cached briefly"
+        )
+        return None
+
+    async def get_item_definition(
+        self,
+        workspace_id: str,
+        item_id: str,
+        item_type: str,
+        format: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """Get the definition (base64 encoded parts) of an item with the getDefinition LRO."""
+        endpoint = f"workspaces/{workspace_id}/{item_type}s/{item_id}/getDefinition"
+        if format:
+            endpoint += f"?format={format}"
+        result = await self._make_lro_request(endpoint)
+        return (result or {}).get("definition")
+
     async def get_workspaces(self) -> List[Dict]:
         """Get all available workspaces"""
         return await self._make_request("workspaces", use_pagination=True)
@@ -0,0 +1,215 @@
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from urllib.parse import quote
+import base64
+import math
+import os
+import time
+import requests
+from azure.identity import DefaultAzureCredential
+from azure.storage.blob import BlobClient
+from helpers.utils.onelake_paths import parse_onelake_location
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+ONELAKE_DFS_URL = "https://onelake.dfs.fabric.microsoft.com"
+ONELAKE_BLOB_URL = "https://onelake.blob.fabric.microsoft.com"
+STORAGE_SCOPE = "https://storage.azure.com/.default"
+# API version of the ADLS Gen2 REST API used against OneLake.
+DFS_API_VERSION = "2023-11-03"
+
+# Block uploads: default block size and concurrency, and the Blob API's block limit.
+DEFAULT_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_UPLOAD_WORKERS = 8
+MAX_BLOCKS = 50_000
+
+
+class OneLakeClient:
+    """Client for the ADLS Gen2 compatible OneLake DFS endpoint"""
+
+    def __init__(
+        self,
+        credential=None,
+        base_url: str = ONELAKE_DFS_URL,
+        blob_url: str = ONELAKE_BLOB_URL,
+    ):
+        self.credential = credential or DefaultAzureCredential()
+        self.base_url = base_url.rstrip("/")
+        self.blob_url = blob_url.rstrip("/")
+        self._token = None
+
+    def _get_headers(self) -> Dict[str, str]:
+        """Get headers for OneLake calls, reusing the storage token until it nears expiry."""
+        if self._token is None or self._token.expires_on - 300 < time.time():
+            self._token = self.credential.get_token(STORAGE_SCOPE)
+        return {
+            "Authorization": f"Bearer {self._token.token}",
+            "x-ms-version": DFS_API_VERSION,
+        }
+
+    def _url(self, workspace: str, path: str = "") -> str:
+        url = f"{self.base_url}/{quote(workspace)}"
+        if path:
+            url += f"/{quote(path.strip('/'))}"
+        return url
+
+    def list_paths(
+        self,
+        workspace: str,
+        directory: str,
+        recursive: bool = False,
+        max_results: int = 5000,
+        continuation: Optional[str] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        List one page of paths under a directory.
+
+        Returns:
+            A tuple (paths, continuation_token); the token is None on the last page.
+        """
+        params = {
+            "resource": "filesystem",
+            "directory": directory.strip("/"),
+            "recursive": str(recursive).lower(),
+            "maxResults": max_results,
+        }
+        if continuation:
+            params["continuation"] = continuation
+        response = requests.get(
+            self._url(workspace),
+            headers=self._get_headers(),
+            params=params,
+            timeout=120,
+        )
+        response.raise_for_status()
+        return (
+            response.json().get("paths", []),
+            response.headers.get("x-ms-continuation") or None,
+        )
+
+    def iter_paths(
+        self, workspace: str, directory: str, recursive: bool = False
+    ) -> Iterator[Dict]:
+        """Iterate over all paths under a directory, following continuation tokens."""
+        continuation = None
+        while True:
+            paths, continuation = self.list_paths(
+                workspace, directory, recursive=recursive, continuation=continuation
+            )
+            yield from paths
+            if not continuation:
+                break
+
+    def get_properties(self, workspace: str, path: str) -> Optional[Dict]:
+        """
+        Get the system properties of a file or directory.
+
+        Returns:
+            A dictionary with name, isDirectory, contentLength, lastModified,
+            etag and contentType, or None if the path does not exist.
+        """
+        response = requests.head(
+            self._url(workspace, path), headers=self._get_headers(), timeout=120
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        headers = response.headers
+        return {
+            "name": path.strip("/"),
+            "isDirectory": headers.get("x-ms-resource-type") == "directory",
+            "contentLength": int(headers.get("Content-Length", 0)),
+            "lastModified": headers.get("Last-Modified"),
+            "etag": headers.get("ETag"),
+            "contentType": headers.get("Content-Type"),
+        }
+
+    def read_file(self, workspace: str, path: str) -> bytes:
+        """Download a (small) file."""
+        response = requests.get(
+            self._url(workspace, path), headers=self._get_headers(), timeout=120
+        )
+        response.raise_for_status()
+        return response.content
+
+    def upload_file(
+        self,
+        workspace: str,
+        path: str,
+        source_path: str,
+        chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE,
+        max_workers: int = DEFAULT_UPLOAD_WORKERS,
+        overwrite: bool = True,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict:
+        """
+        Upload a local file with concurrent block uploads through the Blob endpoint.
+
+        The file is split into blocks that are staged in parallel, each worker
+        reading only its own block, and the block list is committed at the end.
+        Nothing is visible at the destination until the commit succeeds.
+
+        Args:
+            workspace: Workspace name or ID.
+            path: Destination path inside the workspace, e.g. '<lakehouse_id>/Files/raw/data.csv'.
+            source_path: Local file to upload.
+            chunk_size: Block size in bytes (raised if the file would exceed the block limit).
+            max_workers: Maximum number of blocks uploaded concurrently.
+            overwrite: Replace an existing file at the destination.
+            progress: Called with (blocks_done, blocks_total) after each block (optional).
+
+        Returns:
+            A dictionary with the destination, bytes, blocks, block size and elapsed seconds.
+        """
+        size = os.path.getsize(source_path)
+        chunk_size = max(chunk_size, math.ceil(size / MAX_BLOCKS), 1)
+        blob = BlobClient(
+            self.blob_url,
+            container_name=workspace,
+            blob_name=path.strip("/"),
+            credential=self.credential,
+        )
+        if not overwrite and blob.exists():
+            raise FileExistsError(f"File already exists: {path}")
+
+        start = time.perf_counter()
+        offsets = list(range(0, size, chunk_size))
+        block_ids = [
+            base64.b64encode(f"{i:08d}".encode()).decode() for i in range(len(offsets))
+        ]
+        done = 0
+        lock = Lock()
+
+        def stage(index: int):
+            nonlocal done
+            with open(source_path, "rb") as f:
+                f.seek(offsets[index])
+                data = f.read(chunk_size)
+            blob.stage_block(block_ids[index], data, length=len(data))
+            with lock:
+                done += 1
+                completed = done
+            if progress is not None:
+                progress(completed, len(offsets))
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="onelake-upload"
+        ) as executor:
+            # list() re-raises the first failed block
+            list(executor.map(stage, range(len(offsets))))
+        blob.commit_block_list(block_ids)
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Uploaded {size} bytes to {workspace}/{path} in {len(offsets)} blocks "
+            f"in {elapsed:.1f}s"
+        )
+        return {
+            "path": path,
+            "bytes": size,
+            "blocks": len(offsets),
+            "block_size": chunk_size,
+            "seconds": elapsed,
+        }
@@ -1,8 +1,19 @@
 from helpers.logging_config import get_logger
 from helpers.clients.fabric_client import FabricApiClient
+from helpers.utils.item_definition import ItemDefinition, get_cached_definition
+from helpers.utils.report_index import ReportIndex
+from cachetools import LRUCache
+from typing import Dict, List, Optional
+import asyncio
 
 logger = get_logger(__name__)
 
+# Parsed report indexes keyed by (workspace, report, definition version)
+_index_cache = LRUCache(maxsize=128)
+
+# Report definitions fetched concurrently by cross-report searches
+DEFAULT_SEARCH_CONCURRENCY = 4
+
 
 class ReportClient:
     def __init__(self, client: FabricApiClient):
@@ -27,3 +38,100 @@ class ReportClient:
             )
 
         return report
+
+    async def get_report_definition(
+        self, workspace_id: str, report_id: str, refresh: bool = False
+    ) -> Optional[ItemDefinition]:
+        """
+        Get the definition of a report, cached by the report's ETag or last modification.
+
+        Parts are decoded only when accessed.
+        """
+        version = await self.client.get_item_version(workspace_id, report_id, "report")
+        return await self._get_definition(workspace_id, report_id, version, refresh)
+
+    async def _get_definition(
+        self, workspace_id: str, report_id: str, version: Optional[str], refresh: bool
+    ) -> Optional[ItemDefinition]:
+        return await get_cached_definition(
+            (workspace_id, report_id, "report"),
+            version,
+            lambda: self.client.get_item_definition(workspace_id, report_id, "report"),
+            refresh=refresh,
+        )
+
+    async def get_report_index(
+        self, workspace_id: str, report_id: str, refresh: bool = False
+    ) -> Optional[ReportIndex]:
+        """
+        Get the (cached) index of a report's pages, visuals and bound fields.
+
+        Indexes are looked up by report version before any definition is
+        fetched. Without a version, the index is rebuilt from the short-lived
+        definition cache.
+        """
+        workspace_id = await self.client.resolve_workspace(workspace_id)
+        version = await self.client.get_item_version(workspace_id, report_id, "report")
+        key = (workspace_id, report_id, version)
+        if version is not None and not refresh and key in _index_cache:
+            return _index_cache[key]
+        definition = await self._get_definition(
+            workspace_id, report_id, version, refresh
+        )
+        if definition is None:
+            return None
+        index = ReportIndex.from_definition(definition)
+        if version is not None:
+            # Drop indexes of older versions of the report
+            for old in [k for k in _index_cache if k[:2] == key[:2]]:
+                _index_cache.pop(old, None)
+            _index_cache[key] = index
+        return index
+
+    async def find_visuals(
+        self,
+        workspace_id: str,
+        field: str,
+        table: Optional[str] = None,
+        report_ids: Optional[List[str]] = None,
+        max_concurrency: int = DEFAULT_SEARCH_CONCURRENCY,
+    ) -> Dict:
+        """
+        Find the visuals bound to a field across the reports of a workspace.
+
+        Report indexes are built concurrently and cached per report version, so
+        repeated searches only check whether each report has changed.
+
+        Returns:
+            A dictionary with the matching visuals (with report ID and name),
+            the number of reports searched and the reports that could not be read.
+        """
+        workspace_id = await self.client.resolve_workspace(workspace_id)
+        reports = await self.client.get_reports(workspace_id) or []
+        names = {r["id"]: r.get("displayName") for r in reports}
+        if report_ids:
+            names = {rid: names.get(rid, rid) for rid in report_ids}
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def search(report_id: str):
+            async with semaphore:
+                try:
+                    index = await self.get_report_index(workspace_id, report_id)
+                except Exception as e:
+                    logger.warning(f"Could not index report {report_id}: {str(e)}")
+                    return report_id, None
+            if index is None:
+                return report_id, None
+            return report_id, index.find_visuals(field, table)
+
+        results = await asyncio.gather(*(search(rid) for rid in names))
+        matches = [
+            {**visual, "reportId": report_id, "report": names[report_id]}
+            for report_id, visuals in results
+            for visual in visuals or []
+        ]
+        return {
+            "visuals": matches,
+            "searched": len(names),
+            "failed": [names[rid] for rid, visuals in results if visuals is None],
+        }
@@ -1,8 +1,30 @@
 from helpers.logging_config import get_logger
 from helpers.clients.fabric_client import FabricApiClient
+from helpers.utils.item_definition import ItemDefinition, get_cached_definition
+from helpers.utils.semantic_model_index import SemanticModelIndex
+from helpers.utils.dax_query import (
+    DEFAULT_MAX_ROWS,
+    MAX_API_ROWS,
+    cache_result,
+    get_cached_result,
+    limit_query,
+    refresh_marker,
+    rows_to_frame,
+)
+from helpers.utils.refresh_tracker import (
+    describe_refresh,
+    get_refresh_state,
+    refresh_objects,
+    track_refresh,
+)
+from cachetools import LRUCache
+from typing import Dict, List, Optional
 
 logger = get_logger(__name__)
 
+# Parsed model indexes keyed by (workspace, model, definition version)
+_index_cache = LRUCache(maxsize=32)
+
 
 class SemanticModelClient:
     def __init__(self, client: FabricApiClient):
@@ -26,6 +48,224 @@ class SemanticModelClient:
 
         return model
 
+    async def get_model_definition(
+        self,
+        workspace_id: str,
+        model_id: str,
+        format: str = "TMDL",
+        refresh: bool = False,
+    ) -> Optional[ItemDefinition]:
+        """
+        Get the definition of a semantic model, cached by the model's ETag or last modification.
+
+        Parts are decoded only when accessed.
+        """
+        workspace_id = await self.client.resolve_workspace(workspace_id)
+        version = await self.client.get_item_version(
+            workspace_id, model_id, "semanticModel"
+        )
+        return await self._get_definition(workspace_id, model_id, format, version, refresh)
+
+    async def _get_definition(
+        self,
+        workspace_id: str,
+        model_id: str,
+        format: str,
+        version: Optional[str],
+        refresh: bool,
+    ) -> Optional[ItemDefinition]:
+        return await get_cached_definition(
+            (workspace_id, model_id, format),
+            version,
+            lambda: self.client.get_item_definition(
+                workspace_id, model_id, "semanticModel", format=format
+            ),
+            refresh=refresh,
+        )
+
+    async def get_model_index(
+        self, workspace_id: str, model_id: str, refresh: bool = False
+    ) -> Optional[SemanticModelIndex]:
+        """
+        Get the (cached) index of a model's tables, columns, measures and relationships.
+
+        Indexes are looked up by model version before any definition is
+        fetched. Without a version, the index is rebuilt from the short-lived
+        definition cache.
+        """
+        workspace_id = await self.client.resolve_workspace(workspace_id)
+        version = await self.client.get_item_version(
+            workspace_id, model_id, "semanticModel"
+        )
+        key = (workspace_id, model_id, version)
+        if version is not None and not refresh and key in _index_cache:
+            return _index_cache[key]
+        definition = await self._get_definition(
+            workspace_id, model_id, "TMDL", version, refresh
+        )
+        if definition is None:
+            return None
+        index = SemanticModelIndex.from_definition(definition)
+        if version is not None:
+            # Drop indexes of older versions of the model
+            for old in [k for k in _index_cache if k[:2] == key[:2]]:
+                _index_cache.pop(old, None)
+            _index_cache[key] = index
+        return index
+
+    async def search_model(
+        self,
+        workspace_id: str,
+        model_id: str,
+        text: str,
+        kind: str = "all",
+        in_expressions: bool = False,
+    ) -> Dict[str, List[Dict]]:
+        """
+        Search a model's index by name substring.
+
+        Args:
+            kind: 'all', 'tables', 'columns', 'measures' or 'relationships'.
+            in_expressions: Also match measure DAX expressions.
+
+        Returns:
+            A dictionary of matching objects per kind.
+        """
+        index = await self.get_model_index(workspace_id, model_id)
+        if index is None:
+            raise ValueError(f"Could not retrieve the definition of semantic model '{model_id}'.")
+        results = {}
+        if kind in ("all", "tables"):
+            results["tables"] = index.find_tables(text)
+        if kind in ("all", "columns"):
+            results["columns"] = index.find_columns(text)
+        if kind in ("all", "measures"):
+            results["measures"] = index.find_measures(text, in_expressions)
+        if kind in ("all", "relationships"):
+            results["relationships"] = index.relationships_for(text)
+        return results
+
+    async def run_dax_query(
+        self,
+        workspace_id: str,
+        model_id: str,
+        query: str,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        refresh: bool = False,
+    ) -> Dict:
+        """
+        Run a DAX query and return its result as a polars DataFrame.
+
+        At most max_rows rows are returned; simple queries are limited on the
+        server. Results are cached until the model is refreshed.
+
+        Returns:
+            A dictionary with the result 'frame', whether it was 'truncated',
+            whether it came from the cache and the refresh it reflects.
+        """
+        if not 0 < max_rows <= MAX_API_ROWS:
+            raise ValueError(f"max_rows must be between 1 and {MAX_API_ROWS}.")
+        workspace_id = await self.client.resolve_workspace(workspace_id)
+        marker = refresh_marker(
+            await self.client.get_dataset_refreshes(workspace_id, model_id)
+        )
+        key = (workspace_id, model_id, query.strip(), max_rows, marker)
+        if marker is not None and not refresh:
+            cached = get_cached_result(key)
+            if cached is not None:
+                logger.debug(f"DAX query cache hit for model {model_id}")
+                return {**cached, "cached": True}
+
+        rows = await self.client.execute_dax_query(
+            workspace_id, model_id, limit_query(query, max_rows)
+        )
+        frame = rows_to_frame(rows)
+        # The API stops at MAX_API_ROWS, so a full page may hide more rows
+        truncated = frame.height > max_rows or frame.height >= MAX_API_ROWS
+        if truncated:
+            frame = frame.head(max_rows)
+        result = {"frame": frame, "truncated": truncated, "refreshed": marker}
+        logger.info(f"DAX query on model {model_id} returned {frame.height} rows")
+        if marker is not None:
+            cache_result(key, result)
+        return {**result, "cached": False}
+
+    async def start_refresh(
+        self,
+        workspace_id: str,
+        model_id: str,
+        tables: Optional[List[str]] = None,
+        partitions: Optional[Dict[str, List[str]]] = None,
+        refresh_type: str = "full",
+        commit_mode: str = "transactional",
+        max_parallelism: Optional[int] = None,
+    ) -> Dict:
+        """
+        Start a refresh of a semantic model and track it in the background.
+
+        Args:
+            tables: Tables to refresh (all tables when neither tables nor partitions are given).
+            partitions: Table name -> partition names to refresh.
+            refresh_type: 'full', 'clearValues', 'calculate', 'dataOnly', 'automatic' or 'defragment'.
+            commit_mode: 'transactional' or 'partialBatch'.
+            max_parallelism: Maximum number of objects processed in parallel.
+
+        Returns:
+            The tracked refresh state; its 'handle' identifies the refresh.
+        """
+        workspace_id = await self.client.resolve_workspace(workspace_id)
+        objects = refresh_objects(tables, partitions)
+        body = {"type": refresh_type, "commitMode": commit_mode, "retryCount": 0}
+        if objects:
+            body["objects"] = objects
+        if max_parallelism:
+            body["maxParallelism"] = max_parallelism
+        request_id, interval = await self.client.start_dataset_refresh(
+            workspace_id, model_id, body
+        )
+        logger.info(f"Started refresh {request_id} of semantic model {model_id}")
+        return track_refresh(
+            request_id,
+            {
+                "workspaceId": workspace_id,
+                "modelId": model_id,
+                "type": refresh_type,
+                "objects": objects,
+            },
+            lambda: self.client.get_dataset_refresh(workspace_id, model_id, request_id),
+            interval,
+        )
+
+    async def get_refresh_status(
+        self,
+        handle: str,
+        workspace_id: Optional[str] = None,
+        model_id: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """
+        Get the progress of a refresh.
+
+        Refreshes started by start_refresh are reported from their background
+        tracker; other refreshes are looked up once when the model is given.
+        """
+        state = get_refresh_state(handle)
+        if state is not None or not model_id:
+            return state
+        workspace_id = await self.client.resolve_workspace(workspace_id)
+        details, _ = await self.client.get_dataset_refresh(
+            workspace_id, model_id, handle
+        )
+        return describe_refresh(
+            details,
+            {
+                "handle": handle,
+                "workspaceId": workspace_id,
+                "modelId": model_id,
+                "type": details.get("type"),
+                "objects": [],
+            },
+        )
+
     # async def get_model_schema(
     #     self,
     #     workspace: str,
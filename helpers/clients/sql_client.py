@@ -1,11 +1,25 @@
 import polars as pl
 from sqlalchemy import create_engine, Engine
 from itertools import chain, repeat
+import asyncio
+import time
 import urllib
 import struct
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from azure.identity import DefaultAzureCredential
-from helpers.clients import FabricApiClient, LakehouseClient, WarehouseClient
+from cachetools import TTLCache
+from helpers.clients import FabricApiClient, LakehouseClient, WarehouseClient, TableClient
+from helpers.utils.result_store import new_result_path, write_batches
+from helpers.utils.profiling import QueryProfile
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Resolved (database, SQL endpoint) pairs keyed by the lower-cased
+# (workspace, lakehouse, warehouse, type) they were requested with.
+_endpoint_cache = TTLCache(maxsize=128, ttl=600)
+# Metadata syncs in progress per (workspace, SQL endpoint), shared by callers
+_metadata_refreshes: Dict[Tuple[str, str], asyncio.Task] = {}
 
 
 # prepare connection string
@@ -14,7 +28,12 @@ database = "EDR_WAREHOUSE"
 DRIVER = "{{ODBC Driver 18 for SQL Server}}"
 
 
-def get_sqlalchemy_connection_string(driver: str, server: str, database: str) -> Engine:
+def get_sqlalchemy_connection_string(
+    driver: str,
+    server: str,
+    database: str,
+    profile: Optional[QueryProfile] = None,
+) -> Engine:
     """
     Constructs a SQLAlchemy connection string based on the provided parameters.
 
@@ -22,16 +41,19 @@ def get_sqlalchemy_connection_string(driver: str, server: str, database: str) ->
         driver (str): The database driver (e.g., 'mssql+pyodbc').
         server (str): The server address.
         database (str): The database name.
+        profile (QueryProfile): Records the token fetch and engine setup timings (optional).
 
     Returns:
         Engine: A SQLAlchemy engine object.
     """
-    connection_string = f"Driver={{ODBC Driver 18 for SQL Server}};Server={sql_endpoint},1433;Database={database};Encrypt=Yes;TrustServerCertificate=No"
+    profile = profile or QueryProfile("get_sqlalchemy_connection_string")
+    connection_string = f"Driver={{ODBC Driver 18 for SQL Server}};Server={server},1433;Database={database};Encrypt=Yes;TrustServerCertificate=No"
     params = urllib.parse.quote(connection_string)
     # authentication
     resource_url = "https://database.windows.net/.default"
-    azure_credentials = DefaultAzureCredential()
-    token_object = azure_credentials.get_token(resource_url)
+    with profile.stage("token_fetch"):
+        azure_credentials = DefaultAzureCredential()
+        token_object = azure_credentials.get_token(resource_url)
     # Retrieve an access token
     token_as_bytes = bytes(
         token_object.token, "UTF-8"
@@ -47,10 +69,11 @@ def get_sqlalchemy_connection_string(driver: str, server: str, database: str) ->
     }  # Attribute pointing to SQL_COPT_SS_ACCESS_TOKEN to pass access token to the driver
 
     # build the connection
-    engine = create_engine(
-        "mssql+pyodbc:///?odbc_connect={0}".format(params),
-        connect_args={"attrs_before": attrs_before},
-    )
+    with profile.stage("engine_create"):
+        engine = create_engine(
+            "mssql+pyodbc:///?odbc_connect={0}".format(params),
+            connect_args={"attrs_before": attrs_before},
+        )
     return engine
 
 
@@ -59,6 +82,7 @@ async def get_sql_endpoint(
     lakehouse: Optional[str] = None,
     warehouse: Optional[str] = None,
     type: str = None,
+    profile: Optional[QueryProfile] = None,
 ) -> tuple:
     """
     Retrieve the SQL endpoint for a specified lakehouse or warehouse.
@@ -68,9 +92,127 @@ async def get_sql_endpoint(
         warehouse: Name or ID of the warehouse (optional).
         type: Type of resource ('lakehouse' or 'warehouse').
         workspace: Name or ID of the workspace (optional).
+        profile: Records the endpoint resolution timing (optional).
     Returns:
         A tuple (database, sql_endpoint) or (None, error_message) in case of error.
     """
+    profile = profile or QueryProfile("get_sql_endpoint")
+    key = tuple((v or "").lower() for v in (workspace, lakehouse, warehouse, type))
+    with profile.stage("endpoint_resolution"):
+        if key in _endpoint_cache:
+            return _endpoint_cache[key]
+        database, endpoint = await _resolve_sql_endpoint(
+            workspace, lakehouse, warehouse, type
+        )
+        if database:
+            # Errors are not cached
+            _endpoint_cache[key] = (database, endpoint)
+        return database, endpoint
+
+
+def invalidate_sql_endpoint_cache(*resources: str):
+    """Drop cached endpoints resolved for any of the given lakehouse or warehouse names or IDs."""
+    resources = {r.lower() for r in resources if r}
+    for key in [k for k in _endpoint_cache if k[1] in resources or k[2] in resources]:
+        _endpoint_cache.pop(key, None)
+
+
+async def refresh_sql_endpoint_metadata(
+    workspace: str,
+    lakehouse: str,
+    tables: Optional[List[str]] = None,
+    timeout_minutes: int = 15,
+) -> Dict:
+    """
+    Sync a lakehouse SQL analytics endpoint with its Delta tables and wait for it.
+
+    The service syncs the whole endpoint in one long-running operation, so a
+    caller joins a sync already in progress for the same endpoint instead of
+    starting another. Once the sync completes, the cached endpoint and table
+    index of the lakehouse are invalidated so queries see the new tables.
+
+    Args:
+        workspace: Name or ID of the workspace.
+        lakehouse: Name or ID of the lakehouse.
+        tables: Tables whose sync status is reported (all tables when omitted).
+        timeout_minutes: Maximum duration of the sync.
+
+    Returns:
+        A dictionary with the SQL endpoint ID, the status of the requested
+        tables, the tables that failed and the time waited.
+    """
+    fab_client = FabricApiClient(DefaultAzureCredential())
+    _, workspace_id = await fab_client.resolve_workspace_name_and_id(workspace)
+    workspace_id = str(workspace_id)
+    lakehouse_id = str(
+        await fab_client.resolve_item_id(
+            item=lakehouse, type="Lakehouse", workspace=workspace_id
+        )
+    )
+    lakehouse_obj = await fab_client.get_item(
+        item_id=lakehouse_id, workspace_id=workspace_id, item_type="lakehouse"
+    )
+    endpoint_id = (
+        (lakehouse_obj or {})
+        .get("properties", {})
+        .get("sqlEndpointProperties", {})
+        .get("id")
+    )
+    if not endpoint_id:
+        raise ValueError(f"No SQL endpoint found for lakehouse '{lakehouse}'.")
+
+    key = (workspace_id, endpoint_id)
+    task = _metadata_refreshes.get(key)
+    shared = task is not None
+    if task is None:
+
+        async def sync():
+            try:
+                return await fab_client.refresh_sql_endpoint_metadata(
+                    workspace_id, endpoint_id, timeout_minutes
+                )
+            finally:
+                invalidate_sql_endpoint_cache(lakehouse, lakehouse_id)
+                table_client = TableClient(fab_client)
+                table_client.invalidate_table_index(workspace_id, lakehouse_id)
+                table_client.invalidate_table_index(workspace, lakehouse)
+
+        task = asyncio.ensure_future(sync())
+        _metadata_refreshes[key] = task
+        task.add_done_callback(lambda _: _metadata_refreshes.pop(key, None))
+    else:
+        logger.info(f"Joining metadata sync in progress for SQL endpoint {endpoint_id}")
+
+    start = time.monotonic()
+    statuses = await asyncio.shield(task)
+    if statuses is None:
+        raise ValueError(f"Metadata sync of SQL endpoint {endpoint_id} failed.")
+
+    by_name = {s.get("tableName", "").lower(): s for s in statuses}
+    if tables:
+        selected = [
+            by_name.get(t.lower(), {"tableName": t, "status": "NotFound"})
+            for t in tables
+        ]
+    else:
+        selected = statuses
+    return {
+        "sqlEndpointId": endpoint_id,
+        "tables": selected,
+        "failed": [
+            s["tableName"] for s in selected if s.get("status") in ("Failure", "NotFound")
+        ],
+        "shared": shared,
+        "seconds": round(time.monotonic() - start, 1),
+    }
+
+
+async def _resolve_sql_endpoint(
+    workspace: Optional[str],
+    lakehouse: Optional[str],
+    warehouse: Optional[str],
+    type: Optional[str],
+) -> tuple:
     try:
         credential = DefaultAzureCredential()
         fabClient = FabricApiClient(credential)
@@ -113,11 +255,69 @@ async def get_sql_endpoint(
 
 
 class SQLClient:
-    def __init__(self, sql_endpoint: str, database: str):
-        self.engine = get_sqlalchemy_connection_string(DRIVER, sql_endpoint, database)
+    def __init__(
+        self,
+        sql_endpoint: str,
+        database: str,
+        profile: Optional[QueryProfile] = None,
+    ):
+        self.profile = profile or QueryProfile()
+        self.engine = get_sqlalchemy_connection_string(
+            DRIVER, sql_endpoint, database, profile=self.profile
+        )
+
+    def _connect(self):
+        """Open a connection; the first one pays the ODBC login and token handshake."""
+        with self.profile.stage("odbc_login"):
+            return self.engine.connect()
+
+    def run_query(self, query: str, batch_size: int = 100_000) -> pl.DataFrame:
+        """Run a query, timing server execution (first batch) and fetch separately."""
+        with self._connect() as connection:
+            with self.profile.stage("server_execution"):
+                batches = pl.read_database(
+                    query,
+                    connection=connection,
+                    iter_batches=True,
+                    batch_size=batch_size,
+                )
+                first = next(batches, None)
+            with self.profile.stage("fetch"):
+                frames = [first, *batches] if first is not None else []
+                df = (
+                    pl.concat(frames, how="vertical_relaxed")
+                    if frames
+                    else pl.DataFrame()
+                )
+        self.profile.rows = df.height
+        self.profile.bytes = df.estimated_size()
+        return df
+
+    def iter_query(self, query: str, batch_size: int = 50_000) -> Iterator[pl.DataFrame]:
+        """Run a query and yield the result in DataFrame batches as rows are fetched."""
+        with self._connect() as connection:
+            yield from pl.read_database(
+                query, connection=connection, iter_batches=True, batch_size=batch_size
+            )
+
+    def spill_query(
+        self,
+        query: str,
+        fmt: str = "parquet",
+        path: Optional[str] = None,
+        batch_size: int = 50_000,
+    ) -> dict:
+        """Stream a query result into a local Parquet or Arrow IPC file.
 
-    def run_query(self, query: str) -> pl.DataFrame:
-        return pl.read_database(query, connection=self.engine)
+        Returns:
+            A dictionary with the file path, row count, size and schema summary.
+        """
+        path = path or new_result_path(fmt)
+        with self.profile.stage("fetch_and_write"):
+            summary = write_batches(self.iter_query(query, batch_size), path, fmt)
+        self.profile.rows = summary["rows"]
+        self.profile.bytes = summary["bytes"]
+        return summary
 
     def load_data(self, df: pl.DataFrame, table_name: str, if_exists: str = "append"):
         pdf = df.to_pandas()
@@ -1,27 +1,158 @@
 from helpers.logging_config import get_logger
 from helpers.clients.fabric_client import FabricApiClient
-from helpers.utils.table_tools import get_delta_schemas
+from helpers.utils.table_tools import (
+    get_delta_schemas,
+    get_storage_options,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_TABLE_TIMEOUT,
+)
+from helpers.utils.local_query import (
+    build_local_query,
+    collect_streaming,
+    referenced_tables,
+)
+from helpers.utils.result_store import new_result_path, sink_lazy_result
+from helpers.utils.delta_stats import (
+    open_delta_table,
+    compute_table_stats,
+    compute_table_layout,
+    DEFAULT_TARGET_FILE_SIZE,
+)
+from helpers.formatters.stats_formatter import (
+    format_table_stats_to_markdown,
+    format_table_layout_to_markdown,
+)
+from helpers.utils.delta_preview import read_preview
+from helpers.utils.delta_maintenance import (
+    optimize_delta_table,
+    vacuum_delta_table,
+    DEFAULT_RETENTION_HOURS,
+)
+from helpers.formatters.maintenance_formatter import format_maintenance_to_markdown
+from helpers.utils.delta_history import get_commit_history, open_table_at
+from helpers.formatters.history_formatter import format_history_to_markdown
+from helpers.clients.onelake_client import OneLakeClient
+import polars as pl
+import asyncio
+from deltalake import DeltaTable
 from azure.identity import DefaultAzureCredential
+from mcp.server.fastmcp import Context
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from helpers.formatters.schema_formatter import format_schema_to_markdown
+from helpers.utils import _is_valid_uuid
+from cachetools import LRUCache, TTLCache
 from datetime import datetime
 
 logger = get_logger(__name__)
 
+ONELAKE_TABLE_LOCATION = (
+    "abfss://{workspace_id}@onelake.dfs.fabric.microsoft.com/{rsc_id}/Tables/{table_name}"
+)
+
+# Table index per (workspace, resource type, resource): lower-cased name -> table record
+_table_index = TTLCache(maxsize=256, ttl=300)
+
+# Rendered schema markdown keyed by (table location, Delta version)
+_markdown_cache = LRUCache(maxsize=1024)
+
+
+def _schema_markdown(table_info, schema, metadata) -> str:
+    """Format a table schema, reusing the rendering while its version is unchanged."""
+    key = (table_info["location"], table_info.get("version"))
+    if key[1] is None:
+        return format_schema_to_markdown(table_info, schema, metadata)
+    if key not in _markdown_cache:
+        _markdown_cache[key] = format_schema_to_markdown(table_info, schema, metadata)
+    return _markdown_cache[key]
+
 
 class TableClient:
     def __init__(self, client: FabricApiClient):
         self.client = client
 
+    async def get_table_index(
+        self,
+        workspace_id: str,
+        rsc_id: str,
+        rsc_type: str = "lakehouse",
+        refresh: bool = False,
+    ) -> Dict[str, Dict]:
+        """Get the (cached) index of tables in a lakehouse, keyed by lower-cased name."""
+        key = (workspace_id.lower(), rsc_type.lower(), rsc_id.lower())
+        if not refresh and key in _table_index:
+            return _table_index[key]
+
+        tables = await self.client.get_tables(workspace_id, rsc_id, rsc_type)
+        index = {t["name"].lower(): t for t in tables or []}
+        if tables is not None:
+            # Failed listings are not cached
+            _table_index[key] = index
+        return index
+
+    def invalidate_table_index(
+        self, workspace_id: str, rsc_id: str, rsc_type: str = "lakehouse"
+    ):
+        """Drop the cached table index of a lakehouse."""
+        _table_index.pop((workspace_id.lower(), rsc_type.lower(), rsc_id.lower()), None)
+
     async def list_tables(
         self, workspace_id: str, rsc_id: str, rsc_type: str = "lakehouse"
     ):
         """List all tables in a lakehouse."""
-        tables = await self.client.get_tables(workspace_id, rsc_id, rsc_type)
+        index = await self.get_table_index(workspace_id, rsc_id, rsc_type)
 
-        if not tables:
+        if not index:
             return f"No tables found in {rsc_type} '{rsc_id}'."
 
-        return tables
+        return list(index.values())
+
+    async def _resolve_ids(self, workspace: str, rsc_id: str, rsc_type: str):
+        """Resolve workspace and resource names to IDs (IDs are returned as-is)."""
+        if _is_valid_uuid(workspace):
+            workspace_id = workspace
+        else:
+            _, workspace_id = await self.client.resolve_workspace_name_and_id(workspace)
+        if not _is_valid_uuid(rsc_id):
+            rsc_id = await self.client.resolve_item_id(
+                item=rsc_id, type=rsc_type.capitalize(), workspace=workspace_id
+            )
+        return workspace_id, rsc_id
+
+    async def get_table(
+        self,
+        workspace: str,
+        rsc_id: str,
+        rsc_type: str,
+        table_name: str,
+    ) -> Optional[Dict]:
+        """
+        Get the record (name, location, format) of a single table.
+
+        Uses the cached table index when it is warm. Otherwise the OneLake location
+        of a lakehouse table is built directly from the workspace and lakehouse IDs,
+        so the lookup does not list the whole lakehouse. Such records are marked
+        with "inferred": True.
+        """
+        key = (workspace.lower(), rsc_type.lower(), rsc_id.lower())
+        if key in _table_index:
+            return _table_index[key].get(table_name.lower())
+
+        if rsc_type.lower() == "lakehouse":
+            workspace_id, lakehouse_id = await self._resolve_ids(
+                workspace, rsc_id, rsc_type
+            )
+            return {
+                "name": table_name,
+                "type": "Managed",
+                "location": ONELAKE_TABLE_LOCATION.format(
+                    workspace_id=workspace_id, rsc_id=lakehouse_id, table_name=table_name
+                ),
+                "format": "delta",
+                "inferred": True,
+            }
+
+        index = await self.get_table_index(workspace, rsc_id, rsc_type)
+        return index.get(table_name.lower())
 
     async def get_table_schema(
         self,
@@ -33,38 +164,337 @@ class TableClient:
     ):
         """Retrieve schema for a specific table."""
 
-        tables = await self.list_tables(workspace, rsc_id, rsc_type)
-
-        # Find the specific table
-        matching_tables = [t for t in tables if t["name"].lower() == table_name.lower()]
+        table = await self.get_table(workspace, rsc_id, rsc_type, table_name)
 
-        if not matching_tables:
+        if not table:
             return f"No table found with name '{table_name}' in {rsc_type} '{rsc_id}'."
 
-        table = matching_tables[0]
-
         # Check that it is a Delta table
         if table["format"].lower() != "delta":
             return f"The table '{table_name}' is not a Delta table (format: {table['format']})."
 
         # Get schema
-        delta_tables = await get_delta_schemas([table], credential)
+        delta_tables = await get_delta_schemas([table], credential, metadata_only=True)
+
+        if not delta_tables and table.get("inferred"):
+            # The direct path did not resolve; fall back to the table listing.
+            index = await self.get_table_index(workspace, rsc_id, rsc_type)
+            table = index.get(table_name.lower())
+            if not table:
+                return f"No table found with name '{table_name}' in {rsc_type} '{rsc_id}'."
+            if table["format"].lower() != "delta":
+                return f"The table '{table_name}' is not a Delta table (format: {table['format']})."
+            delta_tables = await get_delta_schemas(
+                [table], credential, metadata_only=True
+            )
 
         if not delta_tables:
             return f"Could not retrieve schema for table '{table['name']}'."
 
         # Format result as markdown
         table_info, schema, metadata = delta_tables[0]
-        markdown = format_schema_to_markdown(table_info, schema, metadata)
+        markdown = _schema_markdown(table_info, schema, metadata)
+
+        return markdown
+
+    async def _resolve_delta_table(
+        self,
+        workspace: str,
+        rsc_id: str,
+        rsc_type: str,
+        table_name: str,
+        storage_options: Dict,
+    ) -> Optional[Dict]:
+        """
+        Get the record of a table whose location is known to exist.
+
+        An inferred OneLake path is checked for a Delta log first; when there is
+        none (misspelled name, different case), the table listing is used to
+        find the real table.
+        """
+        table = await self.get_table(workspace, rsc_id, rsc_type, table_name)
+        if table and table.get("inferred"):
+            exists = await asyncio.to_thread(
+                DeltaTable.is_deltatable, table["location"], storage_options
+            )
+            if not exists:
+                logger.debug(f"No Delta table at inferred path for '{table_name}'")
+                index = await self.get_table_index(workspace, rsc_id, rsc_type)
+                table = index.get(table_name.lower())
+        return table
+
+    async def _with_delta_table(
+        self,
+        workspace: str,
+        rsc_id: str,
+        rsc_type: str,
+        table_name: str,
+        credential: DefaultAzureCredential,
+        func: Callable[[Dict, Dict], Any],
+    ) -> Union[Tuple[Dict, Any], str]:
+        """
+        Resolve a Delta table and run a blocking function on it in a worker thread.
+
+        func receives the table record and the storage options, and runs once;
+        its errors are raised to the caller.
+
+        Returns:
+            A tuple (table, result) or an error message.
+        """
+        storage_options = get_storage_options(credential)
+        table = await self._resolve_delta_table(
+            workspace, rsc_id, rsc_type, table_name, storage_options
+        )
+        if not table:
+            return f"No table found with name '{table_name}' in {rsc_type} '{rsc_id}'."
+        if table["format"].lower() != "delta":
+            return f"The table '{table_name}' is not a Delta table (format: {table['format']})."
+        return table, await asyncio.to_thread(func, table, storage_options)
+
+    async def get_table_location(
+        self, workspace: str, lakehouse: str, table_name: str
+    ) -> Tuple[str, str, str]:
+        """
+        Build the OneLake location of a (possibly not yet existing) lakehouse table.
+
+        Returns:
+            A tuple (workspace_id, lakehouse_id, location).
+        """
+        workspace_id, lakehouse_id = await self._resolve_ids(
+            workspace, lakehouse, "lakehouse"
+        )
+        location = ONELAKE_TABLE_LOCATION.format(
+            workspace_id=workspace_id, rsc_id=lakehouse_id, table_name=table_name
+        )
+        return workspace_id, lakehouse_id, location
+
+    async def write_table(
+        self,
+        workspace: str,
+        lakehouse: str,
+        table_name: str,
+        write: Callable[[str, Dict], Any],
+        credential: DefaultAzureCredential,
+    ) -> Any:
+        """
+        Run a blocking Delta write against a lakehouse table in a worker thread.
+
+        write receives the table location and the storage options. The table
+        index of the lakehouse is invalidated afterwards, since the write may
+        have created the table.
+        """
+        workspace_id, lakehouse_id, location = await self.get_table_location(
+            workspace, lakehouse, table_name
+        )
+        storage_options = get_storage_options(credential)
+        try:
+            return await asyncio.to_thread(write, location, storage_options)
+        finally:
+            self.invalidate_table_index(workspace_id, lakehouse_id)
+            self.invalidate_table_index(workspace, lakehouse)
+
+    async def get_table_stats(
+        self,
+        workspace: str,
+        rsc_id: str,
+        rsc_type: str,
+        table_name: str,
+        credential: DefaultAzureCredential,
+    ):
+        """Get row, null and min/max statistics of a table from its Delta log."""
+        result = await self._with_delta_table(
+            workspace,
+            rsc_id,
+            rsc_type,
+            table_name,
+            credential,
+            lambda table, options: compute_table_stats(
+                open_delta_table(table["location"], options)
+            ),
+        )
+        if isinstance(result, str):
+            return result
+        table, stats = result
+        return format_table_stats_to_markdown(table, stats)
+
+    async def get_table_layout(
+        self,
+        workspace: str,
+        rsc_id: str,
+        rsc_type: str,
+        table_name: str,
+        credential: DefaultAzureCredential,
+        target_file_size: int = DEFAULT_TARGET_FILE_SIZE,
+    ):
+        """Analyze file sizes and partition layout of a table from its Delta log."""
+        result = await self._with_delta_table(
+            workspace,
+            rsc_id,
+            rsc_type,
+            table_name,
+            credential,
+            lambda table, options: compute_table_layout(
+                open_delta_table(table["location"], options), target_file_size
+            ),
+        )
+        if isinstance(result, str):
+            return result
+        table, layout = result
+        return format_table_layout_to_markdown(table, layout)
+
+    async def optimize_table(
+        self,
+        workspace: str,
+        rsc_id: str,
+        rsc_type: str,
+        table_name: str,
+        credential: DefaultAzureCredential,
+        target_size: int = DEFAULT_TARGET_FILE_SIZE,
+        z_order_columns: Optional[List[str]] = None,
+        partitions: Optional[Dict[str, str]] = None,
+        dry_run: bool = True,
+    ):
+        """Compact (bin-pack) or Z-order a Delta table, or report what would be rewritten."""
+        result = await self._with_delta_table(
+            workspace,
+            rsc_id,
+            rsc_type,
+            table_name,
+            credential,
+            lambda table, options: optimize_delta_table(
+                open_delta_table(table["location"], options),
+                target_size=target_size,
+                z_order_columns=z_order_columns,
+                partitions=partitions,
+                dry_run=dry_run,
+            ),
+        )
+        if isinstance(result, str):
+            return result
+        return format_maintenance_to_markdown(*result)
+
+    async def vacuum_table(
+        self,
+        workspace: str,
+        rsc_id: str,
+        rsc_type: str,
+        table_name: str,
+        credential: DefaultAzureCredential,
+        retention_hours: int = DEFAULT_RETENTION_HOURS,
+        dry_run: bool = True,
+    ):
+        """Delete unreferenced files older than the retention window, or list them."""
+        result = await self._with_delta_table(
+            workspace,
+            rsc_id,
+            rsc_type,
+            table_name,
+            credential,
+            lambda table, options: vacuum_delta_table(
+                open_delta_table(table["location"], options),
+                retention_hours=retention_hours,
+                dry_run=dry_run,
+            ),
+        )
+        if isinstance(result, str):
+            return result
+        return format_maintenance_to_markdown(*result)
 
+    async def get_table_history(
+        self,
+        workspace: str,
+        rsc_id: str,
+        rsc_type: str,
+        table_name: str,
+        credential: DefaultAzureCredential,
+        limit: int = 20,
+    ):
+        """List the latest commits (operation, parameters, metrics) of a table."""
+        onelake = OneLakeClient(credential)
+        result = await self._with_delta_table(
+            workspace,
+            rsc_id,
+            rsc_type,
+            table_name,
+            credential,
+            lambda table, options: get_commit_history(
+                table["location"], options, limit=limit, onelake=onelake
+            ),
+        )
+        if isinstance(result, str):
+            return result
+        return format_history_to_markdown(*result)
+
+    async def get_table_at_version(
+        self,
+        workspace: str,
+        rsc_id: str,
+        rsc_type: str,
+        table_name: str,
+        credential: DefaultAzureCredential,
+        version: Optional[int] = None,
+        timestamp: Optional[str] = None,
+        include_stats: bool = False,
+    ):
+        """Get the schema (and optionally the log statistics) of a table as of a version or timestamp."""
+
+        def load(table, options):
+            dt = open_table_at(
+                table["location"],
+                options,
+                version=version,
+                timestamp=timestamp,
+                without_files=not include_stats,
+            )
+            stats = compute_table_stats(dt) if include_stats else None
+            return dt.version(), dt.schema(), dt.metadata(), stats
+
+        result = await self._with_delta_table(
+            workspace, rsc_id, rsc_type, table_name, credential, load
+        )
+        if isinstance(result, str):
+            return result
+        table, (loaded_version, schema, metadata, stats) = result
+        table_info = {**table, "version": loaded_version}
+        markdown = _schema_markdown(table_info, schema, metadata)
+        if stats is not None:
+            markdown += format_table_stats_to_markdown(table_info, stats)
         return markdown
 
+    async def preview_table(
+        self,
+        workspace: str,
+        rsc_id: str,
+        rsc_type: str,
+        table_name: str,
+        credential: DefaultAzureCredential,
+        columns: Optional[List[str]] = None,
+        limit: int = 10,
+    ):
+        """Read the first rows of a table from a single row group of one data file."""
+        result = await self._with_delta_table(
+            workspace,
+            rsc_id,
+            rsc_type,
+            table_name,
+            credential,
+            lambda table, options: read_preview(
+                open_delta_table(table["location"], options), columns, limit
+            ),
+        )
+        if isinstance(result, str):
+            return result
+        return pl.from_arrow(result[1])
+
     async def get_all_schemas(
         self,
         workspace: str,
         rsc_id: str,
         rsc_type: str,
         credential: DefaultAzureCredential,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        table_timeout: Optional[float] = DEFAULT_TABLE_TIMEOUT,
+        ctx: Optional[Context] = None,
     ):
         """Get schemas for all Delta tables in a Fabric lakehouse."""
         # Get all tables
@@ -83,7 +513,14 @@ class TableClient:
             return f"No Delta tables found in {rsc_type} '{rsc_id}'."
 
         # Get schema for all tables
-        delta_tables = await get_delta_schemas(delta_format_tables, credential)
+        delta_tables = await get_delta_schemas(
+            delta_format_tables,
+            credential,
+            max_workers=max_workers,
+            timeout=table_timeout,
+            ctx=ctx,
+            metadata_only=True,
+        )
 
         if not delta_tables:
             return "Could not retrieve schemas for any tables."
@@ -95,6 +532,59 @@ class TableClient:
         markdown += f"Lakehouse: {rsc_id}\n\n"
 
         for table_info, schema, metadata in delta_tables:
-            markdown += format_schema_to_markdown(table_info, schema, metadata)
+            markdown += _schema_markdown(table_info, schema, metadata)
 
         return markdown
+
+    async def query_tables(
+        self,
+        workspace: str,
+        rsc_id: str,
+        query: str,
+        credential: DefaultAzureCredential,
+        tables: Optional[List[str]] = None,
+        limit: Optional[int] = 1000,
+        export_format: Optional[str] = None,
+    ):
+        """
+        Run a SQL query locally with polars over the lakehouse's Delta tables.
+
+        The tables are read straight from OneLake, bypassing the SQL analytics
+        endpoint. Only tables named in `tables`, or referenced in the query, are
+        registered.
+
+        Returns:
+            A polars DataFrame, a result file summary when export_format is set,
+            or an error message.
+        """
+        storage_options = get_storage_options(credential)
+        if tables:
+            records = [
+                await self._resolve_delta_table(
+                    workspace, rsc_id, "lakehouse", name, storage_options
+                )
+                for name in tables
+            ]
+            missing = [n for n, r in zip(tables, records) if not r]
+            if missing:
+                return f"No table found with name(s) {', '.join(missing)} in lakehouse '{rsc_id}'."
+            # Register the tables under the names the query uses
+            records = [{**r, "name": n} for n, r in zip(tables, records)]
+        else:
+            all_tables = await self.list_tables(workspace, rsc_id, "lakehouse")
+            if isinstance(all_tables, str):
+                return all_tables
+            records = referenced_tables(query, all_tables)
+            if not records:
+                return f"The query does not reference any Delta table in lakehouse '{rsc_id}'."
+
+        path = new_result_path(export_format, prefix="local_query") if export_format else None
+
+        def run():
+            # Registering the scans replays the Delta logs, so it stays off the event loop too
+            lf = build_local_query(query, records, storage_options, limit=limit)
+            if path:
+                return sink_lazy_result(lf, path, export_format)
+            return collect_streaming(lf)
+
+        return await asyncio.to_thread(run)
@@ -0,0 +1,32 @@
+from typing import Dict, List, Optional
+
+
+def format_file_listing_to_markdown(
+    root: str, entries: List[Dict], cursor: Optional[str]
+) -> str:
+    """Convert a page of file listing entries to markdown."""
+    md = f"## Files in `{root}`\n\n"
+    if not entries:
+        md += "No files found.\n"
+    else:
+        md += "| Name | Type | Size (bytes) | Last Modified |\n"
+        md += "|------|------|--------------|---------------|\n"
+        for entry in entries:
+            kind = "directory" if entry["isDirectory"] else "file"
+            size = "" if entry["isDirectory"] else entry["contentLength"]
+            md += f"| {entry['name']} | {kind} | {size} | {entry['lastModified']} |\n"
+    if cursor:
+        md += f"\nMore entries available. Next page token: `{cursor}`\n"
+    return md
+
+
+def format_file_properties_to_markdown(properties: Dict) -> str:
+    """Convert file or directory properties to markdown."""
+    md = f"## `{properties['name']}`\n\n"
+    md += f"- **Type:** {'directory' if properties['isDirectory'] else 'file'}\n"
+    if not properties["isDirectory"]:
+        md += f"- **Size:** {properties['contentLength']} bytes\n"
+        md += f"- **Content type:** {properties['contentType']}\n"
+    md += f"- **Last modified:** {properties['lastModified']}\n"
+    md += f"- **ETag:** {properties['etag']}\n"
+    return md
@@ -0,0 +1,40 @@
+from typing import Dict, List
+from datetime import datetime
+
+# Operation metrics shown in the history table, when present.
+HISTORY_METRICS = [
+    "num_added_rows",
+    "numOutputRows",
+    "num_added_files",
+    "numAddedFiles",
+    "num_removed_files",
+    "numRemovedFiles",
+    "numTargetRowsInserted",
+    "numTargetRowsUpdated",
+    "numTargetRowsDeleted",
+]
+
+
+def format_history_to_markdown(table_info: Dict, commits: List[Dict]) -> str:
+    """Convert Delta commit history to a markdown table."""
+    md = f"## History: `{table_info['name']}`\n\n"
+    if not commits:
+        return md + "No commits found.\n"
+    md += "| Version | Timestamp | Operation | Parameters | Metrics |\n"
+    md += "|---------|-----------|-----------|------------|---------|\n"
+    for commit in commits:
+        timestamp = commit.get("timestamp")
+        if timestamp:
+            timestamp = datetime.fromtimestamp(timestamp / 1000).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
+        parameters = ", ".join(
+            f"{k}={v}" for k, v in (commit.get("operationParameters") or {}).items()
+        )
+        metrics = commit.get("operationMetrics") or {}
+        metrics = ", ".join(f"{k}={metrics[k]}" for k in HISTORY_METRICS if k in metrics)
+        md += (
+            f"| {commit['version']} | {timestamp} | {commit.get('operation')} | "
+            f"{parameters} | {metrics} |\n"
+        )
+    return md
@@ -0,0 +1,27 @@
+from typing import Dict
+import json
+
+# Maximum number of file paths listed in a vacuum report.
+MAX_LISTED_FILES = 20
+
+
+def format_maintenance_to_markdown(table_info: Dict, result: Dict) -> str:
+    """Convert the result of a Delta maintenance operation to markdown."""
+    mode = "dry run" if result["dry_run"] else "executed"
+    md = f"## {result['operation']} on `{table_info['name']}` ({mode})\n\n"
+    if result.get("version") is not None:
+        md += f"- **New version:** {result['version']}\n"
+    if result.get("retention_hours") is not None:
+        md += f"- **Retention:** {result['retention_hours']} hours\n"
+    for key, value in result["metrics"].items():
+        if isinstance(value, dict):
+            value = json.dumps(value)
+        md += f"- **{key}:** {value}\n"
+    files = result.get("files")
+    if files:
+        md += "\n### Files\n\n"
+        for path in files[:MAX_LISTED_FILES]:
+            md += f"- `{path}`\n"
+        if len(files) > MAX_LISTED_FILES:
+            md += f"- ... and {len(files) - MAX_LISTED_FILES} more\n"
+    return md
@@ -0,0 +1,53 @@
+from typing import Dict
+from helpers.utils.report_index import ReportIndex
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    return str(value).replace("|", "\\|").replace("\n", " ")
+
+
+def _fields(visual: Dict) -> str:
+    return ", ".join(f"{f['table']}[{f['name']}]" for f in visual["fields"])
+
+
+def format_report_index_to_markdown(report_id: str, index: ReportIndex) -> str:
+    """Convert a report index to markdown: pages, then visuals with their fields."""
+    md = f"# Report '{report_id}'\n\n"
+    md += f"{len(index.pages)} pages, {len(index.visuals)} visuals, "
+    md += f"{len(index.fields())} distinct fields.\n\n"
+    for page in index.pages:
+        md += f"## {_cell(page['displayName'])}\n\n"
+        visuals = [v for v in index.visuals if v["pageName"] == page["name"]]
+        if not visuals:
+            md += "No visuals.\n\n"
+            continue
+        md += "| Visual | Type | Title | Fields |\n"
+        md += "|--------|------|-------|--------|\n"
+        for visual in visuals:
+            md += (
+                f"| {_cell(visual['name'])} | {_cell(visual['type'])} | "
+                f"{_cell(visual['title'])} | {_cell(_fields(visual))} |\n"
+            )
+        md += "\n"
+    return md
+
+
+def format_visual_matches_to_markdown(field: str, result: Dict) -> str:
+    """Convert cross-report visual search results to markdown."""
+    md = f"# Visuals using '{field}'\n\n"
+    md += f"Searched {result['searched']} reports"
+    if result["failed"]:
+        md += f" ({len(result['failed'])} could not be read: {', '.join(map(str, result['failed']))})"
+    md += ".\n\n"
+    if not result["visuals"]:
+        return md + "No matching visuals found.\n"
+    md += "| Report | Page | Visual | Type | Title | Fields |\n"
+    md += "|--------|------|--------|------|-------|--------|\n"
+    for visual in result["visuals"]:
+        md += (
+            f"| {_cell(visual['report'])} | {_cell(visual['page'])} | {_cell(visual['name'])} | "
+            f"{_cell(visual['type'])} | {_cell(visual['title'])} | {_cell(_fields(visual))} |\n"
+        )
+    return md
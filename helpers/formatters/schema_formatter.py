@@ -8,7 +8,10 @@ def format_schema_to_markdown(
     """Convert a Delta table schema and metadata to a responsive markdown format with HTML."""
     md = f"<h2>Delta Table: <code>{table_info['name']}</code></h2>\n"
     md += f"<p><strong>Type:</strong> {table_info['type']}</p>\n"
-    md += f"<p><strong>Location:</strong> <code>{table_info['location']}</code></p>\n\n"
+    md += f"<p><strong>Location:</strong> <code>{table_info['location']}</code></p>\n"
+    if table_info.get("version") is not None:
+        md += f"<p><strong>Version:</strong> {table_info['version']}</p>\n"
+    md += "\n"
 
     # Responsive schema table wrapped in a scrollable div
     md += "<h3>Schema</h3>\n"
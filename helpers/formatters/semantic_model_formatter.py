@@ -0,0 +1,109 @@
+from typing import Dict, List
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    return str(value).replace("|", "\\|").replace("\n", " ")
+
+
+def format_model_search_to_markdown(
+    text: str, results: Dict[str, List[Dict]], limit: int = 50
+) -> str:
+    """Convert semantic model index search results to markdown."""
+    md = f"# Semantic model objects matching '{text}'\n\n"
+    if not any(results.values()):
+        return md + "No matches found.\n"
+    if results.get("tables"):
+        md += "## Tables\n\n| Table | Columns | Measures | Description |\n"
+        md += "|-------|---------|----------|-------------|\n"
+        for t in results["tables"][:limit]:
+            md += (
+                f"| {_cell(t['name'])} | {len(t['columns'])} | {len(t['measures'])} | "
+                f"{_cell(t['description'])} |\n"
+            )
+        md += "\n"
+    if results.get("columns"):
+        md += "## Columns\n\n| Table | Column | Data Type | Expression |\n"
+        md += "|-------|--------|-----------|------------|\n"
+        for c in results["columns"][:limit]:
+            md += (
+                f"| {_cell(c['table'])} | {_cell(c['name'])} | {_cell(c['dataType'])} | "
+                f"{_cell(c['expression'])} |\n"
+            )
+        md += "\n"
+    if results.get("measures"):
+        md += "## Measures\n\n| Table | Measure | Expression | Display Folder |\n"
+        md += "|-------|---------|------------|----------------|\n"
+        for m in results["measures"][:limit]:
+            md += (
+                f"| {_cell(m['table'])} | {_cell(m['name'])} | {_cell(m['expression'])} | "
+                f"{_cell(m['displayFolder'])} |\n"
+            )
+        md += "\n"
+    if results.get("relationships"):
+        md += "## Relationships\n\n| From | To | Cross Filter | Active |\n"
+        md += "|------|----|--------------|--------|\n"
+        for r in results["relationships"][:limit]:
+            md += (
+                f"| {_cell(r['fromTable'])}[{_cell(r['fromColumn'])}] | "
+                f"{_cell(r['toTable'])}[{_cell(r['toColumn'])}] | "
+                f"{_cell(r['crossFilteringBehavior'])} | {r['isActive']} |\n"
+            )
+        md += "\n"
+    truncated = [k for k, v in results.items() if len(v) > limit]
+    if truncated:
+        md += f"Showing the first {limit} {', '.join(truncated)}; refine the search for more.\n"
+    return md
+
+
+def format_measure_to_markdown(measure: Dict) -> str:
+    """Convert a measure with its DAX expression to markdown."""
+    md = f"## Measure `{measure['table']}`[{measure['name']}]\n\n"
+    if measure.get("description"):
+        md += f"{measure['description']}\n\n"
+    if measure.get("formatString"):
+        md += f"- **Format:** {measure['formatString']}\n"
+    if measure.get("displayFolder"):
+        md += f"- **Display folder:** {measure['displayFolder']}\n"
+    md += f"\n```dax\n{measure['expression']}\n```\n"
+    return md
+
+
+def format_refresh_status_to_markdown(state: Dict) -> str:
+    """Convert the state of a semantic model refresh to markdown."""
+    md = f"## Refresh `{state['handle']}` of semantic model `{state['modelId']}`\n\n"
+    md += f"- **Status:** {state['status']}"
+    if state.get("extendedStatus") and state["extendedStatus"] != state["status"]:
+        md += f" ({state['extendedStatus']})"
+    md += "\n"
+    if state.get("type"):
+        md += f"- **Type:** {state['type']}\n"
+    if state.get("startTime"):
+        md += f"- **Started:** {state['startTime']}\n"
+    if state.get("endTime"):
+        md += f"- **Ended:** {state['endTime']}\n"
+    if state.get("seconds") is not None:
+        md += f"- **Duration:** {state['seconds']}s\n"
+    md += f"- **Tracking:** {'polling in the background' if state['tracking'] else 'stopped'}\n"
+    if state.get("error"):
+        md += f"- **Error:** {state['error']}\n"
+    tables = state.get("tables") or {}
+    if tables:
+        md += "\n| Table | Status | Partitions done | Duration (s) |\n"
+        md += "|-------|--------|-----------------|--------------|\n"
+        for name, table in sorted(tables.items()):
+            done = sum(1 for s in table["partitions"].values() if s == "Completed")
+            seconds = table["seconds"] if table["seconds"] is not None else ""
+            md += (
+                f"| {_cell(name)} | {table['status']} | "
+                f"{done}/{len(table['partitions'])} | {seconds} |\n"
+            )
+    elif state.get("objects"):
+        md += "\nRequested objects: " + ", ".join(
+            o["table"] + (f"/{o['partition']}" if o.get("partition") else "")
+            for o in state["objects"]
+        ) + "\n"
+    for message in state.get("messages") or []:
+        md += f"\n> {message.get('type', 'Info')}: {_cell(message.get('message'))}"
+    return md
@@ -0,0 +1,75 @@
+from typing import Dict
+
+
+def format_table_stats_to_markdown(table_info: Dict, stats: Dict) -> str:
+    """Convert Delta log statistics of a table to markdown."""
+    approx = "" if stats["rows_exact"] else " (lower bound, some files have no stats)"
+    md = f"## Table statistics: `{table_info['name']}`\n\n"
+    md += f"- **Version:** {stats['version']}\n"
+    md += f"- **Rows:** {stats['rows']}{approx}\n"
+    md += f"- **Files:** {stats['files']}\n"
+    md += f"- **Size:** {stats['bytes']} bytes\n\n"
+    md += "| Column | Null Count | Min | Max | Exact |\n"
+    md += "|--------|------------|-----|-----|-------|\n"
+    for column in stats["columns"]:
+        name = column["name"]
+        if column.get("partition"):
+            name += f" (partition, {column['distinct_values']} values)"
+        md += (
+            f"| {name} | {column['null_count']} | {column['min']} | "
+            f"{column['max']} | {column['exact']} |\n"
+        )
+    return md
+
+
+def format_table_layout_to_markdown(table_info: Dict, layout: Dict) -> str:
+    """Convert a Delta table layout analysis to markdown."""
+    md = f"## File layout: `{table_info['name']}`\n\n"
+    md += f"- **Version:** {layout['version']}\n"
+    md += f"- **Files:** {layout['files']}\n"
+    md += f"- **Size:** {layout['bytes']} bytes\n"
+    if layout["files"] == 0:
+        return md + "\nThe table has no data files.\n"
+    md += (
+        f"- **File size:** mean {layout['mean_file_size']:.0f}, median "
+        f"{layout['median_file_size']:.0f}, min {layout['min_file_size']}, "
+        f"max {layout['max_file_size']} bytes\n"
+    )
+    md += (
+        f"- **Files below {layout['target_file_size']} bytes:** {layout['small_files']} "
+        f"({layout['small_files_share']:.1%}, {layout['small_files_bytes']} bytes)\n\n"
+    )
+
+    md += "### File size histogram\n\n"
+    md += "| Size | Files | Bytes |\n"
+    md += "|------|-------|-------|\n"
+    for bucket in layout["histogram"]:
+        md += f"| {bucket['bucket']} | {bucket['files']} | {bucket['bytes']} |\n"
+
+    partitions = layout["partitions"]
+    if partitions:
+        skew = f"{partitions['skew']:.1f}x" if partitions["skew"] else "n/a"
+        md += f"\n### Partitions ({', '.join(layout['partition_columns'])})\n\n"
+        md += f"- **Partitions:** {partitions['partitions']}\n"
+        md += (
+            f"- **Files per partition:** mean {partitions['mean_files']:.1f}, "
+            f"max {partitions['max_files']}\n"
+        )
+        md += (
+            f"- **Bytes per partition:** mean {partitions['mean_bytes']:.0f}, "
+            f"median {partitions['median_bytes']:.0f}, min {partitions['min_bytes']}, "
+            f"max {partitions['max_bytes']}\n"
+        )
+        md += f"- **Skew (max / median bytes):** {skew}\n\n"
+        md += "| Largest Partitions | Files | Bytes |\n"
+        md += "|--------------------|-------|-------|\n"
+        for partition in partitions["largest"]:
+            md += f"| {partition['partition']} | {partition['files']} | {partition['bytes']} |\n"
+
+    md += "\n### Recommendations\n\n"
+    if layout["recommendations"]:
+        for recommendation in layout["recommendations"]:
+            md += f"- {recommendation}\n"
+    else:
+        md += "- No maintenance needed.\n"
+    return md
@@ -0,0 +1,319 @@
+from typing import Dict, Iterator, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+from threading import Lock
+import csv
+import io
+import json
+import operator
+import os
+import random
+import tempfile
+from datetime import datetime
+from uuid import uuid4
+import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Schema sampling: bytes read from the start of the file, plus a number of
+# randomly placed stripes of STRIPE_BYTES each (uncompressed files only).
+DEFAULT_SAMPLE_MB = 4
+DEFAULT_SAMPLE_STRIPES = 8
+STRIPE_BYTES = 256 * 1024
+# Parsing: size of each CSV block read and number of blocks typed concurrently.
+DEFAULT_BLOCK_SIZE = 16 * 1024 * 1024
+DEFAULT_PARSE_WORKERS = min(8, os.cpu_count() or 1)
+
+# Share of non-null sample values allowed to fail parsing for a column to
+# still get a typed column (the failing rows are rejected at load time).
+DEFAULT_TYPE_TOLERANCE = 0.001
+# Types tried when inferring a column, most specific first.
+_CANDIDATE_TYPES = [pl.Int64, pl.Float64, pl.Boolean, pl.Date, pl.Datetime("us")]
+
+REJECTS_DIR = os.path.join(tempfile.gettempdir(), "fabric_mcp_rejects")
+
+COMPRESSED_EXTENSIONS = (".gz", ".gzip", ".zst", ".zstd", ".bz2", ".lz4")
+
+# Column type names accepted in schema overrides.
+COLUMN_TYPES = {
+    "string": pl.Utf8,
+    "str": pl.Utf8,
+    "utf8": pl.Utf8,
+    "int": pl.Int64,
+    "int32": pl.Int32,
+    "int64": pl.Int64,
+    "bigint": pl.Int64,
+    "float": pl.Float64,
+    "float32": pl.Float32,
+    "float64": pl.Float64,
+    "double": pl.Float64,
+    "decimal": pl.Float64,
+    "bool": pl.Boolean,
+    "boolean": pl.Boolean,
+    "date": pl.Date,
+    "datetime": pl.Datetime("us"),
+    "timestamp": pl.Datetime("us"),
+}
+
+_BOOLEAN_VALUES = {
+    "true": True,
+    "false": False,
+    "t": True,
+    "f": False,
+    "yes": True,
+    "no": False,
+    "1": True,
+    "0": False,
+}
+
+
+def is_compressed(path: str) -> bool:
+    return path.lower().endswith(COMPRESSED_EXTENSIONS)
+
+
+def _parse_column_type(name: str) -> pl.DataType:
+    dtype = COLUMN_TYPES.get(name.strip().lower())
+    if dtype is None:
+        raise ValueError(
+            f"Unsupported column type: {name}. Use one of: {', '.join(COLUMN_TYPES)}."
+        )
+    return dtype
+
+
+def read_sample(
+    path: str,
+    sample_mb: float = DEFAULT_SAMPLE_MB,
+    stripes: int = DEFAULT_SAMPLE_STRIPES,
+    seed: Optional[int] = None,
+) -> bytes:
+    """
+    Read a sample of whole lines from a CSV file: the header and first sample_mb
+    MB, plus random stripes from the rest of the file.
+
+    Compressed files cannot be seeked, so only their first sample_mb MB
+    (decompressed) are used.
+    """
+    head_bytes = int(sample_mb * 1024 * 1024)
+    with pa.input_stream(path, compression="detect") as f:
+        head = f.read(head_bytes)
+    # Drop the trailing partial line
+    if len(head) == head_bytes and b"\n" in head:
+        head = head[: head.rindex(b"\n") + 1]
+    if is_compressed(path) or stripes <= 0:
+        return head
+
+    size = os.path.getsize(path)
+    if size <= head_bytes + STRIPE_BYTES:
+        return head
+    rng = random.Random(seed)
+    offsets = sorted(
+        rng.randrange(head_bytes, size - STRIPE_BYTES) for _ in range(stripes)
+    )
+    parts = [head if head.endswith(b"\n") else head + b"\n"]
+    with open(path, "rb") as f:
+        for offset in offsets:
+            f.seek(offset)
+            stripe = f.read(STRIPE_BYTES)
+            # Keep only the whole lines inside the stripe
+            start = stripe.find(b"\n") + 1
+            end = stripe.rfind(b"\n") + 1
+            if 0 < start < end:
+                parts.append(stripe[start:end])
+    return b"".join(parts)
+
+
+def _infer_column_type(values: pl.Series, tolerance: float) -> pl.DataType:
+    """Pick the most specific type that (almost) all non-null values parse as."""
+    values = values.drop_nulls()
+    if values.is_empty():
+        return pl.Utf8
+    allowed = int(len(values) * tolerance)
+    for dtype in _CANDIDATE_TYPES:
+        try:
+            failures = _cast_column(values, dtype).null_count()
+        except Exception:
+            continue
+        if failures <= allowed:
+            return dtype
+    return pl.Utf8
+
+
+def infer_csv_schema(
+    path: str,
+    sample_mb: float = DEFAULT_SAMPLE_MB,
+    stripes: int = DEFAULT_SAMPLE_STRIPES,
+    overrides: Optional[Dict[str, str]] = None,
+    tolerance: float = DEFAULT_TYPE_TOLERANCE,
+) -> pl.Schema:
+    """
+    Infer the column types of a CSV file from a sample instead of the whole file.
+
+    The sample is tokenized like the full load (malformed rows skipped), and a
+    column keeps a numeric, boolean or date type when no more than tolerance
+    of its sampled values fail to parse.
+
+    Args:
+        path: Local CSV file, optionally gzip/zstd/bz2/lz4 compressed.
+        sample_mb: MB read from the start of the file.
+        stripes: Number of random stripes sampled from the rest of the file.
+        overrides: Column name -> type name (e.g. 'string', 'int64', 'date')
+            replacing the inferred type.
+        tolerance: Share of sampled values allowed to fail parsing.
+
+    Returns:
+        The schema used to parse the file.
+    """
+    sample = read_sample(path, sample_mb, stripes)
+    header = next(csv.reader([sample.split(b"\n", 1)[0].decode("utf-8-sig")]))
+    # Every column is read as a string so its type is chosen here
+    table = pacsv.read_csv(
+        io.BytesIO(sample),
+        parse_options=pacsv.ParseOptions(invalid_row_handler=lambda row: "skip"),
+        convert_options=pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in header},
+            strings_can_be_null=True,
+        ),
+    )
+    frame = pl.from_arrow(table)
+    schema = {
+        name: _infer_column_type(frame.get_column(name), tolerance)
+        for name in frame.columns
+    }
+    for column, type_name in (overrides or {}).items():
+        if column not in schema:
+            raise ValueError(f"Column '{column}' in schema overrides not found in source.")
+        schema[column] = _parse_column_type(type_name)
+    logger.info(
+        f"Inferred schema of {path} from a {len(sample)} byte sample: "
+        f"{', '.join(f'{k}: {v}' for k, v in schema.items())}"
+    )
+    return pl.Schema(schema)
+
+
+def new_reject_path(prefix: str = "rejects") -> str:
+    """Build a unique path for a reject file in the rejects directory."""
+    os.makedirs(REJECTS_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    return os.path.join(REJECTS_DIR, f"{prefix}_{stamp}_{uuid4().hex[:8]}.jsonl")
+
+
+class RejectWriter:
+    """Collects malformed rows in a JSON lines file, created on the first reject."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file = None
+        self._lock = Lock()
+
+    def write(self, reason: str, **fields):
+        record = json.dumps({"reason": reason, **fields}, default=str)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "w", encoding="utf-8")
+            self._file.write(record + "\n")
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _cast_column(values: pl.Series, dtype: pl.DataType) -> pl.Series:
+    """Cast a string column, turning unparseable values into nulls."""
+    if dtype == pl.Utf8:
+        return values
+    if dtype == pl.Boolean:
+        return values.str.to_lowercase().replace_strict(
+            _BOOLEAN_VALUES, default=None, return_dtype=pl.Boolean
+        )
+    if dtype == pl.Date:
+        return values.str.to_date(strict=False)
+    if isinstance(dtype, pl.Datetime):
+        return values.str.to_datetime(time_unit=dtype.time_unit, strict=False)
+    return values.str.strip_chars().cast(dtype, strict=False)
+
+
+def _type_batch(
+    batch: pa.RecordBatch, schema: pl.Schema, rejects: Optional[RejectWriter]
+) -> pa.Table:
+    """Cast a batch of string columns to the schema; rows that fail are rejected."""
+    raw = pl.from_arrow(batch)
+    typed = raw.select(
+        _cast_column(raw.get_column(name), dtype).alias(name)
+        for name, dtype in schema.items()
+    )
+    failed = reduce(
+        operator.or_,
+        (
+            raw.get_column(name).is_not_null() & typed.get_column(name).is_null()
+            for name in schema.names()
+        ),
+    )
+    if failed.any():
+        if rejects is not None:
+            for row in raw.filter(failed).iter_rows(named=True):
+                rejects.write("type conversion", values=row)
+        typed = typed.filter(~failed)
+    return typed.to_arrow()
+
+
+def iter_typed_csv(
+    path: str,
+    schema: pl.Schema,
+    rejects: Optional[RejectWriter] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    max_workers: int = DEFAULT_PARSE_WORKERS,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Parse a (possibly compressed) CSV file into batches with a fixed schema.
+
+    Blocks are tokenized by Arrow's streaming CSV reader and typed on a thread
+    pool, with at most max_workers blocks in flight, so memory stays bounded.
+    Rows with the wrong number of fields or values that cannot be converted to
+    their column type are written to the reject file instead of failing the load.
+    """
+
+    def on_invalid_row(row) -> str:
+        if rejects is not None:
+            rejects.write(
+                "wrong number of fields",
+                line=row.number,
+                expected=row.expected_columns,
+                actual=row.actual_columns,
+                text=row.text,
+            )
+        return "skip"
+
+    stream = pa.input_stream(path, compression="detect")
+    reader = pacsv.open_csv(
+        stream,
+        read_options=pacsv.ReadOptions(block_size=block_size, use_threads=True),
+        parse_options=pacsv.ParseOptions(invalid_row_handler=on_invalid_row),
+        convert_options=pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in schema.names()},
+            include_columns=schema.names(),
+            strings_can_be_null=True,
+        ),
+    )
+    in_flight = deque()
+    with ThreadPoolExecutor(
+        max_workers=max(1, max_workers), thread_name_prefix="csv-parse"
+    ) as executor:
+        try:
+            for batch in reader:
+                in_flight.append(executor.submit(_type_batch, batch, schema, rejects))
+                if len(in_flight) >= max_workers:
+                    yield from in_flight.popleft().result().to_batches()
+            while in_flight:
+                yield from in_flight.popleft().result().to_batches()
+        finally:
+            for future in in_flight:
+                future.cancel()
+            stream.close()
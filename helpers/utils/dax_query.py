@@ -0,0 +1,88 @@
+from typing import Dict, List, Optional
+import re
+import polars as pl
+from cachetools import LRUCache
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Rows returned by default, and the most the executeQueries API returns per query.
+DEFAULT_MAX_ROWS = 10_000
+MAX_API_ROWS = 100_000
+
+# Query results keyed by (workspace, model, query, row budget, refresh marker).
+# A refresh of the model changes the marker, so stale results are never hit.
+_query_cache = LRUCache(maxsize=64)
+
+_SINGLE_EVALUATE = re.compile(r"^\s*EVALUATE\s+(.+?)\s*;?\s*$", re.IGNORECASE | re.DOTALL)
+_UNSAFE_TO_WRAP = re.compile(r"\b(EVALUATE|ORDER\s+BY|START\s+AT|DEFINE)\b", re.IGNORECASE)
+# A line comment would swallow the closing parenthesis of the wrapper
+_COMMENT = re.compile(r"--|//|/\*")
+
+
+def limit_query(query: str, max_rows: int) -> str:
+    """
+    Push the row budget into a simple DAX query.
+
+    A query made of a single EVALUATE of a table expression is wrapped in
+    TOPN(max_rows + 1, ...) so the model stops after the budget (the extra row
+    tells whether the result was truncated), capped at the API's row limit.
+    Other queries, including any with comments, are left unchanged and are
+    truncated after execution.
+    """
+    if _COMMENT.search(query):
+        return query
+    match = _SINGLE_EVALUATE.match(query)
+    if not match or _UNSAFE_TO_WRAP.search(match.group(1)):
+        return query
+    return f"EVALUATE TOPN({min(max_rows + 1, MAX_API_ROWS)}, {match.group(1)})"
+
+
+def _column_name(key: str) -> str:
+    """Turn 'Table[Column]' and '[Measure]' result keys into column names."""
+    if key.endswith("]") and "[" in key:
+        return key[key.index("[") + 1 : -1]
+    return key
+
+
+def rows_to_frame(rows: List[Dict]) -> pl.DataFrame:
+    """
+    Convert executeQueries rows into a columnar polars DataFrame.
+
+    Columns are named after the result keys without their table prefix, unless
+    that would make two columns share a name.
+    """
+    if not rows:
+        return pl.DataFrame()
+    keys = list(rows[0].keys())
+    names = [_column_name(k) for k in keys]
+    if len(set(names)) != len(names):
+        names = keys
+    columns = {name: [row.get(key) for row in rows] for key, name in zip(keys, names)}
+    return pl.DataFrame(columns, strict=False)
+
+
+def refresh_marker(refreshes: Optional[List[Dict]]) -> Optional[str]:
+    """
+    Identify the data state of a model from its latest refresh.
+
+    Returns None when the refresh history is unavailable, in which case
+    results are not cached.
+    """
+    if refreshes is None:
+        return None
+    if not refreshes:
+        return "never"
+    latest = refreshes[0]
+    return ":".join(
+        str(latest.get(key) or "")
+        for key in ("requestId", "status", "endTime", "startTime")
+    )
+
+
+def get_cached_result(key: tuple) -> Optional[Dict]:
+    return _query_cache.get(key)
+
+
+def cache_result(key: tuple, result: Dict):
+    _query_cache[key] = result
@@ -0,0 +1,96 @@
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
+from datetime import datetime
+from threading import Lock
+from cachetools import LRUCache
+from deltalake import DeltaTable
+from helpers.utils.table_tools import get_latest_delta_version
+from helpers.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from helpers.clients.onelake_client import OneLakeClient
+
+logger = get_logger(__name__)
+
+# Commit info never changes once written: (table location, version) -> commit info
+_commit_cache = LRUCache(maxsize=10_000)
+_commit_cache_lock = Lock()
+
+
+def _cached_commits(location: str, versions: range) -> Dict[int, Dict]:
+    with _commit_cache_lock:
+        return {
+            v: _commit_cache[(location, v)]
+            for v in versions
+            if (location, v) in _commit_cache
+        }
+
+
+def get_commit_history(
+    location: str,
+    storage_options: Optional[Dict] = None,
+    limit: int = 20,
+    onelake: Optional["OneLakeClient"] = None,
+) -> List[Dict]:
+    """
+    Get the latest commits of a Delta table, newest first.
+
+    The latest version is found by listing _delta_log. Commit infos already in
+    the cache are reused, and only the newer commits that are missing are read
+    from the log (deltalake reads history backwards from the latest commit, so
+    older commits are never replayed).
+
+    Returns:
+        A list of commit info dictionaries including their "version".
+    """
+    latest = get_latest_delta_version(location, onelake)
+    if latest is not None:
+        wanted = range(max(0, latest - limit + 1), latest + 1)
+        cached = _cached_commits(location, wanted)
+        missing = [v for v in wanted if v not in cached]
+        if not missing:
+            logger.debug(f"History of {location} served from cache")
+            return [cached[v] for v in reversed(wanted)]
+        read_limit = latest - min(missing) + 1
+    else:
+        read_limit = limit
+
+    dt = DeltaTable(location, storage_options=storage_options, without_files=True)
+    commits = dt.history(read_limit)
+    latest_read = dt.version()
+    with _commit_cache_lock:
+        for commit in commits:
+            _commit_cache[(location, commit["version"])] = commit
+    wanted = range(max(0, latest_read - limit + 1), latest_read + 1)
+    cached = _cached_commits(location, wanted)
+    return [cached[v] for v in reversed(wanted) if v in cached]
+
+
+def open_table_at(
+    location: str,
+    storage_options: Optional[Dict] = None,
+    version: Optional[int] = None,
+    timestamp: Optional[Union[str, datetime]] = None,
+    without_files: bool = True,
+) -> DeltaTable:
+    """
+    Open a Delta table as of a version or timestamp (ISO 8601).
+
+    Only the log segment up to the requested version is read, starting from the
+    nearest checkpoint.
+    """
+    if version is not None and timestamp is not None:
+        raise ValueError("Specify either a version or a timestamp, not both.")
+    if timestamp is None:
+        return DeltaTable(
+            location,
+            version=version,
+            storage_options=storage_options,
+            without_files=without_files,
+        )
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    dt = DeltaTable(
+        location, storage_options=storage_options, without_files=without_files
+    )
+    dt.load_as_version(timestamp)
+    return dt
@@ -0,0 +1,141 @@
+from typing import Dict, List, Optional
+from deltalake import DeltaTable
+import polars as pl
+from helpers.utils.delta_stats import get_add_actions, DEFAULT_TARGET_FILE_SIZE
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Default vacuum retention, matching the Delta default of 7 days.
+DEFAULT_RETENTION_HOURS = 168
+
+
+def to_partition_filters(partitions: Optional[Dict[str, str]]) -> Optional[List]:
+    """Convert {column: value} equality filters to deltalake partition filters."""
+    if not partitions:
+        return None
+    return [(column, "=", str(value)) for column, value in partitions.items()]
+
+
+def _filtered_actions(dt: DeltaTable, partitions: Optional[Dict[str, str]]):
+    actions = get_add_actions(dt)
+    if actions.height == 0 or not partitions:
+        return actions
+    predicate = pl.lit(True)
+    for column, value in partitions.items():
+        predicate &= pl.col(f"partition.{column}").cast(pl.String) == str(value)
+    return actions.filter(predicate)
+
+
+def plan_compaction(
+    dt: DeltaTable,
+    target_size: int = DEFAULT_TARGET_FILE_SIZE,
+    partitions: Optional[Dict[str, str]] = None,
+) -> Dict:
+    """
+    Estimate which files a compaction would rewrite, without writing anything.
+
+    Like the compaction itself, a partition is only rewritten when it holds more
+    than one file smaller than the target size.
+    """
+    actions = _filtered_actions(dt, partitions)
+    if actions.height == 0:
+        return {"files": 0, "bytes": 0, "partitions": 0}
+    keys = [f"partition.{c}" for c in dt.metadata().partition_columns]
+    small = actions.filter(pl.col("size_bytes") < target_size)
+    if keys:
+        bins = small.group_by(keys).agg(
+            pl.len().alias("files"), pl.col("size_bytes").sum().alias("bytes")
+        )
+    else:
+        bins = small.select(
+            pl.len().alias("files"), pl.col("size_bytes").sum().alias("bytes")
+        )
+    bins = bins.filter(pl.col("files") > 1)
+    return {
+        "files": int(bins["files"].sum()),
+        "bytes": int(bins["bytes"].sum()),
+        "partitions": bins.height,
+    }
+
+
+def plan_z_order(dt: DeltaTable, partitions: Optional[Dict[str, str]] = None) -> Dict:
+    """Estimate the files a Z-order would rewrite (every file in the selected partitions)."""
+    actions = _filtered_actions(dt, partitions)
+    if actions.height == 0:
+        return {"files": 0, "bytes": 0}
+    return {"files": actions.height, "bytes": int(actions["size_bytes"].sum())}
+
+
+def optimize_delta_table(
+    dt: DeltaTable,
+    target_size: int = DEFAULT_TARGET_FILE_SIZE,
+    z_order_columns: Optional[List[str]] = None,
+    partitions: Optional[Dict[str, str]] = None,
+    dry_run: bool = True,
+) -> Dict:
+    """
+    Compact a Delta table by bin-packing small files, or Z-order it on columns.
+
+    With dry_run, only the files and bytes that would be rewritten are reported.
+
+    Returns:
+        A dictionary with the operation, dry-run flag and metrics.
+    """
+    operation = "z_order" if z_order_columns else "compact"
+    if z_order_columns:
+        unknown = [c for c in z_order_columns if c not in dt.schema().to_pyarrow().names]
+        if unknown:
+            raise ValueError(f"Unknown Z-order column(s): {', '.join(unknown)}")
+
+    if dry_run:
+        plan = (
+            plan_z_order(dt, partitions)
+            if z_order_columns
+            else plan_compaction(dt, target_size, partitions)
+        )
+        return {"operation": operation, "dry_run": True, "metrics": plan}
+
+    partition_filters = to_partition_filters(partitions)
+    logger.info(f"Running {operation} on {dt.table_uri}")
+    if z_order_columns:
+        metrics = dt.optimize.z_order(
+            z_order_columns, partition_filters=partition_filters, target_size=target_size
+        )
+    else:
+        metrics = dt.optimize.compact(
+            partition_filters=partition_filters, target_size=target_size
+        )
+    return {
+        "operation": operation,
+        "dry_run": False,
+        "version": dt.version(),
+        "metrics": metrics,
+    }
+
+
+def vacuum_delta_table(
+    dt: DeltaTable,
+    retention_hours: int = DEFAULT_RETENTION_HOURS,
+    dry_run: bool = True,
+    enforce_retention_duration: bool = True,
+) -> Dict:
+    """
+    Remove data files no longer referenced by the table and older than the retention.
+
+    Returns:
+        A dictionary with the operation, dry-run flag and the files affected.
+    """
+    logger.info(f"Vacuum ({'dry run' if dry_run else 'delete'}) on {dt.table_uri}")
+    files = dt.vacuum(
+        retention_hours=retention_hours,
+        dry_run=dry_run,
+        enforce_retention_duration=enforce_retention_duration,
+    )
+    return {
+        "operation": "vacuum",
+        "dry_run": dry_run,
+        "retention_hours": retention_hours,
+        "metrics": {"files": len(files)},
+        "files": files,
+    }
@@ -0,0 +1,64 @@
+from typing import List, Optional
+from deltalake import DeltaTable
+import pyarrow as pa
+import pyarrow.dataset as pds
+import pyarrow.parquet as pq
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def read_preview(
+    dt: DeltaTable, columns: Optional[List[str]] = None, limit: int = 10
+) -> pa.Table:
+    """
+    Read the first rows of a Delta table from a single Parquet row group.
+
+    The first non-empty data file of the snapshot is opened; only its footer and
+    the requested column chunks of its first row group are fetched (ranged
+    reads). Partition columns are filled from the file's partition values.
+
+    Args:
+        dt: Delta table snapshot.
+        columns: Columns to return (optional, defaults to all).
+        limit: Maximum number of rows.
+
+    Returns:
+        An Arrow table with at most `limit` rows.
+    """
+    dataset = dt.to_pyarrow_dataset()
+    schema = dataset.schema
+    columns = columns or schema.names
+    unknown = [c for c in columns if c not in schema.names]
+    if unknown:
+        raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+    if limit < 1:
+        return schema.empty_table().select(columns)
+    partition_columns = set(dt.metadata().partition_columns)
+    file_columns = [c for c in columns if c not in partition_columns]
+
+    for fragment in dataset.get_fragments():
+        parquet_file = pq.ParquetFile(fragment.path, filesystem=fragment.filesystem)
+        metadata = parquet_file.metadata
+        if metadata.num_row_groups == 0 or metadata.row_group(0).num_rows == 0:
+            continue
+        logger.debug(f"Previewing first row group of {fragment.path}")
+        num_rows = min(limit, metadata.row_group(0).num_rows)
+        data = {}
+        if file_columns:
+            batch = next(
+                parquet_file.iter_batches(
+                    batch_size=num_rows, row_groups=[0], columns=file_columns
+                )
+            )
+            data = {name: batch.column(name) for name in file_columns}
+        partition_values = pds.get_partition_keys(fragment.partition_expression)
+        for name in columns:
+            if name in partition_columns:
+                data[name] = pa.array(
+                    [partition_values.get(name)] * num_rows,
+                    type=schema.field(name).type,
+                )
+        return pa.table({name: data[name] for name in columns})
+
+    return schema.empty_table().select(columns)
@@ -0,0 +1,256 @@
+from typing import Dict, List, Optional
+from deltalake import DeltaTable
+import polars as pl
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def open_delta_table(
+    location: str,
+    storage_options: Optional[Dict] = None,
+    version: Optional[int] = None,
+) -> DeltaTable:
+    """Open a Delta table snapshot including its add actions (blocking)."""
+    return DeltaTable(location, version=version, storage_options=storage_options)
+
+
+def get_add_actions(dt: DeltaTable) -> pl.DataFrame:
+    """Return the snapshot's add actions as a flat DataFrame (one row per file)."""
+    return pl.from_arrow(dt.get_add_actions(flatten=True))
+
+
+def _stat_columns(actions: pl.DataFrame) -> List[str]:
+    """Column paths that have min/max statistics in the add actions, in schema order."""
+    return [c[len("min.") :] for c in actions.columns if c.startswith("min.")]
+
+
+def compute_table_stats(dt: DeltaTable) -> Dict:
+    """
+    Aggregate row counts, null counts and min/max per column from the Delta log.
+
+    Only the file statistics recorded in the add actions are used; no data file
+    is read. All aggregations run in a single vectorised pass over the add
+    actions. Counts are marked inexact when some files carry no statistics.
+
+    Returns:
+        A dictionary with table-level totals and a list of per-column statistics.
+    """
+    actions = get_add_actions(dt)
+    partition_columns = dt.metadata().partition_columns
+    if actions.height == 0:
+        return {
+            "version": dt.version(),
+            "files": 0,
+            "bytes": 0,
+            "rows": 0,
+            "rows_exact": True,
+            "columns": [],
+        }
+    stat_columns = [c for c in _stat_columns(actions) if c not in partition_columns]
+
+    exprs = [
+        pl.len().alias("files"),
+        pl.col("size_bytes").sum().alias("bytes"),
+        pl.col("num_records").sum().alias("rows"),
+        pl.col("num_records").null_count().alias("files_without_stats"),
+    ]
+    for i, column in enumerate(stat_columns):
+        exprs += [
+            pl.col(f"null_count.{column}").sum().alias(f"{i}_nulls"),
+            pl.col(f"null_count.{column}").null_count().alias(f"{i}_missing"),
+            pl.col(f"min.{column}").min().alias(f"{i}_min"),
+            pl.col(f"max.{column}").max().alias(f"{i}_max"),
+        ]
+    for i, column in enumerate(partition_columns):
+        values = pl.col(f"partition.{column}")
+        exprs += [
+            pl.col("num_records").filter(values.is_null()).sum().alias(f"p{i}_nulls"),
+            values.min().alias(f"p{i}_min"),
+            values.max().alias(f"p{i}_max"),
+            values.drop_nulls().n_unique().alias(f"p{i}_distinct"),
+        ]
+    totals = actions.select(exprs).row(0, named=True)
+    files = totals["files"]
+
+    columns = []
+    for i, column in enumerate(stat_columns):
+        columns.append(
+            {
+                "name": column,
+                "null_count": totals[f"{i}_nulls"],
+                "min": totals[f"{i}_min"],
+                "max": totals[f"{i}_max"],
+                "exact": totals[f"{i}_missing"] == 0,
+            }
+        )
+    for i, column in enumerate(partition_columns):
+        columns.append(
+            {
+                "name": column,
+                "null_count": totals[f"p{i}_nulls"],
+                "min": totals[f"p{i}_min"],
+                "max": totals[f"p{i}_max"],
+                "distinct_values": totals[f"p{i}_distinct"],
+                "partition": True,
+                "exact": totals["files_without_stats"] == 0,
+            }
+        )
+
+    return {
+        "version": dt.version(),
+        "files": files,
+        "bytes": totals["bytes"] or 0,
+        "rows": totals["rows"] or 0,
+        "rows_exact": totals["files_without_stats"] == 0,
+        "columns": columns,
+    }
+
+
+MB = 1024 * 1024
+# File size histogram bucket boundaries (bytes); the last bucket is open-ended.
+FILE_SIZE_BUCKETS = [1 * MB, 8 * MB, 32 * MB, 128 * MB, 512 * MB]
+DEFAULT_TARGET_FILE_SIZE = 128 * MB
+
+
+def _size_label(size: int) -> str:
+    if size >= MB:
+        return f"{size // MB}MB"
+    return f"{size // 1024}KB" if size >= 1024 else f"{size}B"
+
+
+def compute_table_layout(
+    dt: DeltaTable, target_file_size: int = DEFAULT_TARGET_FILE_SIZE
+) -> Dict:
+    """
+    Analyze the file layout of a Delta table from its add actions.
+
+    Computes a file-size histogram, the share of files below the target size
+    and, for partitioned tables, files and bytes per partition and the skew
+    between partitions. Everything is computed with vectorised polars
+    expressions over the add actions; no data file is read.
+
+    Returns:
+        A dictionary with file, partition and recommendation entries.
+    """
+    actions = get_add_actions(dt)
+    partition_columns = dt.metadata().partition_columns
+    files = actions.height
+
+    layout = {
+        "version": dt.version(),
+        "files": files,
+        "bytes": 0,
+        "target_file_size": target_file_size,
+        "partition_columns": partition_columns,
+        "histogram": [],
+        "partitions": None,
+        "recommendations": [],
+    }
+    if files == 0:
+        return layout
+
+    sizes = pl.col("size_bytes")
+    summary = actions.select(
+        sizes.sum().alias("bytes"),
+        sizes.mean().alias("mean"),
+        sizes.median().alias("median"),
+        sizes.min().alias("min"),
+        sizes.max().alias("max"),
+        (sizes < target_file_size).sum().alias("small_files"),
+        sizes.filter(sizes < target_file_size).sum().alias("small_bytes"),
+    ).row(0, named=True)
+
+    labels = [f"< {_size_label(FILE_SIZE_BUCKETS[0])}"]
+    labels += [
+        f"{_size_label(lo)} - {_size_label(hi)}"
+        for lo, hi in zip(FILE_SIZE_BUCKETS, FILE_SIZE_BUCKETS[1:])
+    ]
+    labels += [f">= {_size_label(FILE_SIZE_BUCKETS[-1])}"]
+    counts = (
+        actions.select(
+            sizes.cut(FILE_SIZE_BUCKETS, labels=labels, left_closed=True).alias(
+                "bucket"
+            ),
+            sizes,
+        )
+        .group_by("bucket")
+        .agg(pl.len().alias("files"), sizes.sum().alias("bytes"))
+    )
+    by_label = {row["bucket"]: row for row in counts.iter_rows(named=True)}
+    layout["histogram"] = [
+        {
+            "bucket": label,
+            "files": by_label.get(label, {}).get("files", 0),
+            "bytes": by_label.get(label, {}).get("bytes", 0),
+        }
+        for label in labels
+    ]
+
+    small_share = summary["small_files"] / files
+    layout.update(
+        {
+            "bytes": summary["bytes"],
+            "mean_file_size": summary["mean"],
+            "median_file_size": summary["median"],
+            "min_file_size": summary["min"],
+            "max_file_size": summary["max"],
+            "small_files": summary["small_files"],
+            "small_files_bytes": summary["small_bytes"] or 0,
+            "small_files_share": small_share,
+        }
+    )
+
+    if partition_columns:
+        keys = [f"partition.{c}" for c in partition_columns]
+        per_partition = actions.group_by(keys).agg(
+            pl.len().alias("files"), sizes.sum().alias("bytes")
+        )
+        stats = per_partition.select(
+            pl.len().alias("partitions"),
+            pl.col("files").mean().alias("mean_files"),
+            pl.col("files").max().alias("max_files"),
+            pl.col("bytes").mean().alias("mean_bytes"),
+            pl.col("bytes").median().alias("median_bytes"),
+            pl.col("bytes").max().alias("max_bytes"),
+            pl.col("bytes").min().alias("min_bytes"),
+        ).row(0, named=True)
+        stats["skew"] = (
+            stats["max_bytes"] / stats["median_bytes"] if stats["median_bytes"] else None
+        )
+        stats["largest"] = [
+            {
+                "partition": ", ".join(
+                    f"{c}={row[k]}" for c, k in zip(partition_columns, keys)
+                ),
+                "files": row["files"],
+                "bytes": row["bytes"],
+            }
+            for row in per_partition.sort("bytes", descending=True)
+            .head(5)
+            .iter_rows(named=True)
+        ]
+        layout["partitions"] = stats
+
+    recommendations = layout["recommendations"]
+    if files > 1 and small_share > 0.5:
+        recommendations.append(
+            f"{summary['small_files']} of {files} files are smaller than "
+            f"{_size_label(target_file_size)}: compact the table (OPTIMIZE)."
+        )
+    partitions = layout["partitions"]
+    if partitions:
+        if partitions["skew"] and partitions["skew"] > 10:
+            recommendations.append(
+                f"Largest partition is {partitions['skew']:.1f}x the median partition: "
+                "partitioning is skewed."
+            )
+        if (
+            partitions["partitions"] > 100
+            and partitions["mean_bytes"] < target_file_size
+        ):
+            recommendations.append(
+                "Most partitions hold less than one target-sized file: "
+                "the table is likely over-partitioned."
+            )
+    return layout
@@ -0,0 +1,189 @@
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import os
+import tempfile
+import time
+import requests
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DOWNLOAD_DIR = os.path.join(tempfile.gettempdir(), "fabric_mcp_downloads")
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+# Ranged downloads: size of each range request, concurrency and retries per range.
+DEFAULT_RANGE_SIZE = 32 * 1024 * 1024
+DEFAULT_DOWNLOAD_WORKERS = 8
+DEFAULT_RANGE_RETRIES = 5
+
+
+def download_path(url: str) -> str:
+    """Build a local path in the download directory for a URL, keeping its extension."""
+    os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+    name = os.path.basename(url.split("?")[0]) or "download"
+    fd, path = tempfile.mkstemp(dir=DOWNLOAD_DIR, prefix="src_", suffix=f"_{name}")
+    os.close(fd)
+    return path
+
+
+def stream_download(
+    url: str, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, timeout: int = 120
+) -> Dict:
+    """
+    Stream a URL to a local file in chunks, without holding it in memory.
+
+    Returns:
+        A dictionary with the path, bytes written and elapsed seconds.
+    """
+    start = time.perf_counter()
+    written = 0
+    with requests.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        with open(path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                written += len(chunk)
+    elapsed = time.perf_counter() - start
+    logger.info(f"Downloaded {written} bytes from {url} in {elapsed:.1f}s")
+    return {"path": path, "bytes": written, "seconds": elapsed}
+
+
+def probe_url(url: str, timeout: int = 30) -> Tuple[Optional[int], bool, Optional[str]]:
+    """
+    Check whether a URL can be downloaded in ranges.
+
+    Returns:
+        A tuple (content_length, accepts_ranges, validator), where validator is
+        a strong ETag or the Last-Modified date usable in If-Range, if any.
+    """
+    response = requests.head(url, allow_redirects=True, timeout=timeout)
+    if response.status_code >= 400:
+        return None, False, None
+    length = response.headers.get("Content-Length")
+    accepts = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+    # A compressed transfer encoding makes Content-Length meaningless for ranges.
+    encoded = response.headers.get("Content-Encoding", "identity") != "identity"
+    if length is None or not length.isdigit() or encoded:
+        return None, False, None
+    # If-Range only accepts strong validators; servers ignore weak ETags there
+    etag = response.headers.get("ETag")
+    if etag is None or etag.startswith("W/"):
+        etag = response.headers.get("Last-Modified")
+    return int(length), accepts, etag
+
+
+def _split_ranges(size: int, range_size: int) -> List[Tuple[int, int]]:
+    """Split [0, size) into inclusive (start, end) byte ranges."""
+    return [
+        (start, min(start + range_size, size) - 1)
+        for start in range(0, size, range_size)
+    ]
+
+
+class RangesNotHonored(RuntimeError):
+    """The server answered a range request with the full body."""
+
+
+def _fetch_range(
+    url: str,
+    path: str,
+    start: int,
+    end: int,
+    etag: Optional[str],
+    chunk_size: int,
+    retries: int,
+    timeout: int,
+) -> int:
+    """
+    Download one byte range into its place in the preallocated file.
+
+    A failed attempt resumes from the last byte written instead of restarting
+    the range.
+    """
+    offset = start
+    for attempt in range(retries + 1):
+        headers = {"Range": f"bytes={offset}-{end}"}
+        if etag:
+            # Fail instead of mixing two versions of the file if it changed.
+            headers["If-Range"] = etag
+        try:
+            with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise IOError(f"Range request returned HTTP {response.status_code}")
+                if response.status_code == 200:
+                    raise RangesNotHonored(
+                        "Range request returned the full body (HTTP 200)"
+                    )
+                if response.status_code != 206:
+                    raise RuntimeError(
+                        f"Range request returned HTTP {response.status_code}"
+                    )
+                with open(path, "r+b") as f:
+                    f.seek(offset)
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+                        offset += len(chunk)
+            if offset > end:
+                return end - start + 1
+            raise IOError(f"Range {start}-{end} ended early at byte {offset}")
+        except (requests.RequestException, IOError) as e:
+            if attempt == retries:
+                raise
+            logger.warning(
+                f"Retrying range {start}-{end} from byte {offset} "
+                f"(attempt {attempt + 1}/{retries}): {str(e)}"
+            )
+            time.sleep(min(2**attempt, 30))
+
+
+def download_file(
+    url: str,
+    path: str,
+    range_size: int = DEFAULT_RANGE_SIZE,
+    max_workers: int = DEFAULT_DOWNLOAD_WORKERS,
+    retries: int = DEFAULT_RANGE_RETRIES,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    timeout: int = 120,
+) -> Dict:
+    """
+    Download a URL to a local file, using concurrent range requests when possible.
+
+    When the server advertises byte ranges and a Content-Length, the file is
+    preallocated and its ranges are fetched on a thread pool, each retried
+    (resuming from the last byte written) on failure. Otherwise, or when the
+    server answers a range request with the full body (ranges ignored or the
+    file changed), the file is streamed in one request.
+
+    Returns:
+        A dictionary with the path, bytes, elapsed seconds and number of ranges.
+    """
+    size, accepts_ranges, etag = probe_url(url)
+    if not accepts_ranges or size is None or size <= range_size or max_workers <= 1:
+        logger.debug(f"Using a single stream to download {url}")
+        return {**stream_download(url, path, chunk_size, timeout), "ranges": 1}
+
+    start_time = time.perf_counter()
+    ranges = _split_ranges(size, range_size)
+    with open(path, "wb") as f:
+        f.truncate(size)
+    logger.info(
+        f"Downloading {size} bytes from {url} in {len(ranges)} ranges "
+        f"with {max_workers} workers"
+    )
+
+    def fetch(byte_range: Tuple[int, int]):
+        start, end = byte_range
+        _fetch_range(url, path, start, end, etag, chunk_size, retries, timeout)
+
+    try:
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="download"
+        ) as executor:
+            # list() re-raises the first failed range
+            list(executor.map(fetch, ranges))
+    except RangesNotHonored:
+        logger.warning(f"Server ignored range requests for {url}; streaming instead")
+        return {**stream_download(url, path, chunk_size, timeout), "ranges": 1}
+
+    elapsed = time.perf_counter() - start_time
+    logger.info(f"Downloaded {size} bytes from {url} in {elapsed:.1f}s")
+    return {"path": path, "bytes": size, "seconds": elapsed, "ranges": len(ranges)}
@@ -0,0 +1,370 @@
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from datetime import date, datetime
+import itertools
+import time
+import polars as pl
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from deltalake import CommitProperties, DeltaTable, write_deltalake
+from deltalake.exceptions import TableNotFoundError
+from helpers.clients.onelake_client import OneLakeClient
+from helpers.utils.delta_history import get_commit_history
+from helpers.utils.csv_ingest import (
+    COMPRESSED_EXTENSIONS,
+    RejectWriter,
+    infer_csv_schema,
+    iter_typed_csv,
+)
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SUPPORTED_SOURCE_FORMATS = ("csv", "parquet")
+DEFAULT_BATCH_SIZE = 100_000
+
+# Commit metadata keys recording the watermark of incremental loads.
+WATERMARK_COLUMN_KEY = "fabric_mcp.watermark_column"
+WATERMARK_VALUE_KEY = "fabric_mcp.watermark"
+# Number of recent commits searched for the last watermark.
+WATERMARK_HISTORY_LIMIT = 1000
+
+
+def source_format(url: str) -> str:
+    """Infer the source format from a URL or path extension (CSV may be compressed)."""
+    name = url.split("?")[0].lower()
+    compressed = name.endswith(COMPRESSED_EXTENSIONS)
+    if compressed:
+        name = name.rsplit(".", 1)[0]
+    fmt = name.split(".")[-1]
+    if fmt not in SUPPORTED_SOURCE_FORMATS or (compressed and fmt != "csv"):
+        raise ValueError(
+            f"Unsupported file type: {fmt}. Only CSV and Parquet are supported."
+        )
+    return fmt
+
+
+def _iter_parquet(path: str, batch_size: int) -> Iterator[pa.RecordBatch]:
+    yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+
+
+def iter_source_batches(
+    path: str,
+    fmt: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    schema: Optional[pl.Schema] = None,
+    rejects: Optional[RejectWriter] = None,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Read a local CSV or Parquet file as a stream of Arrow record batches.
+
+    CSV files are parsed with a fixed schema (inferred from a sample when not
+    given); malformed rows go to the reject writer.
+    """
+    if fmt == "csv":
+        if schema is None:
+            schema = infer_csv_schema(path)
+        return iter_typed_csv(path, schema, rejects)
+    return _iter_parquet(path, batch_size)
+
+
+def batch_reader(
+    batches: Iterator[pa.RecordBatch],
+    on_batch: Optional[Callable[[pa.RecordBatch], None]] = None,
+) -> Optional[pa.RecordBatchReader]:
+    """
+    Wrap a batch iterator in a RecordBatchReader with the first batch's schema.
+
+    Later batches are cast to that schema (CSV batches are typed independently).
+    on_batch is called for every batch as it is consumed.
+
+    Returns:
+        The reader, or None if there are no batches.
+    """
+    first = next(batches, None)
+    if first is None:
+        return None
+    schema = first.schema
+
+    def generate():
+        for batch in itertools.chain([first], batches):
+            if batch.schema != schema:
+                batch = batch.cast(schema)
+            if on_batch is not None:
+                on_batch(batch)
+            yield batch
+
+    return pa.RecordBatchReader.from_batches(schema, generate())
+
+
+class IngestionStats:
+    """Row, byte and timing counters for a load."""
+
+    def __init__(self):
+        self.rows = 0
+        self.batches = 0
+        self.bytes_downloaded = 0
+        self.download_seconds = 0.0
+        self.write_seconds = 0.0
+
+    def observe(self, batch: pa.RecordBatch):
+        self.rows += batch.num_rows
+        self.batches += 1
+
+    def to_dict(self) -> Dict:
+        total = self.download_seconds + self.write_seconds
+        return {
+            "rows": self.rows,
+            "batches": self.batches,
+            "bytes_downloaded": self.bytes_downloaded,
+            "download_seconds": round(self.download_seconds, 2),
+            "write_seconds": round(self.write_seconds, 2),
+            "rows_per_second": round(self.rows / self.write_seconds)
+            if self.write_seconds
+            else None,
+            "download_mb_per_second": round(
+                self.bytes_downloaded / 1024 / 1024 / self.download_seconds, 2
+            )
+            if self.download_seconds
+            else None,
+            "total_seconds": round(total, 2),
+        }
+
+
+def write_to_delta(
+    reader: pa.RecordBatchReader,
+    location: str,
+    storage_options: Optional[Dict] = None,
+    mode: str = "append",
+):
+    """Stream a RecordBatchReader into a Delta table (created if missing)."""
+    write_deltalake(location, reader, mode=mode, storage_options=storage_options)
+
+
+def ingest_file(
+    path: str,
+    fmt: str,
+    write: Callable[[pa.RecordBatchReader], None],
+    stats: IngestionStats,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    schema: Optional[pl.Schema] = None,
+    rejects: Optional[RejectWriter] = None,
+) -> IngestionStats:
+    """
+    Stream a local source file through a writer batch by batch.
+
+    Only a few batches are held in memory at a time.
+    """
+    start = time.perf_counter()
+    reader = batch_reader(
+        iter_source_batches(path, fmt, batch_size, schema, rejects), stats.observe
+    )
+    if reader is not None:
+        write(reader)
+    stats.write_seconds = time.perf_counter() - start
+    logger.info(f"Ingested {stats.rows} rows from {path}")
+    return stats
+
+
+def _watermark_str(value) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+# Operations that replace the table's data, making older watermarks meaningless
+_REPLACE_OPERATIONS = (
+    "CREATE OR REPLACE TABLE",
+    "CREATE OR REPLACE TABLE AS SELECT",
+    "REPLACE TABLE",
+    "REPLACE TABLE AS SELECT",
+    "TRUNCATE",
+)
+
+
+def _replaces_data(commit: Dict) -> bool:
+    operation = (commit.get("operation") or "").upper()
+    if operation in _REPLACE_OPERATIONS:
+        return True
+    mode = (commit.get("operationParameters") or {}).get("mode") or ""
+    return operation == "WRITE" and mode.strip('"') == "Overwrite"
+
+
+def read_watermark(
+    location: str,
+    watermark_column: str,
+    storage_options: Optional[Dict] = None,
+    onelake: Optional[OneLakeClient] = None,
+) -> Optional[str]:
+    """
+    Find the watermark stored by the latest incremental load on a watermark column.
+
+    The search stops at the latest commit that overwrote or replaced the
+    table, since watermarks of earlier loads no longer describe its data.
+
+    Returns:
+        The watermark as a string, or None if no load has recorded one since
+        the table's data was last replaced.
+    """
+    commits = get_commit_history(
+        location, storage_options, WATERMARK_HISTORY_LIMIT, onelake
+    )
+    for commit in commits:
+        if (
+            commit.get(WATERMARK_COLUMN_KEY) == watermark_column
+            and WATERMARK_VALUE_KEY in commit
+        ):
+            return commit[WATERMARK_VALUE_KEY]
+        if _replaces_data(commit):
+            logger.info(
+                f"{location} was replaced at version {commit.get('version')}; "
+                "ignoring older watermarks"
+            )
+            return None
+    return None
+
+
+def filter_above_watermark(
+    batches: Iterator[pa.RecordBatch], column: str, watermark: Optional[str]
+) -> Iterator[pa.RecordBatch]:
+    """Drop rows whose watermark column is null or at or below the watermark."""
+    for batch in batches:
+        values = batch.column(column)
+        if watermark is None:
+            mask = pc.is_valid(values)
+        else:
+            mask = pc.greater(values, pa.scalar(watermark).cast(values.type))
+        batch = batch.filter(mask)
+        if batch.num_rows:
+            yield batch
+
+
+def scan_watermark(
+    path: str,
+    fmt: str,
+    column: str,
+    watermark: Optional[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    schema: Optional[pl.Schema] = None,
+) -> Tuple[int, int, Optional[str]]:
+    """
+    Count source rows and those above the watermark, and find their new maximum.
+
+    Returns:
+        A tuple (source_rows, new_rows, new_watermark).
+    """
+    source_rows = 0
+    new_rows = 0
+    maximum = None
+    for batch in iter_source_batches(path, fmt, batch_size, schema):
+        if column not in batch.schema.names:
+            raise ValueError(f"Watermark column '{column}' not found in source.")
+        source_rows += batch.num_rows
+        for kept in filter_above_watermark(iter([batch]), column, watermark):
+            new_rows += kept.num_rows
+            batch_max = pc.max(kept.column(column))
+            if maximum is None or pc.greater(batch_max, maximum).as_py():
+                maximum = batch_max
+    return source_rows, new_rows, None if maximum is None else _watermark_str(maximum.as_py())
+
+
+def merge_file_into_delta(
+    path: str,
+    fmt: str,
+    location: str,
+    key_columns: List[str],
+    stats: IngestionStats,
+    watermark_column: Optional[str] = None,
+    storage_options: Optional[Dict] = None,
+    onelake: Optional[OneLakeClient] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    schema: Optional[pl.Schema] = None,
+    rejects: Optional[RejectWriter] = None,
+) -> Dict:
+    """
+    Upsert a local source file into a Delta table with MERGE on key columns.
+
+    With a watermark column, source rows at or below the watermark stored by
+    the previous load are skipped, and the new maximum is recorded in the
+    commit metadata for the next load. A missing target table is created.
+
+    Returns:
+        A dictionary with source, skipped, inserted and updated row counts and
+        the previous and new watermark.
+    """
+    if not key_columns:
+        raise ValueError("At least one key column is required for a merge load.")
+    start = time.perf_counter()
+    try:
+        dt = DeltaTable(location, storage_options=storage_options)
+    except TableNotFoundError:
+        dt = None
+
+    previous = None
+    commit_metadata = {}
+    if watermark_column:
+        if dt is not None:
+            previous = read_watermark(
+                location, watermark_column, storage_options, onelake
+            )
+        source_rows, new_rows, watermark = scan_watermark(
+            path, fmt, watermark_column, previous, batch_size, schema
+        )
+        if watermark is not None:
+            commit_metadata = {
+                WATERMARK_COLUMN_KEY: watermark_column,
+                WATERMARK_VALUE_KEY: watermark,
+            }
+    else:
+        source_rows, new_rows, watermark = None, None, None
+
+    result = {
+        "source_rows": source_rows,
+        "skipped": None if new_rows is None else source_rows - new_rows,
+        "inserted": 0,
+        "updated": 0,
+        "previous_watermark": previous,
+        "watermark": watermark or previous,
+    }
+    batches = iter_source_batches(path, fmt, batch_size, schema, rejects)
+    if watermark_column:
+        batches = filter_above_watermark(batches, watermark_column, previous)
+    reader = batch_reader(batches, stats.observe)
+    if reader is None:
+        logger.info(f"No new rows to merge into {location}")
+        stats.write_seconds = time.perf_counter() - start
+        return result
+
+    commit_properties = CommitProperties(custom_metadata=commit_metadata or None)
+    if dt is None:
+        write_deltalake(
+            location,
+            reader,
+            storage_options=storage_options,
+            commit_properties=commit_properties,
+        )
+        result["inserted"] = stats.rows
+    else:
+        predicate = " AND ".join(f't."{k}" = s."{k}"' for k in key_columns)
+        metrics = (
+            dt.merge(
+                reader,
+                predicate=predicate,
+                source_alias="s",
+                target_alias="t",
+                commit_properties=commit_properties,
+            )
+            .when_matched_update_all()
+            .when_not_matched_insert_all()
+            .execute()
+        )
+        result["inserted"] = metrics.get("num_target_rows_inserted", 0)
+        result["updated"] = metrics.get("num_target_rows_updated", 0)
+    if result["source_rows"] is None:
+        result["source_rows"] = stats.rows
+    stats.write_seconds = time.perf_counter() - start
+    logger.info(
+        f"Merged {stats.rows} rows into {location}: "
+        f"{result['inserted']} inserted, {result['updated']} updated"
+    )
+    return result
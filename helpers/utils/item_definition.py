@@ -0,0 +1,107 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from fnmatch import fnmatch
+import asyncio
+import base64
+import json
+from cachetools import LRUCache, TTLCache
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Definitions keyed by (workspace, item, version). Versioned entries stay until
+# evicted; when the item exposes no version, entries expire quickly instead.
+_definition_cache = LRUCache(maxsize=32)
+_unversioned_cache = TTLCache(maxsize=32, ttl=120)
+# Fetches in progress, so concurrent callers share one getDefinition LRO
+_inflight: Dict[Tuple, asyncio.Task] = {}
+
+
+class DefinitionPart:
+    """One part of an item definition, decoded and parsed only on first access."""
+
+    def __init__(self, path: str, payload: str, payload_type: str = "InlineBase64"):
+        self.path = path
+        self.payload_type = payload_type
+        self._payload = payload
+        self._text: Optional[str] = None
+        self._json: Any = None
+
+    @property
+    def size(self) -> int:
+        """Approximate decoded size in bytes, without decoding."""
+        return len(self._payload) * 3 // 4
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            if self.payload_type == "InlineBase64":
+                self._text = base64.b64decode(self._payload).decode("utf-8-sig")
+            else:
+                self._text = self._payload
+        return self._text
+
+    def json(self) -> Any:
+        if self._json is None:
+            self._json = json.loads(self.text)
+        return self._json
+
+
+class ItemDefinition:
+    """The parts of an item definition, keyed by path."""
+
+    def __init__(self, definition: Dict, version: Optional[str] = None):
+        self.format = definition.get("format")
+        self.version = version
+        self.parts: Dict[str, DefinitionPart] = {
+            part["path"]: DefinitionPart(
+                part["path"], part.get("payload", ""), part.get("payloadType", "InlineBase64")
+            )
+            for part in definition.get("parts", [])
+        }
+
+    def paths(self, pattern: Optional[str] = None) -> List[str]:
+        """Part paths, optionally filtered by a glob pattern."""
+        return [p for p in self.parts if pattern is None or fnmatch(p, pattern)]
+
+    def part(self, path: str) -> Optional[DefinitionPart]:
+        return self.parts.get(path)
+
+
+async def get_cached_definition(
+    key: Tuple,
+    version: Optional[str],
+    fetch: Callable[[], Awaitable[Optional[Dict]]],
+    refresh: bool = False,
+) -> Optional[ItemDefinition]:
+    """
+    Get an item definition from the cache, fetching it when missing or stale.
+
+    Args:
+        key: Identifies the item, e.g. (workspace_id, item_id).
+        version: ETag or last-modified value of the item (None if unknown).
+        fetch: Coroutine function returning the raw definition.
+        refresh: Ignore cached entries.
+    """
+    cache = _definition_cache if version is not None else _unversioned_cache
+    cache_key = (*key, version)
+    if not refresh and cache_key in cache:
+        logger.debug(f"Definition cache hit for {key} at version {version}")
+        return cache[cache_key]
+
+    async def load() -> Optional[ItemDefinition]:
+        raw = await fetch()
+        if raw is None:
+            return None
+        definition = ItemDefinition(raw, version)
+        # Drop entries of older versions of the same item
+        for old in [k for k in _definition_cache if k[: len(key)] == key]:
+            _definition_cache.pop(old, None)
+        cache[cache_key] = definition
+        return definition
+
+    task = _inflight.get(cache_key)
+    if task is None:
+        task = asyncio.ensure_future(load())
+        _inflight[cache_key] = task
+        task.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+    return await asyncio.shield(task)
@@ -0,0 +1,59 @@
+from typing import Dict, List, Optional
+import re
+import polars as pl
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def referenced_tables(query: str, tables: List[Dict]) -> List[Dict]:
+    """Return the Delta tables whose names appear in a SQL query."""
+    matches = []
+    for table in tables:
+        if table.get("format", "").lower() != "delta":
+            continue
+        pattern = rf"(?<![\w.]){re.escape(table['name'])}(?!\w)"
+        if re.search(pattern, query, flags=re.IGNORECASE):
+            matches.append(table)
+    return matches
+
+
+def build_local_query(
+    query: str,
+    tables: List[Dict],
+    storage_options: Optional[Dict] = None,
+    limit: Optional[int] = None,
+) -> pl.LazyFrame:
+    """
+    Build a lazy polars query over Delta tables read directly from OneLake.
+
+    Each table is registered in a SQL context as a lazy Delta scan, so nothing is
+    read until the query is collected. Projections and filters in the query are
+    pushed down to the Parquet reader (row group statistics) and to the Delta
+    partition values, and only the files and columns needed are fetched.
+
+    Args:
+        query: SQL query referencing tables by name.
+        tables: Table records (name, location, format) to expose to the query.
+        storage_options: deltalake/object store options for OneLake.
+        limit: Maximum number of rows to return (optional).
+
+    Returns:
+        A LazyFrame for the query.
+    """
+    context = pl.SQLContext()
+    for table in tables:
+        logger.debug(f"Registering table {table['name']} at {table['location']}")
+        context.register(
+            table["name"],
+            pl.scan_delta(table["location"], storage_options=storage_options),
+        )
+    lf = context.execute(query, eager=False)
+    if limit is not None:
+        lf = lf.head(limit)
+    return lf
+
+
+def collect_streaming(lf: pl.LazyFrame) -> pl.DataFrame:
+    """Collect a lazy query with polars' streaming engine."""
+    return lf.collect(engine="streaming")
@@ -0,0 +1,172 @@
+from typing import Dict, List, Optional, Tuple
+from fnmatch import fnmatch
+from threading import Lock
+import base64
+import json
+from cachetools import TTLCache
+from helpers.clients.onelake_client import OneLakeClient
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_PAGE_SIZE = 1000
+
+# Listing pages keyed by (workspace, directory, recursive, continuation) and
+# path properties keyed by (workspace, path); short-lived since files change.
+_listing_cache = TTLCache(maxsize=1024, ttl=60)
+_listing_cache_lock = Lock()
+
+
+def _is_directory(entry: Dict) -> bool:
+    # The DFS listing returns "true" as a string
+    return str(entry.get("isDirectory", "false")).lower() == "true"
+
+
+def invalidate_listing_cache(workspace: str, prefix: str = ""):
+    """Drop cached listings and properties under a path prefix of a workspace."""
+    prefix = prefix.strip("/")
+    with _listing_cache_lock:
+        for key in list(_listing_cache):
+            if key[1] == workspace and key[2].startswith(prefix):
+                _listing_cache.pop(key, None)
+
+
+def list_page(
+    onelake: OneLakeClient,
+    workspace: str,
+    directory: str,
+    recursive: bool = False,
+    continuation: Optional[str] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Tuple[List[Dict], Optional[str]]:
+    """List one server-side page of a directory, served from the cache when fresh."""
+    key = ("list", workspace, directory.strip("/"), recursive, continuation, page_size)
+    with _listing_cache_lock:
+        cached = _listing_cache.get(key)
+    if cached is not None:
+        return cached
+    page = onelake.list_paths(
+        workspace,
+        directory,
+        recursive=recursive,
+        max_results=page_size,
+        continuation=continuation,
+    )
+    with _listing_cache_lock:
+        _listing_cache[key] = page
+    return page
+
+
+def get_path_properties(
+    onelake: OneLakeClient, workspace: str, path: str
+) -> Optional[Dict]:
+    """Get (cached) properties of a file or directory."""
+    key = ("stat", workspace, path.strip("/"))
+    with _listing_cache_lock:
+        if key in _listing_cache:
+            return _listing_cache[key]
+    properties = onelake.get_properties(workspace, path)
+    with _listing_cache_lock:
+        _listing_cache[key] = properties
+    return properties
+
+
+def encode_cursor(state: Dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+def _valid_cursor(state) -> bool:
+    return (
+        isinstance(state, dict)
+        and isinstance(state.get("dirs"), list)
+        and all(
+            isinstance(d, list)
+            and len(d) == 2
+            and isinstance(d[0], str)
+            and isinstance(d[1], int)
+            for d in state["dirs"]
+        )
+        and "continuation" in state
+        and (state["continuation"] is None or isinstance(state["continuation"], str))
+    )
+
+
+def decode_cursor(cursor: str) -> Dict:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise ValueError("Invalid page token.")
+    if not _valid_cursor(state):
+        raise ValueError("Invalid page token.")
+    return state
+
+
+def browse_files(
+    onelake: OneLakeClient,
+    workspace: str,
+    root: str,
+    recursive: bool = False,
+    max_depth: Optional[int] = None,
+    pattern: Optional[str] = None,
+    max_items: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Return the next page of entries under a root directory.
+
+    Directories are walked breadth first one server page at a time, stopping
+    once max_items entries are collected, so large trees are never enumerated
+    up front. The returned cursor resumes the walk where it stopped. With
+    max_depth, subdirectories up to that many levels below root are walked
+    (0 lists only root); without it, recursion is done server-side.
+
+    Entry names are relative to root. With a glob pattern, only files whose
+    relative path or file name matches are returned.
+
+    Returns:
+        A tuple (entries, cursor); the cursor is None when the walk is complete.
+    """
+    root = root.strip("/")
+    server_recursive = recursive and max_depth is None
+    if cursor:
+        state = decode_cursor(cursor)
+    else:
+        state = {"dirs": [[root, 0]], "continuation": None}
+
+    entries: List[Dict] = []
+    while state["dirs"] and len(entries) < max_items:
+        directory, depth = state["dirs"][0]
+        paths, continuation = list_page(
+            onelake,
+            workspace,
+            directory,
+            recursive=server_recursive,
+            continuation=state["continuation"],
+            page_size=max(1, max_items - len(entries)),
+        )
+        for entry in paths:
+            name = entry["name"][len(root) :].lstrip("/") if root else entry["name"]
+            is_dir = _is_directory(entry)
+            if is_dir and recursive and not server_recursive and depth < max_depth:
+                state["dirs"].append([entry["name"], depth + 1])
+            if pattern and (
+                is_dir
+                or not (fnmatch(name, pattern) or fnmatch(name.rsplit("/", 1)[-1], pattern))
+            ):
+                continue
+            entries.append(
+                {
+                    "name": name,
+                    "isDirectory": is_dir,
+                    "contentLength": int(entry.get("contentLength", 0) or 0),
+                    "lastModified": entry.get("lastModified"),
+                }
+            )
+        if continuation:
+            state["continuation"] = continuation
+        else:
+            state["dirs"].pop(0)
+            state["continuation"] = None
+
+    next_cursor = encode_cursor(state) if state["dirs"] else None
+    return entries, next_cursor
@@ -0,0 +1,23 @@
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+
+
+def parse_onelake_location(location: str) -> Optional[Tuple[str, str]]:
+    """
+    Split a OneLake URL into its workspace and the path inside the workspace.
+
+    Supports abfss://<workspace>@onelake.dfs.fabric.microsoft.com/<path> and
+    https://onelake.dfs.fabric.microsoft.com/<workspace>/<path>.
+
+    Returns:
+        A tuple (workspace, path), or None if the location is not on OneLake.
+    """
+    parsed = urlparse(location)
+    if parsed.scheme in ("abfss", "abfs") and "@" in parsed.netloc:
+        workspace, host = parsed.netloc.split("@", 1)
+        if host.startswith("onelake."):
+            return workspace, parsed.path.strip("/")
+    if parsed.scheme == "https" and parsed.netloc.startswith("onelake."):
+        workspace, _, path = parsed.path.strip("/").partition("/")
+        return workspace, path
+    return None
@@ -0,0 +1,122 @@
+from typing import Dict, List, Optional
+from contextlib import contextmanager
+from threading import Lock
+import bisect
+import time
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Upper bounds (in milliseconds) of the histogram buckets; the last bucket is open-ended.
+HISTOGRAM_BUCKETS_MS = [10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+
+class QueryProfile:
+    """Per-stage timings, row and byte counts for a single query execution."""
+
+    def __init__(self, name: str = "run_query"):
+        self.name = name
+        self.stages: Dict[str, float] = {}
+        self.rows: Optional[int] = None
+        self.bytes: Optional[int] = None
+        self._start = time.perf_counter()
+        self.total: Optional[float] = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block and add it to the named stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+            logger.debug(f"{self.name}: stage '{name}' took {elapsed * 1000:.1f} ms")
+
+    def finish(self) -> "QueryProfile":
+        """Stop the wall clock for the whole execution."""
+        self.total = time.perf_counter() - self._start
+        return self
+
+    def to_dict(self) -> Dict:
+        total = self.total if self.total is not None else time.perf_counter() - self._start
+        return {
+            "stages_ms": {k: round(v * 1000, 2) for k, v in self.stages.items()},
+            "total_ms": round(total * 1000, 2),
+            "rows": self.rows,
+            "bytes": self.bytes,
+        }
+
+
+class StageHistogram:
+    """Fixed-bucket latency histogram for one stage."""
+
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.min_ms: Optional[float] = None
+        self.max_ms: Optional[float] = None
+
+    def observe(self, value_ms: float):
+        self.counts[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        self.min_ms = value_ms if self.min_ms is None else min(self.min_ms, value_ms)
+        self.max_ms = value_ms if self.max_ms is None else max(self.max_ms, value_ms)
+
+    def to_dict(self) -> Dict:
+        labels = [f"<={b}ms" for b in HISTOGRAM_BUCKETS_MS] + [
+            f">{HISTOGRAM_BUCKETS_MS[-1]}ms"
+        ]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum_ms / self.count, 2) if self.count else None,
+            "min_ms": self.min_ms,
+            "max_ms": self.max_ms,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+_histograms: Dict[str, StageHistogram] = {}
+_histograms_lock = Lock()
+
+
+def record_profile(profile: QueryProfile):
+    """Add a finished profile to the process-wide stage histograms."""
+    data = profile.to_dict()
+    observations = dict(data["stages_ms"])
+    observations["total"] = data["total_ms"]
+    with _histograms_lock:
+        for stage, value_ms in observations.items():
+            _histograms.setdefault(stage, StageHistogram()).observe(value_ms)
+
+
+def get_histograms() -> Dict[str, Dict]:
+    """Return a snapshot of the aggregated stage histograms."""
+    with _histograms_lock:
+        return {stage: hist.to_dict() for stage, hist in _histograms.items()}
+
+
+def reset_histograms():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+def format_histograms_to_markdown(histograms: Dict[str, Dict]) -> str:
+    """Convert aggregated stage histograms to markdown."""
+    if not histograms:
+        return "No query profiles recorded yet."
+    labels: List[str] = list(next(iter(histograms.values()))["buckets"].keys())
+    md = "# Query Stage Timings\n\n"
+    md += "| Stage | Count | Mean (ms) | Min (ms) | Max (ms) | " + " | ".join(labels) + " |\n"
+    md += "|-------|-------|-----------|----------|----------|" + "|".join(
+        "---" for _ in labels
+    ) + "|\n"
+    for stage, hist in histograms.items():
+        counts = " | ".join(str(c) for c in hist["buckets"].values())
+        md += (
+            f"| {stage} | {hist['count']} | {hist['mean_ms']} | "
+            f"{round(hist['min_ms'], 2)} | {round(hist['max_ms'], 2)} | {counts} |\n"
+        )
+    return md
@@ -0,0 +1,171 @@
+from typing import Callable, Dict, Iterable, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import os
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+from deltalake import DeltaTable, write_deltalake
+from deltalake.exceptions import TableNotFoundError
+from helpers.utils.ingestion import batch_reader
+from helpers.utils.result_store import describe_schema, new_result_path
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Parquet exports: rows per part file and number of part files uploaded concurrently.
+DEFAULT_ROWS_PER_FILE = 1_000_000
+DEFAULT_EXPORT_WORKERS = 4
+
+
+def _to_arrow_batches(batches: Iterable[pl.DataFrame]):
+    for frame in batches:
+        yield from frame.to_arrow().to_batches()
+
+
+def export_parquet_files(
+    batches: Iterable[pl.DataFrame],
+    upload: Callable[[str, int], None],
+    rows_per_file: int = DEFAULT_ROWS_PER_FILE,
+    max_workers: int = DEFAULT_EXPORT_WORKERS,
+) -> Dict:
+    """
+    Write result batches into rolling Parquet part files and upload them concurrently.
+
+    Each part is written locally until it holds rows_per_file rows, then handed
+    to upload(local_path, part_index) on a thread pool while the next part is
+    written. At most max_workers parts are pending at a time, which bounds
+    memory and local disk use. Local part files are removed once uploaded.
+
+    Returns:
+        A dictionary with the row count, file count, bytes and schema.
+    """
+    max_workers = max(1, max_workers)
+    rows = 0
+    files = 0
+    total_bytes = 0
+    schema = None
+    writer = None
+    part_path = None
+    part_rows = 0
+    pending = deque()
+
+    def upload_part(path: str, index: int):
+        try:
+            upload(path, index)
+        finally:
+            os.remove(path)
+
+    def close_part():
+        nonlocal writer, part_rows, files, total_bytes
+        writer.close()
+        writer = None
+        total_bytes += os.path.getsize(part_path)
+        pending.append(executor.submit(upload_part, part_path, files))
+        files += 1
+        part_rows = 0
+        while len(pending) >= max_workers:
+            pending.popleft().result()
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="export-upload"
+    ) as executor:
+        try:
+            for batch in _to_arrow_batches(batches):
+                if schema is None:
+                    schema = batch.schema
+                elif batch.schema != schema:
+                    batch = batch.cast(schema)
+                if writer is None:
+                    part_path = new_result_path("parquet", prefix="export")
+                    writer = pq.ParquetWriter(part_path, schema)
+                writer.write_batch(batch)
+                rows += batch.num_rows
+                part_rows += batch.num_rows
+                if part_rows >= rows_per_file:
+                    close_part()
+            if writer is not None:
+                close_part()
+            while pending:
+                pending.popleft().result()
+        finally:
+            if writer is not None:
+                writer.close()
+                os.remove(part_path)
+
+    logger.info(f"Exported {rows} rows to {files} Parquet files")
+    return {
+        "rows": rows,
+        "files": files,
+        "bytes": total_bytes,
+        "schema": describe_schema(schema) if schema is not None else [],
+    }
+
+
+def _file_sizes(dt: DeltaTable):
+    actions = dt.get_add_actions(flatten=True)
+    if actions.num_rows == 0:
+        return []
+    return zip(
+        actions.column("path").to_pylist(), actions.column("size_bytes").to_pylist()
+    )
+
+
+def export_delta_table(
+    batches: Iterable[pl.DataFrame],
+    location: str,
+    storage_options: Optional[Dict] = None,
+    mode: str = "overwrite",
+) -> Dict:
+    """
+    Stream result batches into a Delta table (created if missing).
+
+    Returns:
+        A dictionary with the row count, files and bytes added, the new table
+        version and the schema.
+    """
+    try:
+        dt = DeltaTable(location, storage_options=storage_options)
+        previous = {path for path, _ in _file_sizes(dt)}
+    except TableNotFoundError:
+        previous = set()
+
+    rows = 0
+
+    def count(batch: pa.RecordBatch):
+        nonlocal rows
+        rows += batch.num_rows
+
+    reader = batch_reader(_to_arrow_batches(batches), count)
+    if reader is None:
+        logger.info(f"No rows to export to {location}")
+        return {"rows": 0, "files": 0, "bytes": 0, "version": None, "schema": []}
+    schema = reader.schema
+    write_deltalake(location, reader, mode=mode, storage_options=storage_options)
+
+    dt = DeltaTable(location, storage_options=storage_options)
+    added = [size for path, size in _file_sizes(dt) if path not in previous]
+    logger.info(f"Exported {rows} rows to {location}")
+    return {
+        "rows": rows,
+        "files": len(added),
+        "bytes": sum(added),
+        "version": dt.version(),
+        "schema": describe_schema(schema),
+    }
+
+
+def format_export_summary(destination: str, summary: Dict) -> str:
+    """Convert an export summary to markdown."""
+    md = f"### Query result exported to `{destination}`\n\n"
+    md += f"- **Rows:** {summary['rows']}\n"
+    md += f"- **Files:** {summary['files']}\n"
+    md += f"- **Size:** {summary['bytes']} bytes\n"
+    if summary.get("version") is not None:
+        md += f"- **Table version:** {summary['version']}\n"
+    if summary["schema"]:
+        md += "\n| Column | Type |\n"
+        md += "|--------|------|\n"
+        for column in summary["schema"]:
+            md += f"| {column['name']} | {column['type']} |\n"
+    return md
@@ -0,0 +1,218 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+import asyncio
+import time
+import requests
+from cachetools import TTLCache
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Polling interval when the server does not advise one, and how long a
+# refresh is tracked before the tracker gives up.
+DEFAULT_POLL_INTERVAL = 15
+MAX_TRACKING_SECONDS = 6 * 3600
+# Longest wait between polls while the service keeps failing transiently.
+MAX_RETRY_DELAY = 300
+
+TERMINAL_STATUSES = ("Completed", "Failed", "Cancelled", "Disabled", "TimedOut")
+
+# Tracked refreshes keyed by handle; finished entries expire after a day.
+_refreshes: TTLCache = TTLCache(maxsize=256, ttl=24 * 3600)
+# Background polling tasks, referenced here so they are not garbage collected
+_tasks: Dict[str, asyncio.Task] = {}
+
+
+def refresh_objects(
+    tables: Optional[List[str]] = None,
+    partitions: Optional[Dict[str, List[str]]] = None,
+) -> List[Dict[str, str]]:
+    """Build the 'objects' of an enhanced refresh request from table and partition names."""
+    objects = [{"table": table} for table in tables or []]
+    for table, names in (partitions or {}).items():
+        objects.extend({"table": table, "partition": name} for name in names)
+    return objects
+
+
+def _elapsed(start: Optional[str], end: Optional[str] = None) -> Optional[float]:
+    if not start:
+        return None
+    try:
+        started = datetime.fromisoformat(start.replace("Z", "+00:00"))
+        ended = (
+            datetime.fromisoformat(end.replace("Z", "+00:00"))
+            if end
+            else datetime.now(timezone.utc)
+        )
+    except ValueError:
+        return None
+    if started.tzinfo is None:
+        started = started.replace(tzinfo=timezone.utc)
+    if ended.tzinfo is None:
+        ended = ended.replace(tzinfo=timezone.utc)
+    return round((ended - started).total_seconds(), 1)
+
+
+def _update_tables(state: Dict, objects: List[Dict]):
+    """
+    Aggregate per-partition progress into per-table progress.
+
+    The API does not report when each table finished, so a table's duration
+    is measured from the start of the refresh to the poll that first saw all
+    of its partitions completed.
+    """
+    tables = state["tables"]
+    for obj in objects:
+        table = tables.setdefault(
+            obj.get("table", ""),
+            {"partitions": {}, "status": "NotStarted", "seconds": None},
+        )
+        table["partitions"][obj.get("partition") or "*"] = obj.get("status", "Unknown")
+    elapsed = time.monotonic() - state["_started"]
+    for table in tables.values():
+        statuses = set(table["partitions"].values())
+        if statuses <= {"Completed"}:
+            if table["status"] != "Completed":
+                table["seconds"] = round(elapsed, 1)
+            table["status"] = "Completed"
+        elif "Failed" in statuses:
+            table["status"] = "Failed"
+        elif statuses & {"InProgress", "Completed"}:
+            table["status"] = "InProgress"
+        else:
+            table["status"] = "NotStarted"
+
+
+def _apply_details(state: Dict, details: Dict):
+    state["status"] = details.get("status", state["status"])
+    state["extendedStatus"] = details.get("extendedStatus")
+    state["startTime"] = details.get("startTime") or state.get("startTime")
+    state["endTime"] = details.get("endTime")
+    state["messages"] = details.get("messages") or []
+    _update_tables(state, details.get("objects") or [])
+
+
+def _retry_delay(error: requests.RequestException, failures: int) -> Optional[float]:
+    """
+    Delay before polling again after a failed poll, or None if the failure is permanent.
+
+    Throttling (429), server errors and connection problems are retried with
+    exponential backoff, or after the Retry-After interval when one is given.
+    """
+    response = error.response
+    if response is not None:
+        status = response.status_code
+        if 400 <= status < 500 and status != 429:
+            return None
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+    return min(DEFAULT_POLL_INTERVAL * 2 ** (failures - 1), MAX_RETRY_DELAY)
+
+
+async def _poll(
+    handle: str,
+    fetch: Callable[[], Awaitable[Tuple[Dict, Optional[float]]]],
+    interval: Optional[float],
+):
+    state = _refreshes[handle]
+    deadline = time.monotonic() + MAX_TRACKING_SECONDS
+    failures = 0
+    try:
+        while True:
+            await asyncio.sleep(interval or DEFAULT_POLL_INTERVAL)
+            if time.monotonic() > deadline:
+                state["error"] = "Stopped tracking: the refresh is taking too long."
+                return
+            try:
+                details, interval = await fetch()
+            except requests.RequestException as e:
+                failures += 1
+                interval = _retry_delay(e, failures)
+                if interval is None:
+                    raise
+                logger.warning(
+                    f"Polling refresh {handle} failed ({failures} in a row), "
+                    f"retrying in {interval}s: {str(e)}"
+                )
+                state["error"] = f"Last poll failed, retrying: {str(e)}"
+                continue
+            failures = 0
+            state["error"] = None
+            state["polls"] += 1
+            _apply_details(state, details)
+            if state["status"] in TERMINAL_STATUSES:
+                logger.info(f"Refresh {handle} finished with status {state['status']}")
+                return
+    except Exception as e:
+        logger.error(f"Tracking refresh {handle} failed: {str(e)}")
+        state["error"] = str(e)
+    finally:
+        _tasks.pop(handle, None)
+
+
+def track_refresh(
+    handle: str,
+    info: Dict[str, Any],
+    fetch: Callable[[], Awaitable[Tuple[Dict, Optional[float]]]],
+    interval: Optional[float] = None,
+) -> Dict:
+    """
+    Register a refresh and poll its progress in the background.
+
+    Args:
+        handle: Identifies the refresh in later status calls.
+        info: Static details of the refresh (workspace, model, objects, ...).
+        fetch: Coroutine function returning the refresh details and the
+            polling interval advised by the server.
+        interval: Interval before the first poll, as advised by the server.
+
+    Returns:
+        The tracked state, updated in place as polls complete.
+    """
+    state = {
+        **info,
+        "handle": handle,
+        "status": "NotStarted",
+        "extendedStatus": None,
+        "startTime": None,
+        "endTime": None,
+        "messages": [],
+        "tables": {},
+        "polls": 0,
+        "error": None,
+        "_started": time.monotonic(),
+    }
+    _refreshes[handle] = state
+    _tasks[handle] = asyncio.ensure_future(_poll(handle, fetch, interval))
+    return state
+
+
+def get_refresh_state(handle: str) -> Optional[Dict]:
+    """Get a snapshot of a tracked refresh, or None if the handle is unknown."""
+    state = _refreshes.get(handle)
+    if state is None:
+        return None
+    snapshot = {k: v for k, v in state.items() if not k.startswith("_")}
+    snapshot["tracking"] = handle in _tasks
+    snapshot["seconds"] = _elapsed(state["startTime"], state["endTime"])
+    return snapshot
+
+
+def describe_refresh(details: Dict, info: Dict[str, Any]) -> Dict:
+    """Build a (one-off) refresh state from refresh details fetched directly."""
+    state = {
+        **info,
+        "status": None,
+        "tables": {},
+        "polls": 1,
+        "error": None,
+        "tracking": False,
+        "_started": time.monotonic(),
+    }
+    _apply_details(state, details)
+    # Without tracking, per-table durations are unknown
+    for table in state["tables"].values():
+        table["seconds"] = None
+    state["seconds"] = _elapsed(state["startTime"], state["endTime"])
+    return {k: v for k, v in state.items() if not k.startswith("_")}
@@ -0,0 +1,182 @@
+from typing import Any, Dict, Iterator, List, Optional
+import json
+from helpers.utils.item_definition import ItemDefinition
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Field reference kinds in report queries, projections and filters
+_FIELD_KINDS = ("Measure", "Column", "Hierarchy")
+
+
+def _walk(node: Any) -> Iterator[Dict]:
+    """Yield every dictionary nested in a JSON document."""
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _walk(value)
+
+
+def _field_refs(visual: Any) -> List[Dict[str, str]]:
+    """
+    Collect the model fields a visual binds to.
+
+    Field references look like {"Measure": {"Expression": {"SourceRef":
+    {"Entity": "Sales"}}, "Property": "Total"}}; queries of legacy reports
+    refer to an alias ({"Source": "s"}) declared in the query's From list.
+    """
+    aliases = {
+        node["Name"]: node["Entity"]
+        for node in _walk(visual)
+        if isinstance(node.get("Name"), str) and isinstance(node.get("Entity"), str)
+    }
+    fields = {}
+    for node in _walk(visual):
+        for kind in _FIELD_KINDS:
+            ref = node.get(kind)
+            if not isinstance(ref, dict):
+                continue
+            source = (ref.get("Expression") or {}).get("SourceRef") or {}
+            table = source.get("Entity") or aliases.get(source.get("Source"))
+            name = ref.get("Property") or ref.get("Hierarchy")
+            if table and isinstance(name, str):
+                fields[(kind, table, name)] = {
+                    "kind": kind.lower(),
+                    "table": table,
+                    "name": name,
+                }
+    return list(fields.values())
+
+
+def _literal(value: Any) -> Optional[str]:
+    """Read a literal such as {"expr": {"Literal": {"Value": "'Sales by region'"}}}."""
+    literal = ((value or {}).get("expr") or {}).get("Literal") or {}
+    text = literal.get("Value")
+    if isinstance(text, str) and len(text) >= 2 and text[0] == text[-1] == "'":
+        return text[1:-1].replace("''", "'")
+    return text
+
+
+def _visual_title(visual: Dict) -> Optional[str]:
+    for key in ("visualContainerObjects", "vcObjects"):
+        titles = (visual.get(key) or {}).get("title") or []
+        for title in titles:
+            text = _literal((title.get("properties") or {}).get("text"))
+            if text:
+                return text
+    return None
+
+
+class ReportIndex:
+    """Compact index of a report's pages, visuals and the model fields they use."""
+
+    def __init__(self):
+        self.pages: List[Dict] = []
+        self.visuals: List[Dict] = []
+
+    def _add_page(self, name: str, display_name: Optional[str], ordinal: Optional[int]):
+        page = {
+            "name": name,
+            "displayName": display_name or name,
+            "ordinal": ordinal,
+            "visuals": 0,
+        }
+        self.pages.append(page)
+        return page
+
+    def _add_visual(self, page: Dict, name: Optional[str], visual: Dict):
+        page["visuals"] += 1
+        self.visuals.append(
+            {
+                "page": page["displayName"],
+                "pageName": page["name"],
+                "name": name,
+                "type": visual.get("visualType"),
+                "title": _visual_title(visual),
+                "fields": _field_refs(visual),
+            }
+        )
+
+    def add_pbir(self, definition: ItemDefinition):
+        """Index a report in the PBIR format (one part per page and visual)."""
+        order = []
+        pages_part = definition.part("definition/pages/pages.json")
+        if pages_part is not None:
+            order = pages_part.json().get("pageOrder", [])
+        pages = {}
+        for path in definition.paths("definition/pages/*/page.json"):
+            page_json = definition.part(path).json()
+            folder = path.split("/")[2]
+            name = page_json.get("name", folder)
+            pages[folder] = self._add_page(
+                name,
+                page_json.get("displayName"),
+                order.index(name) if name in order else None,
+            )
+        for path in definition.paths("definition/pages/*/visuals/*/visual.json"):
+            page = pages.get(path.split("/")[2])
+            if page is None:
+                continue
+            visual_json = definition.part(path).json()
+            self._add_visual(page, visual_json.get("name"), visual_json.get("visual") or {})
+        self.pages.sort(key=lambda p: (p["ordinal"] is None, p["ordinal"] or 0))
+
+    def add_report_json(self, report: Dict):
+        """Index a report in the legacy format (a single report.json part)."""
+        for section in report.get("sections", []):
+            page = self._add_page(
+                section.get("name"), section.get("displayName"), section.get("ordinal")
+            )
+            for container in section.get("visualContainers", []):
+                config = container.get("config") or {}
+                if isinstance(config, str):
+                    try:
+                        config = json.loads(config)
+                    except ValueError:
+                        continue
+                visual = config.get("singleVisual") or config.get("singleVisualGroup") or {}
+                self._add_visual(page, config.get("name"), visual)
+        self.pages.sort(key=lambda p: (p["ordinal"] is None, p["ordinal"] or 0))
+
+    @classmethod
+    def from_definition(cls, definition: ItemDefinition) -> "ReportIndex":
+        """
+        Build the index from a PBIR or legacy (report.json) report definition.
+
+        Only page and visual parts are decoded; themes, images and bookmarks are not.
+        """
+        index = cls()
+        if definition.part("report.json") is not None:
+            index.add_report_json(definition.part("report.json").json())
+        else:
+            index.add_pbir(definition)
+        logger.info(f"Indexed {len(index.pages)} pages and {len(index.visuals)} visuals")
+        return index
+
+    # Lookups
+
+    def fields(self) -> List[Dict]:
+        """Distinct fields used by the report, with the number of visuals using each."""
+        usage = {}
+        for visual in self.visuals:
+            for field in visual["fields"]:
+                key = (field["table"].lower(), field["name"].lower())
+                entry = usage.setdefault(key, {**field, "visuals": 0})
+                entry["visuals"] += 1
+        return list(usage.values())
+
+    def find_visuals(self, field: str, table: Optional[str] = None) -> List[Dict]:
+        """Visuals bound to a field with this name (case-insensitive), optionally in a table."""
+        field = field.lower()
+        return [
+            visual
+            for visual in self.visuals
+            if any(
+                f["name"].lower() == field
+                and (table is None or f["table"].lower() == table.lower())
+                for f in visual["fields"]
+            )
+        ]
@@ -0,0 +1,171 @@
+from typing import Dict, Iterable, List, Optional, Union
+from datetime import datetime
+from uuid import uuid4
+import os
+import tempfile
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+RESULTS_DIR = os.path.join(tempfile.gettempdir(), "fabric_mcp_results")
+RESULT_FORMATS = {"parquet": "parquet", "arrow": "arrow", "ipc": "arrow"}
+
+
+def _normalize_format(fmt: str) -> str:
+    """Map a user supplied format name to 'parquet' or 'arrow'."""
+    normalized = RESULT_FORMATS.get((fmt or "").lower())
+    if normalized is None:
+        raise ValueError(
+            f"Unsupported result format: {fmt}. Use one of: {', '.join(RESULT_FORMATS)}."
+        )
+    return normalized
+
+
+def new_result_path(fmt: str, prefix: str = "query") -> str:
+    """Build a unique path for a spilled result file in the results directory."""
+    fmt = _normalize_format(fmt)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    return os.path.join(RESULTS_DIR, f"{prefix}_{stamp}_{uuid4().hex[:8]}.{fmt}")
+
+
+def describe_schema(schema: pa.Schema) -> List[Dict[str, str]]:
+    """Summarize an Arrow schema as a list of column name/type pairs."""
+    return [{"name": field.name, "type": str(field.type)} for field in schema]
+
+
+def write_batches(
+    batches: Iterable[Union[pl.DataFrame, pa.RecordBatch, pa.Table]],
+    path: str,
+    fmt: str = "parquet",
+) -> Dict:
+    """
+    Write batches to a Parquet or Arrow IPC file as they arrive.
+
+    Only one batch is held in memory at a time. The schema of the first batch
+    is used for the whole file; later batches are cast to it.
+
+    Args:
+        batches: Iterable of polars DataFrames or Arrow batches/tables.
+        path: Destination file path.
+        fmt: 'parquet' or 'arrow'.
+
+    Returns:
+        A dictionary with the path, format, row count, file size and schema.
+    """
+    fmt = _normalize_format(fmt)
+    writer = None
+    schema = None
+    rows = 0
+    try:
+        for batch in batches:
+            if isinstance(batch, pl.DataFrame):
+                batch = batch.to_arrow()
+            elif isinstance(batch, pa.RecordBatch):
+                batch = pa.Table.from_batches([batch])
+            if writer is None:
+                schema = batch.schema
+                if fmt == "parquet":
+                    writer = pq.ParquetWriter(path, schema)
+                else:
+                    writer = pa.ipc.new_file(path, schema)
+            elif batch.schema != schema:
+                batch = batch.cast(schema)
+            writer.write_table(batch)
+            rows += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        logger.info(f"No rows to write to {path}")
+        return {"path": None, "format": fmt, "rows": 0, "bytes": 0, "schema": []}
+
+    logger.info(f"Wrote {rows} rows to {path}")
+    return {
+        "path": path,
+        "format": fmt,
+        "rows": rows,
+        "bytes": os.path.getsize(path),
+        "schema": describe_schema(schema),
+    }
+
+
+def sink_lazy_result(lf: pl.LazyFrame, path: str, fmt: str = "parquet") -> Dict:
+    """
+    Stream a lazy query into a Parquet or Arrow IPC file with polars' streaming engine.
+
+    Returns:
+        A dictionary with the path, format, row count, file size and schema.
+    """
+    fmt = _normalize_format(fmt)
+    if fmt == "parquet":
+        lf.sink_parquet(path)
+    else:
+        lf.sink_ipc(path)
+    rows = open_result(path).select(pl.len()).collect().item()
+    logger.info(f"Wrote {rows} rows to {path}")
+    return {
+        "path": path,
+        "format": fmt,
+        "rows": rows,
+        "bytes": os.path.getsize(path),
+        "schema": [
+            {"name": name, "type": str(dtype)}
+            for name, dtype in lf.collect_schema().items()
+        ],
+    }
+
+
+def _format_from_path(path: str) -> str:
+    ext = os.path.splitext(path)[1].lstrip(".").lower()
+    return _normalize_format(ext)
+
+
+def open_result(path: str) -> pl.LazyFrame:
+    """
+    Open a spilled result file lazily; Arrow IPC files are memory-mapped.
+
+    Only files inside the results directory can be opened.
+    """
+    resolved = os.path.realpath(path)
+    results_dir = os.path.realpath(RESULTS_DIR)
+    if os.path.commonpath([resolved, results_dir]) != results_dir:
+        raise ValueError(f"Not a result file: {path}")
+    path = resolved
+    if not os.path.isfile(path):
+        raise ValueError(f"Result file not found: {path}")
+    if _format_from_path(path) == "arrow":
+        return pl.scan_ipc(path, memory_map=True)
+    return pl.scan_parquet(path)
+
+
+def read_result(
+    path: str, columns: Optional[List[str]] = None, limit: Optional[int] = None
+) -> pl.DataFrame:
+    """Read (part of) a spilled result file, pushing projection and limit down."""
+    lf = open_result(path)
+    if columns:
+        lf = lf.select(columns)
+    if limit is not None:
+        lf = lf.head(limit)
+    return lf.collect()
+
+
+def format_result_summary(summary: Dict) -> str:
+    """Convert a result file summary to markdown."""
+    if not summary.get("path"):
+        return "Query returned no rows; no result file was written."
+    md = "### Query result spilled to file\n\n"
+    md += f"- **Path:** `{summary['path']}`\n"
+    md += f"- **Format:** {summary['format']}\n"
+    md += f"- **Rows:** {summary['rows']}\n"
+    md += f"- **Size:** {summary['bytes']} bytes\n\n"
+    md += "| Column | Type |\n"
+    md += "|--------|------|\n"
+    for column in summary["schema"]:
+        md += f"| {column['name']} | {column['type']} |\n"
+    return md
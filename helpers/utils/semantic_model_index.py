@@ -0,0 +1,327 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+import re
+from helpers.utils.item_definition import ItemDefinition
+from helpers.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# TMDL object declarations indexed inside a table
+_TMDL_OBJECTS = ("measure", "column")
+_NAME = r"'(?:[^']|'')*'|[^\s=.']+"
+_DECLARATION = re.compile(rf"^(\w+)\s+({_NAME})\s*(?:=\s*(.*))?$")
+_PROPERTY = re.compile(r"^(\w+)\s*:\s*(.*)$")
+_QUALIFIED = re.compile(rf"^({_NAME})\.({_NAME})$")
+
+
+def _unquote(name: str) -> str:
+    name = name.strip()
+    if len(name) >= 2 and name[0] == name[-1] == "'":
+        return name[1:-1].replace("''", "'")
+    return name
+
+
+def _split_qualified(value: str) -> Tuple[str, str]:
+    """Split a TMDL column reference such as 'My Table'.'My Column'."""
+    match = _QUALIFIED.match(value.strip())
+    if not match:
+        table, _, column = value.rpartition(".")
+        return _unquote(table), _unquote(column)
+    return _unquote(match.group(1)), _unquote(match.group(2))
+
+
+def _tmdl_lines(text: str) -> Iterator[Tuple[int, str]]:
+    """Yield (indent level, stripped line); blank lines have level -1."""
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            yield -1, ""
+            continue
+        prefix = line[: len(line) - len(line.lstrip())]
+        yield prefix.count("\t") + prefix.count(" ") // 4, stripped
+
+
+def _read_expression(
+    first: str, lines: List[Tuple[int, str]], i: int, level: int
+) -> Tuple[str, int]:
+    """
+    Read an object's expression starting after its declaration line.
+
+    Multi-line expressions are indented two levels below the object, or
+    fenced in triple backticks.
+
+    Returns:
+        The expression and the index of the next unread line.
+    """
+    first = (first or "").strip()
+    if first.startswith("```"):
+        body = [first[3:]] if first[3:] else []
+        while i < len(lines) and not lines[i][1].endswith("```"):
+            body.append(lines[i][1])
+            i += 1
+        if i < len(lines):
+            body.append(lines[i][1][:-3])
+            i += 1
+        return "\n".join(b for b in body if b).strip(), i
+    body = [first] if first else []
+    while i < len(lines):
+        indent, text = lines[i]
+        if indent == -1 or indent >= level + 2:
+            body.append(text)
+            i += 1
+            continue
+        break
+    return "\n".join(body).strip(), i
+
+
+def _parse_tmdl_object(
+    lines: List[Tuple[int, str]], i: int, level: int
+) -> Tuple[Dict[str, str], int]:
+    """Read the properties of an object (one level below it) until the object ends."""
+    properties = {}
+    while i < len(lines):
+        indent, text = lines[i]
+        if indent == -1:
+            i += 1
+            continue
+        if indent <= level:
+            break
+        match = _PROPERTY.match(text)
+        if indent == level + 1 and match:
+            properties[match.group(1)] = match.group(2).strip()
+        i += 1
+    return properties, i
+
+
+class SemanticModelIndex:
+    """In-memory index of a semantic model's tables, columns, measures and relationships."""
+
+    def __init__(self):
+        self.tables: Dict[str, Dict] = {}
+        self.columns: List[Dict] = []
+        self.measures: List[Dict] = []
+        self.relationships: List[Dict] = []
+        self._measures_by_name: Dict[str, List[Dict]] = {}
+        self._columns_by_name: Dict[str, List[Dict]] = {}
+
+    # Building
+
+    def _add_table(self, name: str, description: Optional[str] = None) -> Dict:
+        table = self.tables.setdefault(
+            name.lower(),
+            {"name": name, "description": description, "columns": [], "measures": []},
+        )
+        return table
+
+    def _add_measure(self, table: Dict, measure: Dict):
+        measure["table"] = table["name"]
+        table["measures"].append(measure["name"])
+        self.measures.append(measure)
+        self._measures_by_name.setdefault(measure["name"].lower(), []).append(measure)
+
+    def _add_column(self, table: Dict, column: Dict):
+        column["table"] = table["name"]
+        table["columns"].append(column["name"])
+        self.columns.append(column)
+        self._columns_by_name.setdefault(column["name"].lower(), []).append(column)
+
+    def add_tmdl_table(self, text: str):
+        """Index a TMDL table file."""
+        lines = list(_tmdl_lines(text))
+        table = None
+        description: List[str] = []
+        i = 0
+        while i < len(lines):
+            indent, line = lines[i]
+            i += 1
+            if line.startswith("///"):
+                description.append(line[3:].strip())
+                continue
+            match = _DECLARATION.match(line)
+            if not match:
+                if indent != -1:
+                    description = []
+                continue
+            kind, name, rest = match.group(1), _unquote(match.group(2)), match.group(3)
+            doc = "\n".join(description) or None
+            description = []
+            if kind == "table" and indent == 0:
+                table = self._add_table(name, doc)
+                continue
+            if table is None or indent != 1 or kind not in _TMDL_OBJECTS:
+                continue
+            expression, i = _read_expression(rest, lines, i, indent)
+            properties, i = _parse_tmdl_object(lines, i, indent)
+            if kind == "measure":
+                self._add_measure(
+                    table,
+                    {
+                        "name": name,
+                        "expression": expression,
+                        "formatString": properties.get("formatString"),
+                        "displayFolder": properties.get("displayFolder"),
+                        "description": doc,
+                    },
+                )
+            else:
+                self._add_column(
+                    table,
+                    {
+                        "name": name,
+                        "dataType": properties.get("dataType"),
+                        "expression": expression or None,
+                        "sourceColumn": properties.get("sourceColumn"),
+                        "description": doc,
+                    },
+                )
+
+    def add_tmdl_relationships(self, text: str):
+        """Index a TMDL relationships file."""
+        lines = list(_tmdl_lines(text))
+        i = 0
+        while i < len(lines):
+            indent, line = lines[i]
+            i += 1
+            match = _DECLARATION.match(line)
+            if not match or match.group(1) != "relationship" or indent != 0:
+                continue
+            properties, i = _parse_tmdl_object(lines, i, indent)
+            self._add_relationship(
+                _unquote(match.group(2)),
+                properties.get("fromColumn", ""),
+                properties.get("toColumn", ""),
+                properties,
+            )
+
+    def _add_relationship(
+        self, name: str, from_column: str, to_column: str, properties: Dict
+    ):
+        from_table, from_col = _split_qualified(from_column)
+        to_table, to_col = _split_qualified(to_column)
+        self.relationships.append(
+            {
+                "name": name,
+                "fromTable": from_table,
+                "fromColumn": from_col,
+                "toTable": to_table,
+                "toColumn": to_col,
+                "crossFilteringBehavior": properties.get(
+                    "crossFilteringBehavior", "oneDirection"
+                ),
+                "isActive": str(properties.get("isActive", "true")).lower() != "false",
+            }
+        )
+
+    def add_bim(self, model: Dict):
+        """Index a TMSL (model.bim) model."""
+        model = model.get("model", model)
+
+        def text(value) -> Optional[str]:
+            if isinstance(value, list):
+                return "\n".join(value)
+            return value
+
+        for t in model.get("tables", []):
+            table = self._add_table(t["name"], text(t.get("description")))
+            for m in t.get("measures", []):
+                self._add_measure(
+                    table,
+                    {
+                        "name": m["name"],
+                        "expression": (text(m.get("expression")) or "").strip(),
+                        "formatString": m.get("formatString"),
+                        "displayFolder": m.get("displayFolder"),
+                        "description": text(m.get("description")),
+                    },
+                )
+            for c in t.get("columns", []):
+                self._add_column(
+                    table,
+                    {
+                        "name": c["name"],
+                        "dataType": c.get("dataType"),
+                        "expression": text(c.get("expression")),
+                        "sourceColumn": c.get("sourceColumn"),
+                        "description": text(c.get("description")),
+                    },
+                )
+        for r in model.get("relationships", []):
+            self.relationships.append(
+                {
+                    "name": r.get("name"),
+                    "fromTable": r.get("fromTable"),
+                    "fromColumn": r.get("fromColumn"),
+                    "toTable": r.get("toTable"),
+                    "toColumn": r.get("toColumn"),
+                    "crossFilteringBehavior": r.get(
+                        "crossFilteringBehavior", "oneDirection"
+                    ),
+                    "isActive": r.get("isActive", True),
+                }
+            )
+
+    @classmethod
+    def from_definition(cls, definition: ItemDefinition) -> "SemanticModelIndex":
+        """
+        Build the index from a TMDL or TMSL definition.
+
+        Only the table, relationship (TMDL) or model.bim (TMSL) parts are decoded.
+        """
+        index = cls()
+        bim = [p for p in definition.paths() if p.endswith("model.bim")]
+        if bim:
+            index.add_bim(definition.part(bim[0]).json())
+        else:
+            for path in definition.paths("*definition/tables/*.tmdl"):
+                index.add_tmdl_table(definition.part(path).text)
+            for path in definition.paths("*definition/relationships.tmdl"):
+                index.add_tmdl_relationships(definition.part(path).text)
+        logger.info(
+            f"Indexed {len(index.tables)} tables, {len(index.columns)} columns, "
+            f"{len(index.measures)} measures and {len(index.relationships)} relationships"
+        )
+        return index
+
+    # Lookups
+
+    def get_table(self, name: str) -> Optional[Dict]:
+        return self.tables.get(name.lower())
+
+    def get_measures(self, name: str) -> List[Dict]:
+        """Measures with exactly this name (case-insensitive)."""
+        return self._measures_by_name.get(name.lower(), [])
+
+    def get_columns(self, name: str) -> List[Dict]:
+        """Columns with exactly this name (case-insensitive), across tables."""
+        return self._columns_by_name.get(name.lower(), [])
+
+    def find_tables(self, text: str) -> List[Dict]:
+        text = text.lower()
+        return [t for key, t in self.tables.items() if text in key]
+
+    def find_measures(self, text: str, in_expressions: bool = False) -> List[Dict]:
+        """Measures whose name (or, optionally, DAX expression) contains the text."""
+        text = text.lower()
+        return [
+            m
+            for m in self.measures
+            if text in m["name"].lower()
+            or (in_expressions and text in (m["expression"] or "").lower())
+        ]
+
+    def find_columns(self, text: str, table: Optional[str] = None) -> List[Dict]:
+        text = text.lower()
+        return [
+            c
+            for c in self.columns
+            if text in c["name"].lower()
+            and (table is None or c["table"].lower() == table.lower())
+        ]
+
+    def relationships_for(self, table: str) -> List[Dict]:
+        table = table.lower()
+        return [
+            r
+            for r in self.relationships
+            if (r["fromTable"] or "").lower() == table
+            or (r["toTable"] or "").lower() == table
+        ]
@@ -1,39 +1,182 @@
-from typing import Dict, List, Tuple, Optional
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 from azure.identity import DefaultAzureCredential
+from cachetools import LRUCache
 from deltalake import DeltaTable
+from mcp.server.fastmcp import Context
+from helpers.utils.onelake_paths import parse_onelake_location
 from helpers.logging_config import get_logger
 import asyncio
+import os
+
+if TYPE_CHECKING:
+    # helpers.clients imports this module through table_client
+    from helpers.clients.onelake_client import OneLakeClient
 
 logger = get_logger(__name__)
 
+# Default cap on concurrent table loads and per-table timeout (seconds).
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TABLE_TIMEOUT = 60
+
+# Schema cache: table location -> (version, schema, metadata)
+_schema_cache = LRUCache(maxsize=1024)
+_schema_cache_lock = Lock()
+
+
+def get_storage_options(credential: DefaultAzureCredential) -> Dict[str, str]:
+    """Build deltalake storage options for OneLake from an Azure credential."""
+    # Get token for Azure Storage (not Fabric API)
+    token = credential.get_token("https://storage.azure.com/.default").token
+    return {"bearer_token": token, "use_fabric_endpoint": "true"}
+
 
 async def get_delta_schemas(
-    tables: List[Dict], credential: DefaultAzureCredential
+    tables: List[Dict],
+    credential: DefaultAzureCredential,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: Optional[float] = DEFAULT_TABLE_TIMEOUT,
+    ctx: Optional[Context] = None,
+    metadata_only: bool = True,
 ) -> List[Tuple[Dict, object, object]]:
-    """Get schema and metadata for each Delta table"""
-    delta_tables = []
+    """Get schema and metadata for each Delta table.
+
+    Tables are loaded on a bounded thread pool since opening a DeltaTable is
+    blocking network I/O. Tables that fail or exceed the timeout are skipped.
+
+    Args:
+        tables: Table records as returned by the Fabric tables API.
+        credential: Azure credential used to get a storage token.
+        max_workers: Maximum number of tables loaded concurrently.
+        timeout: Seconds allowed per table (None for no limit).
+        ctx: MCP context used to report progress (optional).
+        metadata_only: Open tables without tracking their data files.
+    """
     logger.info(f"Starting schema extraction for {len(tables)} tables")
 
-    # Get token for Azure Storage (not Fabric API)
-    token = credential.get_token("https://storage.azure.com/.default").token
-    storage_options = {"bearer_token": token, "use_fabric_endpoint": "true"}
-
-    for table in tables:
-        task = asyncio.create_task(get_delta_table(table, storage_options))
-        delta_tables.append(task)
-        logger.debug(f"Created task for table: {table['name']}")
-    # Wait for all tasks to complete
-    delta_tables = await asyncio.gather(*delta_tables)
+    from helpers.clients.onelake_client import OneLakeClient
+
+    storage_options = get_storage_options(credential)
+    onelake = OneLakeClient(credential)
+    max_workers = max(1, max_workers)
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_workers)
+    total = len(tables)
+    completed = 0
+
+    def release(future: asyncio.Future):
+        semaphore.release()
+        if not future.cancelled():
+            # Retrieve the outcome of loads nobody awaits any more (timed out)
+            future.exception()
+
+    async def load(table: Dict, executor: ThreadPoolExecutor):
+        nonlocal completed
+        # A slot is held until the worker thread really finishes, even after a
+        # timeout, so the pool always has a free thread for the next table and
+        # its timeout only covers its own load, not time spent queued.
+        await semaphore.acquire()
+        future = loop.run_in_executor(
+            executor,
+            get_delta_table,
+            table,
+            storage_options,
+            metadata_only,
+            onelake,
+        )
+        future.add_done_callback(release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out after {timeout}s loading table {table['name']}")
+            return None
+        finally:
+            completed += 1
+            if ctx is not None:
+                await ctx.report_progress(completed, total)
+
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="delta-schema"
+    )
+    try:
+        delta_tables = await asyncio.gather(
+            *(load(table, executor) for table in tables)
+        )
+    finally:
+        # Do not block on loads that timed out; their threads finish on their own.
+        executor.shutdown(wait=False, cancel_futures=True)
+
     logger.info(f"Completed schema extraction for {len(delta_tables)} tables")
     # Filter out None values
     delta_tables = [dt for dt in delta_tables if dt is not None]
     return delta_tables
 
 
-async def get_delta_table(
-    table: Dict, storage_options: Optional[Dict] = None
+def _version_from_log_entry(name: str) -> Optional[int]:
+    """Return the commit version of a _delta_log entry, or None for other files."""
+    name = name.rsplit("/", 1)[-1]
+    stem, _, ext = name.partition(".")
+    if ext in ("json", "checkpoint.parquet") and stem.isdigit():
+        return int(stem)
+    return None
+
+
+def get_latest_delta_version(
+    location: str, onelake: Optional["OneLakeClient"] = None
+) -> Optional[int]:
+    """
+    Find the latest committed version of a Delta table by listing its _delta_log.
+
+    This is a single (paginated) directory listing and does not read the log.
+
+    Returns:
+        The latest version, or None if it cannot be determined.
+    """
+    log_dir = f"{location.rstrip('/')}/_delta_log"
+    try:
+        onelake_path = parse_onelake_location(log_dir)
+        if onelake_path is not None:
+            if onelake is None:
+                return None
+            workspace, directory = onelake_path
+            names = (p["name"] for p in onelake.iter_paths(workspace, directory))
+        elif os.path.isdir(log_dir):
+            names = iter(os.listdir(log_dir))
+        else:
+            return None
+        versions = [v for v in map(_version_from_log_entry, names) if v is not None]
+        return max(versions) if versions else None
+    except Exception as e:
+        logger.warning(f"Could not list Delta log at {log_dir}: {str(e)}")
+        return None
+
+
+def clear_schema_cache(location_prefix: Optional[str] = None):
+    """Drop cached schemas, optionally only those under a location prefix."""
+    with _schema_cache_lock:
+        if location_prefix is None:
+            _schema_cache.clear()
+            return
+        for location in [k for k in _schema_cache if k.startswith(location_prefix)]:
+            _schema_cache.pop(location, None)
+
+
+def get_delta_table(
+    table: Dict,
+    storage_options: Optional[Dict] = None,
+    metadata_only: bool = False,
+    onelake: Optional["OneLakeClient"] = None,
 ) -> Optional[Tuple[Dict, object, object]]:
-    """Get Delta table schema and metadata"""
+    """Get Delta table schema and metadata (blocking).
+
+    With metadata_only, the log is replayed without collecting add actions,
+    which is all that is needed for the schema and metadata.
+
+    Results are cached by location and version: when a listing of _delta_log
+    shows no new commit, the cached schema is returned without opening the
+    table. The returned table info carries the loaded "version".
+    """
     logger.debug(f"Processing table: {table['name']}")
 
     # Check if the table is a Delta table
@@ -43,11 +186,32 @@ async def get_delta_table(
             table_path = table["location"]
             logger.debug(f"Processing Delta table: {table['name']} at {table_path}")
 
+            latest_version = get_latest_delta_version(table_path, onelake)
+            with _schema_cache_lock:
+                cached = _schema_cache.get(table_path)
+            if (
+                cached is not None
+                and latest_version is not None
+                and cached[0] == latest_version
+            ):
+                logger.debug(
+                    f"Schema cache hit for {table['name']} at version {latest_version}"
+                )
+                return ({**table, "version": cached[0]}, cached[1], cached[2])
+
             # Create DeltaTable instance with storage options
-            delta_table = DeltaTable(table_path, storage_options=storage_options)
+            delta_table = DeltaTable(
+                table_path,
+                storage_options=storage_options,
+                without_files=metadata_only,
+            )
 
             # Get both schema and metadata
-            result = (table, delta_table.schema(), delta_table.metadata())
+            version = delta_table.version()
+            schema, metadata = delta_table.schema(), delta_table.metadata()
+            with _schema_cache_lock:
+                _schema_cache[table_path] = (version, schema, metadata)
+            result = ({**table, "version": version}, schema, metadata)
             logger.info(f"Processed table: {table['name']}")
             return result
 
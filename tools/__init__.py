@@ -1,20 +1,46 @@
 from tools.workspace import set_workspace, list_workspaces
 from tools.warehouse import set_warehouse, list_warehouses
-from tools.lakehouse import set_lakehouse, list_lakehouses
+from tools.lakehouse import (
+    set_lakehouse,
+    list_lakehouses,
+    list_lakehouse_files,
+    stat_lakehouse_file,
+    upload_file_to_lakehouse,
+    refresh_sql_endpoint,
+)
 from tools.table import (
     set_table,
     list_tables,
     get_lakehouse_table_schema,
     get_all_lakehouse_schemas,
+    get_table_stats,
+    preview_table,
+    analyze_table_layout,
+    optimize_table,
+    vacuum_table,
+    get_table_history,
+    get_table_at_version,
     run_query,
+    export_query,
+    preview_query_result,
+    get_query_timings,
+    run_local_query,
 )
 from tools.semantic_model import (
     list_semantic_models,
     get_semantic_model,
+    get_semantic_model_definition,
+    search_semantic_model,
+    get_semantic_model_measure,
+    run_dax_query,
+    refresh_semantic_model,
+    get_semantic_model_refresh_status,
 )
 from tools.report import (
     list_reports,
     get_report,
+    get_report_pages,
+    find_report_visuals,
 )
 from tools.load_data import load_data_from_url
 from tools.notebook import list_notebooks, create_notebook
@@ -26,16 +52,39 @@ __all__ = [
     "list_warehouses",
     "set_lakehouse",
     "list_lakehouses",
+    "list_lakehouse_files",
+    "stat_lakehouse_file",
+    "upload_file_to_lakehouse",
+    "refresh_sql_endpoint",
     "set_table",
     "list_tables",
     "get_lakehouse_table_schema",
     "get_all_lakehouse_schemas",
+    "get_table_stats",
+    "preview_table",
+    "analyze_table_layout",
+    "optimize_table",
+    "vacuum_table",
+    "get_table_history",
+    "get_table_at_version",
     "list_semantic_models",
     "get_semantic_model",
+    "get_semantic_model_definition",
+    "search_semantic_model",
+    "get_semantic_model_measure",
+    "run_dax_query",
+    "refresh_semantic_model",
+    "get_semantic_model_refresh_status",
     "list_reports",
     "get_report",
+    "get_report_pages",
+    "find_report_visuals",
     "load_data_from_url",
     "run_query",
+    "export_query",
+    "preview_query_result",
+    "get_query_timings",
+    "run_local_query",
     "list_notebooks",
     "create_notebook",
 ]
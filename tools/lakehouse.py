@@ -4,13 +4,32 @@ from helpers.utils.authentication import get_azure_credentials
 from helpers.clients import (
     FabricApiClient,
     LakehouseClient,
+    OneLakeClient,
+    refresh_sql_endpoint_metadata,
+)
+from helpers.clients.onelake_client import (
+    DEFAULT_UPLOAD_CHUNK_SIZE,
+    DEFAULT_UPLOAD_WORKERS,
+)
+from helpers.utils.download import download_file, download_path
+from helpers.utils.onelake_files import (
+    DEFAULT_PAGE_SIZE,
+    browse_files,
+    get_path_properties,
+    invalidate_listing_cache,
+)
+from helpers.formatters.files_formatter import (
+    format_file_listing_to_markdown,
+    format_file_properties_to_markdown,
 )
 from helpers.logging_config import get_logger
+import asyncio
+import os
 
 # import sempy_labs as labs
 # import sempy_labs.lakehouse as slh
 
-from typing import Optional
+from typing import List, Optional
 
 logger = get_logger(__name__)
 
@@ -100,3 +119,276 @@ async def create_lakehouse(
     except Exception as e:
         logger.error(f"Error creating lakehouse: {e}")
         return f"Error creating lakehouse: {e}"
+
+
+async def _resolve_lakehouse(
+    workspace: Optional[str], lakehouse: Optional[str], credential, ctx: Context
+) -> tuple:
+    """Resolve the workspace and lakehouse (or those set in the context) to IDs.
+
+    Returns:
+        A tuple (workspace_id, lakehouse_id, lakehouse).
+    """
+    ws = workspace or __ctx_cache.get(f"{ctx.client_id}_workspace")
+    if not ws:
+        raise ValueError(
+            "Workspace not set. Please set a workspace using the 'set_workspace' command."
+        )
+    lh = lakehouse or __ctx_cache.get(f"{ctx.client_id}_lakehouse")
+    if not lh:
+        raise ValueError(
+            "Lakehouse not set. Please set a lakehouse using the 'set_lakehouse' command."
+        )
+    fabric_client = FabricApiClient(credential=credential)
+    _, workspace_id = await fabric_client.resolve_workspace_name_and_id(ws)
+    lakehouse_id = await fabric_client.resolve_item_id(
+        item=lh, type="Lakehouse", workspace=workspace_id
+    )
+    return str(workspace_id), str(lakehouse_id), lh
+
+
+def _files_relative(path: str) -> str:
+    """Strip slashes and a leading 'Files/' from a path under the lakehouse Files area."""
+    path = (path or "").strip("/")
+    if path.lower() == "files":
+        return ""
+    if path.lower().startswith("files/"):
+        path = path[len("files/") :]
+    return path
+
+
+@mcp.tool()
+async def list_lakehouse_files(
+    path: str = "",
+    workspace: Optional[str] = None,
+    lakehouse: Optional[str] = None,
+    recursive: bool = False,
+    max_depth: Optional[int] = None,
+    pattern: Optional[str] = None,
+    max_items: int = DEFAULT_PAGE_SIZE,
+    page_token: Optional[str] = None,
+    ctx: Context = None,
+) -> str:
+    """List files and directories in the Files area of a lakehouse, one page at a time.
+
+    Listings are paginated on the server and cached for a short time. Pass the
+    returned page token to get the next page of a large directory tree.
+
+    Args:
+        path: Directory under 'Files/' to list (default: the Files root).
+        workspace: Name or ID of the workspace (optional)
+        lakehouse: Name or ID of the lakehouse (optional)
+        recursive: Include subdirectories.
+        max_depth: With recursive, how many directory levels to descend (optional).
+        pattern: Glob pattern matched against file paths or names, e.g. '*.csv' (optional).
+        max_items: Maximum number of entries per page.
+        page_token: Token returned by a previous call to continue listing (optional).
+        ctx: Context object containing client information
+
+    Returns:
+        A markdown table of entries and the next page token, or an error message.
+    """
+    try:
+        credential = get_azure_credentials(ctx.client_id, __ctx_cache)
+        workspace_id, lakehouse_id, _ = await _resolve_lakehouse(
+            workspace, lakehouse, credential, ctx
+        )
+        relative = _files_relative(path)
+        root = f"{lakehouse_id}/Files/{relative}".rstrip("/")
+        entries, cursor = await asyncio.to_thread(
+            browse_files,
+            OneLakeClient(credential),
+            workspace_id,
+            root,
+            recursive=recursive,
+            max_depth=max_depth,
+            pattern=pattern,
+            max_items=max(1, max_items),
+            cursor=page_token,
+        )
+        return format_file_listing_to_markdown(
+            f"Files/{relative}".rstrip("/"), entries, cursor
+        )
+    except Exception as e:
+        logger.error(f"Error listing lakehouse files: {e}")
+        return f"Error listing lakehouse files: {e}"
+
+
+@mcp.tool()
+async def stat_lakehouse_file(
+    path: str,
+    workspace: Optional[str] = None,
+    lakehouse: Optional[str] = None,
+    ctx: Context = None,
+) -> str:
+    """Get the size, type and last modified time of a file or directory in a lakehouse.
+
+    Args:
+        path: Path under 'Files/', e.g. 'raw/sales.csv'.
+        workspace: Name or ID of the workspace (optional)
+        lakehouse: Name or ID of the lakehouse (optional)
+        ctx: Context object containing client information
+
+    Returns:
+        The file properties in markdown or an error message.
+    """
+    try:
+        credential = get_azure_credentials(ctx.client_id, __ctx_cache)
+        workspace_id, lakehouse_id, _ = await _resolve_lakehouse(
+            workspace, lakehouse, credential, ctx
+        )
+        relative = _files_relative(path)
+        properties = await asyncio.to_thread(
+            get_path_properties,
+            OneLakeClient(credential),
+            workspace_id,
+            f"{lakehouse_id}/Files/{relative}",
+        )
+        if properties is None:
+            return f"No file or directory found at 'Files/{relative}'."
+        return format_file_properties_to_markdown(
+            {**properties, "name": f"Files/{relative}"}
+        )
+    except Exception as e:
+        logger.error(f"Error getting lakehouse file properties: {e}")
+        return f"Error getting lakehouse file properties: {e}"
+
+
+@mcp.tool()
+async def upload_file_to_lakehouse(
+    source: str,
+    destination_path: str,
+    workspace: Optional[str] = None,
+    lakehouse: Optional[str] = None,
+    chunk_size_mb: int = DEFAULT_UPLOAD_CHUNK_SIZE // (1024 * 1024),
+    max_concurrency: int = DEFAULT_UPLOAD_WORKERS,
+    overwrite: bool = True,
+    ctx: Context = None,
+) -> str:
+    """Upload a file into the Files area of a lakehouse.
+
+    The file is split into blocks that are uploaded concurrently to OneLake and
+    committed at the end, so a failed upload leaves nothing behind.
+
+    Args:
+        source: Local file path, or an http(s) URL to download first.
+        destination_path: Path under the lakehouse 'Files/' folder, e.g. 'raw/sales.csv'.
+        workspace: Name or ID of the workspace (optional)
+        lakehouse: Name or ID of the lakehouse (optional)
+        chunk_size_mb: Size of each uploaded block in MB.
+        max_concurrency: Maximum number of blocks uploaded in parallel.
+        overwrite: Replace the file if it already exists.
+        ctx: Context object containing client information
+
+    Returns:
+        A summary of the upload or an error message.
+    """
+    if chunk_size_mb < 1 or max_concurrency < 1:
+        return "chunk_size_mb and max_concurrency must be at least 1."
+    tmp_path = None
+    try:
+        credential = get_azure_credentials(ctx.client_id, __ctx_cache)
+        workspace_id, lakehouse_id, lh = await _resolve_lakehouse(
+            workspace, lakehouse, credential, ctx
+        )
+
+        if source.lower().startswith(("http://", "https://")):
+            tmp_path = download_path(source)
+            await asyncio.to_thread(download_file, source, tmp_path)
+            source_path = tmp_path
+        elif os.path.isfile(source):
+            source_path = source
+        else:
+            return f"Source file not found: {source}"
+
+        destination_path = _files_relative(destination_path)
+        path = f"{lakehouse_id}/Files/{destination_path}"
+
+        loop = asyncio.get_running_loop()
+
+        def progress(done: int, total: int):
+            asyncio.run_coroutine_threadsafe(ctx.report_progress(done, total), loop)
+
+        onelake = OneLakeClient(credential)
+        result = await asyncio.to_thread(
+            onelake.upload_file,
+            str(workspace_id),
+            path,
+            source_path,
+            chunk_size=chunk_size_mb * 1024 * 1024,
+            max_workers=max_concurrency,
+            overwrite=overwrite,
+            progress=progress,
+        )
+        invalidate_listing_cache(str(workspace_id), f"{lakehouse_id}/Files")
+        mb_per_second = (
+            round(result["bytes"] / 1024 / 1024 / result["seconds"], 2)
+            if result["seconds"]
+            else None
+        )
+        return (
+            f"Uploaded '{source}' to 'Files/{destination_path}' in lakehouse '{lh}': "
+            f"{result['bytes']} bytes in {result['blocks']} blocks of "
+            f"{result['block_size']} bytes, {result['seconds']:.1f}s ({mb_per_second} MB/s)."
+        )
+    except Exception as e:
+        logger.error(f"Error uploading file: {e}")
+        return f"Error uploading file: {e}"
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@mcp.tool()
+async def refresh_sql_endpoint(
+    tables: Optional[List[str]] = None,
+    workspace: Optional[str] = None,
+    lakehouse: Optional[str] = None,
+    timeout_minutes: int = 15,
+    ctx: Context = None,
+) -> str:
+    """Sync a lakehouse's SQL analytics endpoint with its Delta tables and wait for it.
+
+    Call this after writing Delta tables so run_query sees them, instead of
+    retrying until the automatic sync catches up. A sync already running for
+    the endpoint is joined rather than started again. When it completes, the
+    cached SQL endpoint and table list of the lakehouse are refreshed.
+
+    Args:
+        tables: Tables whose sync status is reported (optional, defaults to all).
+        workspace: Name or ID of the workspace (optional)
+        lakehouse: Name or ID of the lakehouse (optional)
+        timeout_minutes: Maximum duration of the sync.
+        ctx: Context object containing client information
+
+    Returns:
+        The sync status of the tables or an error message.
+    """
+    try:
+        ws = workspace or __ctx_cache.get(f"{ctx.client_id}_workspace")
+        lh = lakehouse or __ctx_cache.get(f"{ctx.client_id}_lakehouse")
+        if not ws or not lh:
+            return "Workspace and lakehouse must be specified or set in the context."
+        result = await refresh_sql_endpoint_metadata(
+            ws, lh, tables=tables, timeout_minutes=timeout_minutes
+        )
+        markdown = f"### SQL endpoint of lakehouse '{lh}' synced in {result['seconds']}s"
+        if result["shared"]:
+            markdown += " (joined a sync in progress)"
+        markdown += "\n\n| Table | Status | Last successful sync | Error |\n"
+        markdown += "|-------|--------|----------------------|-------|\n"
+        for table in result["tables"]:
+            error = table.get("error") or ""
+            if isinstance(error, dict):
+                error = error.get("message", "")
+            markdown += (
+                f"| {table.get('tableName')} | {table.get('status')} | "
+                f"{table.get('lastSuccessfulSyncDateTime') or ''} | {error} |\n"
+            )
+        if result["failed"]:
+            markdown += f"\nNot synced: {', '.join(result['failed'])}\n"
+        return markdown
+
+    except Exception as e:
+        logger.error(f"Error refreshing SQL endpoint metadata: {e}")
+        return f"Error refreshing SQL endpoint metadata: {e}"
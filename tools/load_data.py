@@ -3,18 +3,69 @@ from mcp.server.fastmcp import Context
 from helpers.utils.authentication import get_azure_credentials
 from helpers.clients import (
     FabricApiClient,
-    LakehouseClient,
-    WarehouseClient,
+    OneLakeClient,
+    TableClient,
+    SQLClient,
     get_sql_endpoint,
 )
+from helpers.utils.download import (
+    DEFAULT_DOWNLOAD_WORKERS,
+    download_file,
+    download_path,
+)
+from helpers.utils.csv_ingest import (
+    DEFAULT_SAMPLE_MB,
+    RejectWriter,
+    infer_csv_schema,
+    new_reject_path,
+)
+from helpers.utils.ingestion import (
+    IngestionStats,
+    ingest_file,
+    merge_file_into_delta,
+    source_format,
+    write_to_delta,
+)
 from helpers.logging_config import get_logger
-import tempfile
+import asyncio
 import os
-import requests
-from typing import Optional
+import polars as pl
+from typing import Dict, List, Optional
 
 logger = get_logger(__name__)
 
+LOAD_MODES = ("append", "overwrite", "merge")
+
+
+def _format_load_summary(
+    url: str,
+    target: str,
+    stats: dict,
+    merge: Optional[Dict] = None,
+    rejects: Optional[RejectWriter] = None,
+) -> str:
+    md = f"Data from {url} loaded into {target}.\n\n"
+    md += f"- **Rows:** {stats['rows']} ({stats['batches']} batches)\n"
+    if rejects is not None and rejects.count:
+        md += f"- **Rejected rows:** {rejects.count} (see `{rejects.path}`)\n"
+    if merge is not None:
+        if merge["skipped"] is not None:
+            md += f"- **Skipped (at or below watermark):** {merge['skipped']} of {merge['source_rows']}\n"
+        md += f"- **Inserted:** {merge['inserted']}\n"
+        md += f"- **Updated:** {merge['updated']}\n"
+        if merge["watermark"] is not None or merge["previous_watermark"] is not None:
+            md += f"- **Watermark:** {merge['previous_watermark']} -> {merge['watermark']}\n"
+    md += f"- **Downloaded:** {stats['bytes_downloaded']} bytes in {stats['download_seconds']}s"
+    if stats["download_mb_per_second"] is not None:
+        md += f" ({stats['download_mb_per_second']} MB/s)"
+    md += "\n"
+    md += f"- **Written in:** {stats['write_seconds']}s"
+    if stats["rows_per_second"] is not None:
+        md += f" ({stats['rows_per_second']} rows/s)"
+    md += "\n"
+    md += f"- **Total:** {stats['total_seconds']}s\n"
+    return md
+
 
 @mcp.tool()
 async def load_data_from_url(
@@ -23,54 +74,155 @@ async def load_data_from_url(
     workspace: Optional[str] = None,
     lakehouse: Optional[str] = None,
     warehouse: Optional[str] = None,
+    mode: str = "append",
+    key_columns: Optional[List[str]] = None,
+    watermark_column: Optional[str] = None,
+    column_types: Optional[Dict[str, str]] = None,
+    sample_mb: float = DEFAULT_SAMPLE_MB,
+    download_workers: int = DEFAULT_DOWNLOAD_WORKERS,
     ctx: Context = None,
 ) -> str:
     """Load data from a URL into a table in a warehouse or lakehouse.
 
+    The file is downloaded to disk with concurrent range requests when the
+    server supports them (otherwise as a single stream) and then read batch by
+    batch, so neither the download nor the parsed data is held in memory.
+    Lakehouse tables are written as Delta tables on OneLake (created if
+    missing); warehouse tables are loaded through the SQL endpoint.
+
+    CSV files (optionally gzip or zstd compressed) are parsed with a schema
+    inferred from a sample of the file; malformed rows are written to a reject
+    file instead of failing the load.
+
+    In 'merge' mode (lakehouse only) rows are upserted on the key columns with
+    a Delta MERGE. With a watermark column, rows at or below the watermark of
+    the previous merge load are skipped and the new maximum is stored in the
+    table's commit metadata.
+
     Args:
-        url: The URL to download data from (CSV or Parquet supported).
+        url: The URL to download data from (CSV, optionally .gz/.zst compressed, or Parquet).
         destination_table: The name of the table to load data into.
         workspace: Name or ID of the workspace (optional).
         lakehouse: Name or ID of the lakehouse (optional).
         warehouse: Name or ID of the warehouse (optional).
+        mode: 'append' to add rows, 'overwrite' to replace the table or 'merge' to upsert.
+        key_columns: Columns identifying a row, required for 'merge'.
+        watermark_column: Column whose maximum is tracked between 'merge' loads (optional).
+        column_types: CSV column name -> type ('string', 'int64', 'float64', 'boolean',
+            'date', 'timestamp', ...) overriding the inferred type (optional).
+        sample_mb: MB of a CSV file sampled (plus random stripes) to infer its schema.
+        download_workers: Maximum number of concurrent range requests.
         ctx: Context object containing client information.
     Returns:
-        A string confirming the data load or an error message.
+        A summary of rows loaded, bytes downloaded and throughput, or an error message.
     """
+    tmp_path = None
+    rejects = None
     try:
+        if mode not in LOAD_MODES:
+            return f"Unsupported mode: {mode}. Use one of: {', '.join(LOAD_MODES)}."
+        if mode == "merge" and not key_columns:
+            return "Key columns must be specified for a merge load."
+        file_ext = source_format(url)
+        if workspace is None:
+            workspace = __ctx_cache.get(f"{ctx.client_id}_workspace")
+        if not lakehouse and not warehouse:
+            lakehouse = __ctx_cache.get(f"{ctx.client_id}_lakehouse")
+            warehouse = __ctx_cache.get(f"{ctx.client_id}_warehouse")
+        if not lakehouse and not warehouse:
+            return "Either lakehouse or warehouse must be specified."
+        if not workspace:
+            return "Workspace must be specified or set in the context."
+        if mode == "merge" and not lakehouse:
+            return "Merge loads are only supported for lakehouse tables."
+
         # Download the file
-        response = requests.get(url)
-        if response.status_code != 200:
-            return f"Failed to download file from URL: {url}"
-        file_ext = url.split("?")[0].split(".")[-1].lower()
-        if file_ext not in ("csv", "parquet"):
-            return f"Unsupported file type: {file_ext}. Only CSV and Parquet are supported."
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=f".{file_ext}"
-        ) as tmp_file:
-            tmp_file.write(response.content)
-            tmp_path = tmp_file.name
-        # Choose destination: lakehouse or warehouse
+        tmp_path = download_path(url)
+        stats = IngestionStats()
+        download = await asyncio.to_thread(
+            download_file, url, tmp_path, max_workers=download_workers
+        )
+        stats.bytes_downloaded = download["bytes"]
+        stats.download_seconds = download["seconds"]
+
+        schema = None
+        if file_ext == "csv":
+            schema = await asyncio.to_thread(
+                infer_csv_schema, tmp_path, sample_mb, overrides=column_types
+            )
+            rejects = RejectWriter(new_reject_path(destination_table))
+
         credential = get_azure_credentials(ctx.client_id, __ctx_cache)
-        resource_id = None
-        resource_type = None
+        merge = None
         if lakehouse:
-            client = LakehouseClient(FabricApiClient(credential))
-            resource_id = lakehouse
-            resource_type = "lakehouse"
-        elif warehouse:
-            client = WarehouseClient(FabricApiClient(credential))
-            resource_id = warehouse
-            resource_type = "warehouse"
+            table_client = TableClient(FabricApiClient(credential))
+
+            def write(location, storage_options):
+                if mode == "merge":
+                    return merge_file_into_delta(
+                        tmp_path,
+                        file_ext,
+                        location,
+                        key_columns,
+                        stats,
+                        watermark_column=watermark_column,
+                        storage_options=storage_options,
+                        onelake=OneLakeClient(credential),
+                        schema=schema,
+                        rejects=rejects,
+                    )
+                return ingest_file(
+                    tmp_path,
+                    file_ext,
+                    lambda reader: write_to_delta(
+                        reader, location, storage_options, mode=mode
+                    ),
+                    stats,
+                    schema=schema,
+                    rejects=rejects,
+                )
+
+            result = await table_client.write_table(
+                workspace, lakehouse, destination_table, write, credential
+            )
+            if mode == "merge":
+                merge = result
+            target = f"table '{destination_table}' in lakehouse '{lakehouse}'"
         else:
-            return "Either lakehouse or warehouse must be specified."
-        # Here you would call the appropriate method to upload/ingest the file into the table.
-        # This is a placeholder for the actual implementation, which depends on the client API.
-        # For now, just return a success message with file info.
-        os.remove(tmp_path)
-        return f"Data from {url} loaded into table '{destination_table}' in {resource_type} '{resource_id}'. (File type: {file_ext})"
+            database, sql_endpoint = await get_sql_endpoint(
+                workspace=workspace, warehouse=warehouse, type="warehouse"
+            )
+            if not database or not sql_endpoint or sql_endpoint.startswith("Error"):
+                return f"Failed to resolve SQL endpoint: {sql_endpoint}"
+            sql_client = SQLClient(sql_endpoint=sql_endpoint, database=database)
+
+            def write_sql(reader):
+                if_exists = "replace" if mode == "overwrite" else "append"
+                for batch in reader:
+                    sql_client.load_data(
+                        pl.from_arrow(batch), destination_table, if_exists=if_exists
+                    )
+                    if_exists = "append"
+
+            await asyncio.to_thread(
+                ingest_file,
+                tmp_path,
+                file_ext,
+                write_sql,
+                stats,
+                schema=schema,
+                rejects=rejects,
+            )
+            target = f"table '{destination_table}' in warehouse '{warehouse}'"
+
+        return _format_load_summary(url, target, stats.to_dict(), merge, rejects)
     except Exception as e:
         return f"Error loading data: {str(e)}"
+    finally:
+        if rejects is not None:
+            rejects.close()
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
 
 # @mcp.resource(
@@ -5,8 +5,12 @@ from helpers.clients import (
     FabricApiClient,
     ReportClient,
 )
+from helpers.formatters.report_formatter import (
+    format_report_index_to_markdown,
+    format_visual_matches_to_markdown,
+)
 from helpers.logging_config import get_logger
-from typing import Optional
+from typing import List, Optional
 
 logger = get_logger(__name__)
 
@@ -76,3 +80,83 @@ async def get_report(
 
     except Exception as e:
         return f"Error getting report: {str(e)}"
+
+
+@mcp.tool()
+async def get_report_pages(
+    workspace: Optional[str] = None,
+    report_id: Optional[str] = None,
+    refresh: bool = False,
+    ctx: Context = None,
+) -> str:
+    """Get the pages and visuals of a report and the model fields each visual uses.
+
+    The report definition is fetched once and cached until the report changes.
+    If the service exposes no version (ETag or modification time) for the
+    report, changes cannot be detected and the definition is only cached for
+    about two minutes.
+
+    Args:
+        workspace: Name or ID of the workspace (optional)
+        report_id: ID of the report
+        refresh: Fetch the definition again even if it is cached.
+        ctx: Context object containing client information
+
+    Returns:
+        A markdown summary of pages, visuals and fields or an error message.
+    """
+    try:
+        client = ReportClient(
+            FabricApiClient(get_azure_credentials(ctx.client_id, __ctx_cache))
+        )
+        index = await client.get_report_index(
+            workspace if workspace else __ctx_cache[f"{ctx.client_id}_workspace"],
+            report_id,
+            refresh=refresh,
+        )
+        if index is None:
+            return f"Could not retrieve the definition of report '{report_id}'."
+        return format_report_index_to_markdown(report_id, index)
+
+    except Exception as e:
+        return f"Error getting report pages: {str(e)}"
+
+
+@mcp.tool()
+async def find_report_visuals(
+    field: str,
+    table: Optional[str] = None,
+    workspace: Optional[str] = None,
+    report_ids: Optional[List[str]] = None,
+    ctx: Context = None,
+) -> str:
+    """Find the visuals that use a measure or column, across the reports of a workspace.
+
+    Searches cached indexes of the report definitions; only reports changed
+    since they were last indexed are downloaded again. Reports for which the
+    service exposes no version are downloaded again after about two minutes.
+
+    Args:
+        field: Name of the measure or column (case-insensitive).
+        table: Table of the field (optional).
+        workspace: Name or ID of the workspace (optional)
+        report_ids: Reports to search (optional, defaults to all reports in the workspace).
+        ctx: Context object containing client information
+
+    Returns:
+        A markdown table of matching visuals or an error message.
+    """
+    try:
+        client = ReportClient(
+            FabricApiClient(get_azure_credentials(ctx.client_id, __ctx_cache))
+        )
+        result = await client.find_visuals(
+            workspace if workspace else __ctx_cache[f"{ctx.client_id}_workspace"],
+            field,
+            table=table,
+            report_ids=report_ids,
+        )
+        return format_visual_matches_to_markdown(field, result)
+
+    except Exception as e:
+        return f"Error searching reports: {str(e)}"
@@ -5,9 +5,20 @@ from helpers.clients import (
     FabricApiClient,
     SemanticModelClient,
 )
+from helpers.formatters.semantic_model_formatter import (
+    format_measure_to_markdown,
+    format_model_search_to_markdown,
+    format_refresh_status_to_markdown,
+)
+from helpers.utils.dax_query import DEFAULT_MAX_ROWS
+from helpers.utils.result_store import (
+    format_result_summary,
+    new_result_path,
+    write_batches,
+)
 from helpers.logging_config import get_logger
 
-from typing import Optional
+from typing import Dict, List, Optional
 
 logger = get_logger(__name__)
 
@@ -77,3 +88,299 @@ async def get_semantic_model(
 
     except Exception as e:
         return f"Error retrieving semantic model: {str(e)}"
+
+
+@mcp.tool()
+async def get_semantic_model_definition(
+    workspace: Optional[str] = None,
+    model_id: Optional[str] = None,
+    part: Optional[str] = None,
+    format: str = "TMDL",
+    refresh: bool = False,
+    ctx: Context = None,
+) -> str:
+    """Get the definition of a semantic model (TMDL or TMSL parts).
+
+    Without a part, the definition's parts are listed with their sizes. With a
+    part path (or glob pattern), only the matching parts are decoded and
+    returned. Definitions are cached until the model changes; if the service
+    exposes no version (ETag or modification time) for the model, they are
+    only cached for about two minutes.
+
+    Args:
+        workspace: Name or ID of the workspace (optional)
+        model_id: ID of the semantic model (optional)
+        part: Path or glob pattern of the parts to return, e.g. 'definition/tables/Sales.tmdl' (optional)
+        format: 'TMDL' or 'TMSL'
+        refresh: Fetch the definition again even if it is cached
+        ctx: Context object containing client information
+
+    Returns:
+        A list of parts or the content of the requested parts, or an error message.
+    """
+    try:
+        client = SemanticModelClient(
+            FabricApiClient(get_azure_credentials(ctx.client_id, __ctx_cache))
+        )
+        model_id = model_id if model_id else __ctx_cache[f"{ctx.client_id}_semantic_model"]
+        definition = await client.get_model_definition(
+            workspace if workspace else __ctx_cache[f"{ctx.client_id}_workspace"],
+            model_id,
+            format=format.upper(),
+            refresh=refresh,
+        )
+        if definition is None:
+            return f"Could not retrieve the definition of semantic model '{model_id}'."
+
+        if part is None:
+            markdown = f"# Definition of semantic model '{model_id}' ({definition.format})\n\n"
+            markdown += "| Part | Size (bytes) |\n"
+            markdown += "|------|--------------|\n"
+            for path in definition.paths():
+                markdown += f"| {path} | {definition.part(path).size} |\n"
+            return markdown
+
+        paths = definition.paths(part)
+        if not paths:
+            return f"No part matching '{part}' in semantic model '{model_id}'."
+        markdown = ""
+        for path in paths:
+            markdown += f"## {path}\n\n```\n{definition.part(path).text}\n```\n\n"
+        return markdown
+
+    except Exception as e:
+        return f"Error retrieving semantic model definition: {str(e)}"
+
+
+@mcp.tool()
+async def search_semantic_model(
+    text: str,
+    kind: str = "all",
+    in_expressions: bool = False,
+    workspace: Optional[str] = None,
+    model_id: Optional[str] = None,
+    limit: int = 50,
+    ctx: Context = None,
+) -> str:
+    """Search a semantic model's tables, columns, measures and relationships.
+
+    Searches an in-memory index built from the model definition (cached until
+    the model changes) instead of returning the whole definition.
+
+    Args:
+        text: Name substring to look for (for relationships: a table name).
+        kind: 'all', 'tables', 'columns', 'measures' or 'relationships'.
+        in_expressions: Also match text inside measure DAX expressions.
+        workspace: Name or ID of the workspace (optional)
+        model_id: ID of the semantic model (optional)
+        limit: Maximum number of results shown per kind.
+        ctx: Context object containing client information
+
+    Returns:
+        A markdown summary of the matching objects or an error message.
+    """
+    try:
+        if kind not in ("all", "tables", "columns", "measures", "relationships"):
+            return f"Unsupported kind: {kind}. Use 'all', 'tables', 'columns', 'measures' or 'relationships'."
+        client = SemanticModelClient(
+            FabricApiClient(get_azure_credentials(ctx.client_id, __ctx_cache))
+        )
+        results = await client.search_model(
+            workspace if workspace else __ctx_cache[f"{ctx.client_id}_workspace"],
+            model_id if model_id else __ctx_cache[f"{ctx.client_id}_semantic_model"],
+            text,
+            kind=kind,
+            in_expressions=in_expressions,
+        )
+        return format_model_search_to_markdown(text, results, limit)
+
+    except Exception as e:
+        return f"Error searching semantic model: {str(e)}"
+
+
+@mcp.tool()
+async def get_semantic_model_measure(
+    measure: str,
+    workspace: Optional[str] = None,
+    model_id: Optional[str] = None,
+    ctx: Context = None,
+) -> str:
+    """Get the DAX expression and properties of a measure by name.
+
+    Args:
+        measure: Name of the measure (case-insensitive).
+        workspace: Name or ID of the workspace (optional)
+        model_id: ID of the semantic model (optional)
+        ctx: Context object containing client information
+
+    Returns:
+        The measure definition in markdown or an error message.
+    """
+    try:
+        client = SemanticModelClient(
+            FabricApiClient(get_azure_credentials(ctx.client_id, __ctx_cache))
+        )
+        model_id = model_id if model_id else __ctx_cache[f"{ctx.client_id}_semantic_model"]
+        index = await client.get_model_index(
+            workspace if workspace else __ctx_cache[f"{ctx.client_id}_workspace"],
+            model_id,
+        )
+        if index is None:
+            return f"Could not retrieve the definition of semantic model '{model_id}'."
+        measures = index.get_measures(measure)
+        if not measures:
+            similar = ", ".join(m["name"] for m in index.find_measures(measure)[:10])
+            return f"No measure named '{measure}' found." + (
+                f" Similar measures: {similar}" if similar else ""
+            )
+        return "\n".join(format_measure_to_markdown(m) for m in measures)
+
+    except Exception as e:
+        return f"Error retrieving measure: {str(e)}"
+
+
+@mcp.tool()
+async def run_dax_query(
+    query: str,
+    workspace: Optional[str] = None,
+    model_id: Optional[str] = None,
+    max_rows: int = DEFAULT_MAX_ROWS,
+    export_format: Optional[str] = None,
+    refresh: bool = False,
+    ctx: Context = None,
+):
+    """Run a DAX query against a semantic model.
+
+    Results are returned column by column and cached until the model is
+    refreshed.
+
+    Args:
+        query: The DAX query to execute (e.g. "EVALUATE 'Sales'").
+        workspace: Name or ID of the workspace (optional)
+        model_id: ID of the semantic model (optional)
+        max_rows: Maximum number of rows returned (up to 100000).
+        export_format: 'parquet' or 'arrow' to write the result to a local file and
+            return its path, row count and schema instead of the rows (optional).
+        refresh: Ignore cached results.
+        ctx: Context object containing client information
+
+    Returns:
+        The result columns with row count and truncation flag, or an error message.
+    """
+    try:
+        client = SemanticModelClient(
+            FabricApiClient(get_azure_credentials(ctx.client_id, __ctx_cache))
+        )
+        result = await client.run_dax_query(
+            workspace if workspace else __ctx_cache[f"{ctx.client_id}_workspace"],
+            model_id if model_id else __ctx_cache[f"{ctx.client_id}_semantic_model"],
+            query,
+            max_rows=max_rows,
+            refresh=refresh,
+        )
+        frame = result["frame"]
+        if export_format:
+            summary = write_batches(
+                [frame], new_result_path(export_format, prefix="dax"), export_format
+            )
+            markdown = format_result_summary(summary)
+            if result["truncated"]:
+                markdown += f"\n\nResult truncated to {max_rows} rows."
+            return markdown
+        if frame.is_empty():
+            return f"No data found for query '{query}'."
+        return {
+            "data": frame.to_dict(as_series=False),
+            "rows": frame.height,
+            "truncated": result["truncated"],
+            "cached": result["cached"],
+        }
+
+    except Exception as e:
+        return f"Error running DAX query: {str(e)}"
+
+
+@mcp.tool()
+async def refresh_semantic_model(
+    workspace: Optional[str] = None,
+    model_id: Optional[str] = None,
+    tables: Optional[List[str]] = None,
+    partitions: Optional[Dict[str, List[str]]] = None,
+    refresh_type: str = "full",
+    commit_mode: str = "transactional",
+    max_parallelism: Optional[int] = None,
+    ctx: Context = None,
+) -> str:
+    """Start a refresh of a semantic model and return immediately with a handle.
+
+    Progress is polled in the background at the interval advised by the
+    service; use get_semantic_model_refresh_status with the handle to follow it.
+
+    Args:
+        workspace: Name or ID of the workspace (optional)
+        model_id: ID of the semantic model (optional)
+        tables: Tables to refresh (optional, defaults to the whole model).
+        partitions: Table name -> partition names to refresh (optional).
+        refresh_type: 'full', 'clearValues', 'calculate', 'dataOnly', 'automatic' or 'defragment'.
+        commit_mode: 'transactional' or 'partialBatch'.
+        max_parallelism: Maximum number of objects processed in parallel (optional).
+        ctx: Context object containing client information
+
+    Returns:
+        The refresh handle and initial status, or an error message.
+    """
+    try:
+        client = SemanticModelClient(
+            FabricApiClient(get_azure_credentials(ctx.client_id, __ctx_cache))
+        )
+        state = await client.start_refresh(
+            workspace if workspace else __ctx_cache[f"{ctx.client_id}_workspace"],
+            model_id if model_id else __ctx_cache[f"{ctx.client_id}_semantic_model"],
+            tables=tables,
+            partitions=partitions,
+            refresh_type=refresh_type,
+            commit_mode=commit_mode,
+            max_parallelism=max_parallelism,
+        )
+        return (
+            f"Refresh started with handle `{state['handle']}`. "
+            "Use get_semantic_model_refresh_status to follow its progress."
+        )
+
+    except Exception as e:
+        return f"Error starting semantic model refresh: {str(e)}"
+
+
+@mcp.tool()
+async def get_semantic_model_refresh_status(
+    handle: str,
+    workspace: Optional[str] = None,
+    model_id: Optional[str] = None,
+    ctx: Context = None,
+) -> str:
+    """Get the progress of a semantic model refresh, per table.
+
+    Args:
+        handle: Handle returned by refresh_semantic_model (or a refresh request ID).
+        workspace: Name or ID of the workspace, to look up refreshes not started here (optional)
+        model_id: ID of the semantic model, to look up refreshes not started here (optional)
+        ctx: Context object containing client information
+
+    Returns:
+        The refresh status with per-table progress and durations, or an error message.
+    """
+    try:
+        client = SemanticModelClient(
+            FabricApiClient(get_azure_credentials(ctx.client_id, __ctx_cache))
+        )
+        state = await client.get_refresh_status(
+            handle,
+            workspace if workspace else __ctx_cache.get(f"{ctx.client_id}_workspace"),
+            model_id,
+        )
+        if state is None:
+            return f"No refresh found with handle '{handle}'. Specify the model to look it up."
+        return format_refresh_status_to_markdown(state)
+
+    except Exception as e:
+        return f"Error retrieving refresh status: {str(e)}"
@@ -3,13 +3,31 @@ from mcp.server.fastmcp import Context
 from helpers.utils.authentication import get_azure_credentials
 from helpers.clients import (
     FabricApiClient,
+    OneLakeClient,
     TableClient,
     SQLClient,
     get_sql_endpoint,
 )
+from helpers.utils.result_store import format_result_summary, read_result
+from helpers.utils.query_export import (
+    DEFAULT_EXPORT_WORKERS,
+    DEFAULT_ROWS_PER_FILE,
+    export_delta_table,
+    export_parquet_files,
+    format_export_summary,
+)
+from helpers.utils.profiling import (
+    QueryProfile,
+    record_profile,
+    get_histograms,
+    format_histograms_to_markdown,
+)
 
-from typing import Optional
+from helpers.utils.onelake_files import invalidate_listing_cache
+from typing import Dict, List, Optional
+from uuid import uuid4
 from helpers.logging_config import get_logger
+import asyncio
 
 logger = get_logger(__name__)
 
@@ -18,6 +36,9 @@ logger = get_logger(__name__)
 async def set_table(table_name: str, ctx: Context) -> str:
     """Set the current table for the session.
 
+    If a workspace and lakehouse are set in the context, the table name is
+    checked against the lakehouse's (cached) table index.
+
     Args:
         table_name: Name of the table to set
         ctx: Context object containing client information
@@ -25,6 +46,18 @@ async def set_table(table_name: str, ctx: Context) -> str:
     Returns:
         A string confirming the table has been set.
     """
+    workspace = __ctx_cache.get(f"{ctx.client_id}_workspace")
+    lakehouse = __ctx_cache.get(f"{ctx.client_id}_lakehouse")
+    if workspace and lakehouse:
+        try:
+            client = TableClient(
+                FabricApiClient(get_azure_credentials(ctx.client_id, __ctx_cache))
+            )
+            index = await client.get_table_index(workspace, lakehouse)
+            if index and table_name.lower() not in index:
+                return f"No table found with name '{table_name}' in lakehouse '{lakehouse}'."
+        except Exception as e:
+            logger.warning(f"Could not validate table '{table_name}': {str(e)}")
     __ctx_cache[f"{ctx.client_id}_table"] = table_name
     return f"Table set to '{table_name}'."
 
@@ -111,15 +144,318 @@ async def get_lakehouse_table_schema(
         return f"Error retrieving table schema: {str(e)}"
 
 
+def _lakehouse_from_context(
+    workspace: Optional[str], lakehouse: Optional[str], ctx: Context
+) -> tuple:
+    """Fill in the workspace and lakehouse from the session context when not given."""
+    if workspace is None:
+        workspace = __ctx_cache.get(f"{ctx.client_id}_workspace")
+        if workspace is None:
+            raise ValueError("Workspace must be specified or set in the context.")
+    if lakehouse is None:
+        lakehouse = __ctx_cache.get(f"{ctx.client_id}_lakehouse")
+        if lakehouse is None:
+            raise ValueError("Lakehouse must be specified or set in the context.")
+    return workspace, lakehouse
+
+
+@mcp.tool()
+async def get_table_stats(
+    table_name: str,
+    workspace: Optional[str] = None,
+    lakehouse: Optional[str] = None,
+    ctx: Context = None,
+) -> str:
+    """Get row count, null counts and min/max per column of a Delta table.
+
+    Statistics are aggregated from the Delta transaction log; no data is scanned.
+
+    Args:
+        table_name: Name of the table
+        workspace: Name or ID of the workspace (optional)
+        lakehouse: Name or ID of the lakehouse (optional)
+        ctx: Context object containing client information
+
+    Returns:
+        A string containing the table statistics or an error message.
+    """
+    try:
+        workspace, lakehouse = _lakehouse_from_context(workspace, lakehouse, ctx)
+        credential = get_azure_credentials(ctx.client_id, __ctx_cache)
+        client = TableClient(FabricApiClient(credential))
+        return await client.get_table_stats(
+            workspace, lakehouse, "lakehouse", table_name, credential
+        )
+    except Exception as e:
+        return f"Error retrieving table statistics: {str(e)}"
+
+
+@mcp.tool()
+async def analyze_table_layout(
+    table_name: str,
+    workspace: Optional[str] = None,
+    lakehouse: Optional[str] = None,
+    target_file_size_mb: int = 128,
+    ctx: Context = None,
+) -> str:
+    """Analyze the file and partition layout of a Delta table.
+
+    Reports a file-size histogram, the share of files below the target size,
+    files per partition and partition skew, with maintenance recommendations.
+
+    Args:
+        table_name: Name of the table
+        workspace: Name or ID of the workspace (optional)
+        lakehouse: Name or ID of the lakehouse (optional)
+        target_file_size_mb: Target data file size in MB
+        ctx: Context object containing client information
+
+    Returns:
+        A string containing the layout analysis or an error message.
+    """
+    try:
+        workspace, lakehouse = _lakehouse_from_context(workspace, lakehouse, ctx)
+        credential = get_azure_credentials(ctx.client_id, __ctx_cache)
+        client = TableClient(FabricApiClient(credential))
+        return await client.get_table_layout(
+            workspace,
+            lakehouse,
+            "lakehouse",
+            table_name,
+            credential,
+            target_file_size=target_file_size_mb * 1024 * 1024,
+        )
+    except Exception as e:
+        return f"Error analyzing table layout: {str(e)}"
+
+
+@mcp.tool()
+async def optimize_table(
+    table_name: str,
+    workspace: Optional[str] = None,
+    lakehouse: Optional[str] = None,
+    z_order_columns: Optional[List[str]] = None,
+    target_file_size_mb: int = 128,
+    partitions: Optional[Dict[str, str]] = None,
+    dry_run: bool = True,
+    ctx: Context = None,
+) -> str:
+    """Compact small files of a Delta table, or Z-order it on the given columns.
+
+    Runs as a dry run by default, reporting the files and bytes that would be
+    rewritten. Set dry_run to False to rewrite the files.
+
+    Args:
+        table_name: Name of the table
+        workspace: Name or ID of the workspace (optional)
+        lakehouse: Name or ID of the lakehouse (optional)
+        z_order_columns: Columns to Z-order on (optional, compacts when omitted)
+        target_file_size_mb: Target data file size in MB
+        partitions: Restrict to partitions matching {column: value} (optional)
+        dry_run: Only report what would be rewritten
+        ctx: Context object containing client information
+
+    Returns:
+        A string containing the operation metrics or an error message.
+    """
+    try:
+        workspace, lakehouse = _lakehouse_from_context(workspace, lakehouse, ctx)
+        credential = get_azure_credentials(ctx.client_id, __ctx_cache)
+        client = TableClient(FabricApiClient(credential))
+        return await client.optimize_table(
+            workspace,
+            lakehouse,
+            "lakehouse",
+            table_name,
+            credential,
+            target_size=target_file_size_mb * 1024 * 1024,
+            z_order_columns=z_order_columns,
+            partitions=partitions,
+            dry_run=dry_run,
+        )
+    except Exception as e:
+        return f"Error optimizing table: {str(e)}"
+
+
+@mcp.tool()
+async def vacuum_table(
+    table_name: str,
+    workspace: Optional[str] = None,
+    lakehouse: Optional[str] = None,
+    retention_hours: int = 168,
+    dry_run: bool = True,
+    ctx: Context = None,
+) -> str:
+    """Remove data files no longer referenced by a Delta table.
+
+    Runs as a dry run by default, listing the files that would be deleted.
+    Files newer than the retention window are always kept.
+
+    Args:
+        table_name: Name of the table
+        workspace: Name or ID of the workspace (optional)
+        lakehouse: Name or ID of the lakehouse (optional)
+        retention_hours: Keep unreferenced files younger than this many hours
+        dry_run: Only list the files that would be deleted
+        ctx: Context object containing client information
+
+    Returns:
+        A string containing the files affected or an error message.
+    """
+    try:
+        workspace, lakehouse = _lakehouse_from_context(workspace, lakehouse, ctx)
+        credential = get_azure_credentials(ctx.client_id, __ctx_cache)
+        client = TableClient(FabricApiClient(credential))
+        return await client.vacuum_table(
+            workspace,
+            lakehouse,
+            "lakehouse",
+            table_name,
+            credential,
+            retention_hours=retention_hours,
+            dry_run=dry_run,
+        )
+    except Exception as e:
+        return f"Error vacuuming table: {str(e)}"
+
+
+@mcp.tool()
+async def get_table_history(
+    table_name: str,
+    workspace: Optional[str] = None,
+    lakehouse: Optional[str] = None,
+    limit: int = 20,
+    ctx: Context = None,
+) -> str:
+    """List the latest commits of a Delta table (operation, parameters, metrics, timestamp).
+
+    Args:
+        table_name: Name of the table
+        workspace: Name or ID of the workspace (optional)
+        lakehouse: Name or ID of the lakehouse (optional)
+        limit: Maximum number of commits to return
+        ctx: Context object containing client information
+
+    Returns:
+        A string containing the commit history or an error message.
+    """
+    try:
+        workspace, lakehouse = _lakehouse_from_context(workspace, lakehouse, ctx)
+        credential = get_azure_credentials(ctx.client_id, __ctx_cache)
+        client = TableClient(FabricApiClient(credential))
+        return await client.get_table_history(
+            workspace, lakehouse, "lakehouse", table_name, credential, limit=limit
+        )
+    except Exception as e:
+        return f"Error retrieving table history: {str(e)}"
+
+
+@mcp.tool()
+async def get_table_at_version(
+    table_name: str,
+    workspace: Optional[str] = None,
+    lakehouse: Optional[str] = None,
+    version: Optional[int] = None,
+    timestamp: Optional[str] = None,
+    include_stats: bool = False,
+    ctx: Context = None,
+) -> str:
+    """Get the schema of a Delta table as of an older version or timestamp (time travel).
+
+    Args:
+        table_name: Name of the table
+        workspace: Name or ID of the workspace (optional)
+        lakehouse: Name or ID of the lakehouse (optional)
+        version: Table version to load (optional)
+        timestamp: ISO 8601 timestamp to load the table as of (optional)
+        include_stats: Also return row/null/min/max statistics at that version
+        ctx: Context object containing client information
+
+    Returns:
+        A string containing the schema (and statistics) or an error message.
+    """
+    try:
+        workspace, lakehouse = _lakehouse_from_context(workspace, lakehouse, ctx)
+        credential = get_azure_credentials(ctx.client_id, __ctx_cache)
+        client = TableClient(FabricApiClient(credential))
+        return await client.get_table_at_version(
+            workspace,
+            lakehouse,
+            "lakehouse",
+            table_name,
+            credential,
+            version=version,
+            timestamp=timestamp,
+            include_stats=include_stats,
+        )
+    except Exception as e:
+        return f"Error retrieving table version: {str(e)}"
+
+
+@mcp.tool()
+async def preview_table(
+    table_name: str,
+    workspace: Optional[str] = None,
+    lakehouse: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    limit: int = 10,
+    ctx: Context = None,
+) -> str:
+    """Preview the first rows of a Delta table without using the SQL endpoint.
+
+    Only the first row group of one data file is read, limited to the requested
+    columns, so the rows are not a random sample.
+
+    Args:
+        table_name: Name of the table
+        workspace: Name or ID of the workspace (optional)
+        lakehouse: Name or ID of the lakehouse (optional)
+        columns: Columns to return (optional, defaults to all)
+        limit: Maximum number of rows to return
+        ctx: Context object containing client information
+
+    Returns:
+        The rows as a dictionary or an error message.
+    """
+    try:
+        if limit < 1:
+            return "Limit must be at least 1."
+        workspace, lakehouse = _lakehouse_from_context(workspace, lakehouse, ctx)
+        credential = get_azure_credentials(ctx.client_id, __ctx_cache)
+        client = TableClient(FabricApiClient(credential))
+        df = await client.preview_table(
+            workspace,
+            lakehouse,
+            "lakehouse",
+            table_name,
+            credential,
+            columns=columns,
+            limit=limit,
+        )
+        if isinstance(df, str):
+            return df
+        if df.is_empty():
+            return f"Table '{table_name}' has no rows."
+        return df.to_dict(as_series=False)
+    except Exception as e:
+        return f"Error previewing table: {str(e)}"
+
+
 @mcp.tool()
 async def get_all_lakehouse_schemas(
-    lakehouse: Optional[str], workspace: Optional[str] = None, ctx: Context = None
+    lakehouse: Optional[str],
+    workspace: Optional[str] = None,
+    max_workers: int = 8,
+    table_timeout: Optional[float] = 60,
+    ctx: Context = None,
 ) -> str:
     """Get schemas for all Delta tables in a Fabric lakehouse.
 
     Args:
         workspace: Name or ID of the workspace
         lakehouse: Name or ID of the lakehouse
+        max_workers: Maximum number of tables loaded in parallel
+        table_timeout: Seconds allowed to load each table before it is skipped
         ctx: Context object containing client information
 
     Returns:
@@ -140,7 +476,13 @@ async def get_all_lakehouse_schemas(
             else:
                 return "Lakehouse must be specified or set in the context."
         schemas = await client.get_all_schemas(
-            workspace, lakehouse, "lakehouse", credential
+            workspace,
+            lakehouse,
+            "lakehouse",
+            credential,
+            max_workers=max_workers,
+            table_timeout=table_timeout,
+            ctx=ctx,
         )
 
         return schemas
@@ -156,6 +498,8 @@ async def run_query(
     warehouse: Optional[str] = None,
     query: str = None,
     type: Optional[str] = None,  # Add type hint for 'type'
+    export_format: Optional[str] = None,
+    profile: bool = False,
     ctx: Context = None,
 ) -> str:
     """Read data from a table in a warehouse or lakehouse.
@@ -166,6 +510,9 @@ async def run_query(
         warehouse: Name or ID of the warehouse (optional).
         query: The SQL query to execute.
         type: Type of resource ('lakehouse' or 'warehouse'). If not provided, it will be inferred.
+        export_format: 'parquet' or 'arrow' to stream the result to a local file and
+            return its path, row count and schema instead of the rows (optional).
+        profile: Include per-stage timings, rows and bytes with the result.
         ctx: Context object containing client information.
     Returns:
         A string confirming the data read or an error message.
@@ -175,12 +522,14 @@ async def run_query(
             raise ValueError("Context (ctx) must be provided.")
         if query is None:
             raise ValueError("Query must be specified.")
+        query_profile = QueryProfile()
         # Always resolve the SQL endpoint and database name
         database, sql_endpoint = await get_sql_endpoint(
             workspace=workspace,
             lakehouse=lakehouse,
             warehouse=warehouse,
             type=type,
+            profile=query_profile,
         )
         if (
             not database
@@ -190,9 +539,19 @@ async def run_query(
         ):
             return f"Failed to resolve SQL endpoint: {sql_endpoint}"
         logger.info(f"Running query '{query}' on SQL endpoint {sql_endpoint}")
-        client = SQLClient(sql_endpoint=sql_endpoint, database=database)
+        client = SQLClient(
+            sql_endpoint=sql_endpoint, database=database, profile=query_profile
+        )
+        if export_format:
+            summary = client.spill_query(query, fmt=export_format)
+            record_profile(query_profile.finish())
+            markdown = format_result_summary(summary)
+            if profile:
+                markdown += f"\n\nProfile: {query_profile.to_dict()}"
+            return markdown
         df = client.run_query(query)
         if df.is_empty():
+            record_profile(query_profile.finish())
             return f"No data found for query '{query}'."
 
         # Convert to markdown for user-friendly display
@@ -204,7 +563,232 @@ async def run_query(
         # markdown += f"\n\n### Data Preview:\n\n"
         # markdown += df.head(10).to_pandas().to_markdown(index=False)
         # markdown += f"\n\nColumns: {', '.join(df.columns)}"
-        return df.to_dict()  # Return the DataFrame as a dictionary for easier handling
+        with query_profile.stage("to_dict"):
+            result = df.to_dict()  # Return the DataFrame as a dictionary for easier handling
+        record_profile(query_profile.finish())
+        if profile:
+            return {"data": result, "profile": query_profile.to_dict()}
+        return result
     except Exception as e:
         logger.error(f"Error reading data: {str(e)}")
         return f"Error reading data: {str(e)}"
+
+
+@mcp.tool()
+async def export_query(
+    query: str,
+    destination: str,
+    format: str = "delta",
+    mode: str = "append",
+    workspace: Optional[str] = None,
+    lakehouse: Optional[str] = None,
+    warehouse: Optional[str] = None,
+    type: Optional[str] = None,
+    target_workspace: Optional[str] = None,
+    target_lakehouse: Optional[str] = None,
+    rows_per_file: int = DEFAULT_ROWS_PER_FILE,
+    max_workers: int = DEFAULT_EXPORT_WORKERS,
+    ctx: Context = None,
+) -> str:
+    """Run a query on a SQL endpoint and write the result to a lakehouse.
+
+    Result batches are streamed from the SQL endpoint straight into a Delta
+    table or into Parquet part files under the lakehouse 'Files/' area, which
+    are uploaded in parallel while the next part is written. Memory stays
+    bounded and no rows are returned, only a summary.
+
+    Args:
+        query: The SQL query to execute.
+        destination: Table name (format 'delta') or folder under 'Files/' (format 'parquet').
+        format: 'delta' or 'parquet'.
+        mode: 'append' to add rows or 'overwrite' to replace the table (Delta tables only).
+        workspace: Name or ID of the workspace to query (optional).
+        lakehouse: Name or ID of the lakehouse to query (optional).
+        warehouse: Name or ID of the warehouse to query (optional).
+        type: Type of resource queried ('lakehouse' or 'warehouse'). If not provided, it will be inferred.
+        target_workspace: Workspace of the target lakehouse (defaults to workspace).
+        target_lakehouse: Lakehouse written to (defaults to the queried or current lakehouse).
+        rows_per_file: Rows per Parquet part file.
+        max_workers: Maximum number of Parquet part files uploaded in parallel.
+        ctx: Context object containing client information.
+
+    Returns:
+        A summary with row count, file count and bytes written, or an error message.
+    """
+    try:
+        format = format.lower()
+        if format not in ("delta", "parquet"):
+            return f"Unsupported export format: {format}. Use 'delta' or 'parquet'."
+        if mode not in ("overwrite", "append"):
+            return f"Unsupported mode: {mode}. Use 'overwrite' or 'append'."
+        if max_workers < 1 or rows_per_file < 1:
+            return "rows_per_file and max_workers must be at least 1."
+        target_workspace = (
+            target_workspace
+            or workspace
+            or __ctx_cache.get(f"{ctx.client_id}_workspace")
+        )
+        target_lakehouse = (
+            target_lakehouse
+            or lakehouse
+            or __ctx_cache.get(f"{ctx.client_id}_lakehouse")
+        )
+        if not target_workspace or not target_lakehouse:
+            return "Target workspace and lakehouse must be specified or set in the context."
+
+        database, sql_endpoint = await get_sql_endpoint(
+            workspace=workspace,
+            lakehouse=lakehouse,
+            warehouse=warehouse,
+            type=type,
+        )
+        if (
+            not database
+            or not sql_endpoint
+            or sql_endpoint.startswith("Error")
+            or sql_endpoint.startswith("No SQL endpoint")
+        ):
+            return f"Failed to resolve SQL endpoint: {sql_endpoint}"
+        client = SQLClient(sql_endpoint=sql_endpoint, database=database)
+        credential = get_azure_credentials(ctx.client_id, __ctx_cache)
+        table_client = TableClient(FabricApiClient(credential))
+
+        if format == "delta":
+            summary = await table_client.write_table(
+                target_workspace,
+                target_lakehouse,
+                destination,
+                lambda location, storage_options: export_delta_table(
+                    client.iter_query(query), location, storage_options, mode=mode
+                ),
+                credential,
+            )
+            return format_export_summary(
+                f"{target_lakehouse}/Tables/{destination}", summary
+            )
+
+        workspace_id, lakehouse_id, _ = await table_client.get_table_location(
+            target_workspace, target_lakehouse, destination
+        )
+        folder = destination.strip("/")
+        if folder.lower().startswith("files/"):
+            folder = folder[len("files/") :]
+        onelake = OneLakeClient(credential)
+        prefix = uuid4().hex[:8]
+
+        def upload(path: str, index: int):
+            onelake.upload_file(
+                workspace_id,
+                f"{lakehouse_id}/Files/{folder}/part-{index:05d}-{prefix}.parquet",
+                path,
+            )
+
+        summary = await asyncio.to_thread(
+            export_parquet_files,
+            client.iter_query(query),
+            upload,
+            rows_per_file=max(1, rows_per_file),
+            max_workers=max_workers,
+        )
+        invalidate_listing_cache(workspace_id, f"{lakehouse_id}/Files")
+        return format_export_summary(f"{target_lakehouse}/Files/{folder}", summary)
+    except Exception as e:
+        logger.error(f"Error exporting query: {str(e)}")
+        return f"Error exporting query: {str(e)}"
+
+
+@mcp.tool()
+async def run_local_query(
+    query: str,
+    workspace: Optional[str] = None,
+    lakehouse: Optional[str] = None,
+    tables: Optional[List[str]] = None,
+    limit: Optional[int] = 1000,
+    export_format: Optional[str] = None,
+    ctx: Context = None,
+) -> str:
+    """Run a SQL query locally over a lakehouse's Delta tables, without the SQL endpoint.
+
+    Tables are scanned lazily from OneLake with polars; column projections and
+    filters are pushed down to the Parquet files and Delta partitions.
+
+    Args:
+        query: SQL query (polars SQL dialect) referencing tables by name.
+        workspace: Name or ID of the workspace (optional).
+        lakehouse: Name or ID of the lakehouse (optional).
+        tables: Tables to expose to the query (optional, inferred from the query).
+        limit: Maximum number of rows to return (optional).
+        export_format: 'parquet' or 'arrow' to stream the result to a local file
+            and return its path, row count and schema instead of the rows (optional).
+        ctx: Context object containing client information.
+    Returns:
+        The query result as a dictionary, a result file summary or an error message.
+    """
+    try:
+        if ctx is None:
+            raise ValueError("Context (ctx) must be provided.")
+        workspace, lakehouse = _lakehouse_from_context(workspace, lakehouse, ctx)
+
+        credential = get_azure_credentials(ctx.client_id, __ctx_cache)
+        client = TableClient(FabricApiClient(credential))
+        result = await client.query_tables(
+            workspace,
+            lakehouse,
+            query,
+            credential,
+            tables=tables,
+            limit=limit,
+            export_format=export_format,
+        )
+        if isinstance(result, str):
+            return result
+        if export_format:
+            return format_result_summary(result)
+        if result.is_empty():
+            return f"No data found for query '{query}'."
+        return result.to_dict(as_series=False)
+    except Exception as e:
+        logger.error(f"Error running local query: {str(e)}")
+        return f"Error running local query: {str(e)}"
+
+
+@mcp.tool()
+async def get_query_timings(ctx: Context = None) -> str:
+    """Get aggregated per-stage timing histograms for queries run by run_query.
+
+    Args:
+        ctx: Context object containing client information.
+    Returns:
+        A markdown table of stage timings or an error message.
+    """
+    try:
+        return format_histograms_to_markdown(get_histograms())
+    except Exception as e:
+        return f"Error retrieving query timings: {str(e)}"
+
+
+@mcp.tool()
+async def preview_query_result(
+    path: str,
+    columns: Optional[List[str]] = None,
+    limit: int = 20,
+    ctx: Context = None,
+) -> str:
+    """Preview rows from a query result file written by run_query(export_format=...).
+
+    Args:
+        path: Path of the result file returned by run_query.
+        columns: Columns to read (optional, defaults to all).
+        limit: Maximum number of rows to return.
+        ctx: Context object containing client information.
+    Returns:
+        The selected rows as a dictionary or an error message.
+    """
+    try:
+        df = read_result(path, columns=columns, limit=limit)
+        if df.is_empty():
+            return f"No rows found in result file '{path}'."
+        return df.to_dict(as_series=False)
+    except Exception as e:
+        logger.error(f"Error reading result file: {str(e)}")
+        return f"Error reading result file: {str(e)}"